@@ -0,0 +1,360 @@
+"""
+Async handlers for the I/O-bound endpoints, served by asgi.py.
+
+These mirror the Flask resources for chat, search, consultation and interview
+assessment, but wait on OpenAI and PostgreSQL with async clients so a single
+process can hold many in-flight requests without a thread per request.
+CPU-bound work (query encoding) and SQLAlchemy model access are offloaded to
+worker threads.
+"""
+import asyncio
+import logging
+import time
+
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+
+from core.async_pg import async_execute_pg_query
+from core.llm import get_llm_gateway
+from core.vector_db import get_vector_db
+from api.chat import (
+    CHAT_MODEL,
+    answer_cache,
+    _assemble_context,
+    _build_messages,
+    _cache_key,
+    _fallback_answer,
+    _sse_event,
+)
+from api.search import _search_vector_db, _format_user_row, _escape_like, SEARCH_DEADLINE_SECONDS
+from services.ai import ai_service
+from services.interview_assessment import (
+    ASSESSMENT_MODEL,
+    assessment_fingerprint,
+    assessment_messages,
+    build_assessment_prompt,
+    get_latest_form,
+    get_existing_assessment,
+    is_assessment_current,
+    save_assessment,
+)
+from models.ds160 import DS160Form
+
+logger = logging.getLogger(__name__)
+
+llm = get_llm_gateway()
+
+# asyncpg uses positional $n placeholders
+ASYNC_USER_CONTEXT_SQL = """
+SELECT u.id, u.email, u.full_name, f.form_type, f.status, f.submission_date
+FROM users u
+LEFT JOIN forms f ON u.id = f.user_id
+WHERE u.id = $1
+"""
+
+ASYNC_USER_SEARCH_SQL = """
+SELECT id, email, full_name, created_at,
+    GREATEST(
+        word_similarity($1, email),
+        word_similarity($1, COALESCE(full_name, ''))
+    ) AS score
+FROM users
+WHERE
+    $1 <% email OR
+    $1 <% full_name OR
+    email ILIKE $2 OR
+    full_name ILIKE $2
+ORDER BY score DESC
+LIMIT $3
+"""
+
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _authenticated_user_id(flask_app, request: Request):
+    """
+    Return the JWT identity from the Authorization header, or None.
+
+    Runs flask_jwt_extended's own verify_jwt_in_request in a request context
+    carrying the header, so only access tokens are accepted and the app's
+    blocklist, claims and user lookup callbacks apply exactly as they do for
+    @jwt_required() on the Flask routes.
+    """
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("Bearer "):
+        return None
+    try:
+        with flask_app.test_request_context(headers={"Authorization": auth_header}):
+            verify_jwt_in_request()
+            return get_jwt_identity()
+    except Exception as e:
+        logger.info(f"Rejected JWT: {str(e)}")
+        return None
+
+
+async def _search_postgresql_async(query, limit, timeout=None):
+    """Async counterpart of api.search._search_postgresql."""
+    rows = await async_execute_pg_query(
+        ASYNC_USER_SEARCH_SQL, query, f"%{_escape_like(query)}%", limit, timeout=timeout
+    )
+    return [
+        _format_user_row((row["id"], row["email"], row["full_name"], row["created_at"], row["score"]))
+        for row in rows
+    ]
+
+
+def _search_deadline():
+    """Monotonic deadline for a search started now; worker threads check it themselves."""
+    return time.monotonic() + SEARCH_DEADLINE_SECONDS
+
+
+async def _run_search(backends, query, limit):
+    """Run search coroutines under the shared deadline and merge the results."""
+    tasks = {name: asyncio.ensure_future(coro) for name, coro in backends.items()}
+    await asyncio.wait(tasks.values(), timeout=SEARCH_DEADLINE_SECONDS)
+
+    results = []
+    timed_out = []
+    for name, task in tasks.items():
+        if not task.done():
+            task.cancel()
+            timed_out.append(name)
+            logger.warning(f"Search backend {name} missed the {SEARCH_DEADLINE_SECONDS}s deadline")
+            continue
+        try:
+            results.extend(task.result())
+        except Exception as e:
+            logger.error(f"Error searching {name}: {e}")
+
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return {
+        "results": results[:limit],
+        "query": query,
+        "total": len(results),
+        "timed_out": timed_out,
+    }
+
+
+async def search(request: Request):
+    """Search across both databases."""
+    data = await request.json()
+    query = data.get("query", "")
+    limit = data.get("limit", 5)
+    return JSONResponse(await _run_search({
+        "vector_db": asyncio.to_thread(_search_vector_db, query, limit, _search_deadline()),
+        "postgresql": _search_postgresql_async(query, limit, SEARCH_DEADLINE_SECONDS),
+    }, query, limit))
+
+
+async def vector_search(request: Request):
+    """Search only in the vector database."""
+    data = await request.json()
+    query = data.get("query", "")
+    limit = data.get("limit", 5)
+    return JSONResponse(await _run_search({
+        "vector_db": asyncio.to_thread(_search_vector_db, query, limit, _search_deadline()),
+    }, query, limit))
+
+
+async def sql_search(request: Request):
+    """Search only in the PostgreSQL database."""
+    data = await request.json()
+    query = data.get("query", "")
+    limit = data.get("limit", 5)
+    return JSONResponse(await _run_search({
+        "postgresql": _search_postgresql_async(query, limit, SEARCH_DEADLINE_SECONDS),
+    }, query, limit))
+
+
+async def _build_context_async(query, user_id=None):
+    """Async counterpart of api.chat._build_context."""
+    async def vector_results():
+        try:
+            results = await asyncio.to_thread(get_vector_db().similarity_search, query, 3)
+            logger.info(f"Found {len(results)} results from vector search")
+            return results
+        except Exception as e:
+            logger.error(f"Error searching vector database: {str(e)}")
+            return []
+
+    async def user_data():
+        if not user_id:
+            return []
+        try:
+            rows = await async_execute_pg_query(ASYNC_USER_CONTEXT_SQL, user_id)
+            logger.info(f"Found {len(rows)} user-specific data points")
+            return rows
+        except Exception as e:
+            logger.error(f"Error getting user data: {str(e)}")
+            return []
+
+    vectors, users = await asyncio.gather(vector_results(), user_data())
+    return _assemble_context(vectors, users)
+
+
+async def _stream_chat_async(query, context, cache_key=None):
+    """Async counterpart of api.chat._stream_chat."""
+    yield _sse_event("sources", {"sources": context})
+
+    answer = ""
+    if llm.configured:
+        try:
+            stream = await llm.achat_completion(
+                _build_messages(query, context),
+                model=CHAT_MODEL,
+                max_tokens=500,
+                temperature=0.7,
+                stream=True
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if token:
+                    answer += token
+                    yield _sse_event("token", {"content": token})
+
+            if cache_key:
+                answer_cache.store(cache_key[0], {"answer": answer, "sources": context, "response_source": "openai"}, cache_key[1])
+            yield _sse_event("done", {"answer": answer, "response_source": "openai"})
+            return
+        except Exception as e:
+            logger.error(f"Error calling OpenAI API: {str(e)}")
+            if answer:
+                yield _sse_event("done", {"answer": answer, "response_source": "openai", "error": "Response interrupted"})
+                return
+
+    answer, response_source = _fallback_answer(context)
+    yield _sse_event("token", {"content": answer})
+    yield _sse_event("done", {"answer": answer, "response_source": response_source})
+
+
+async def chat(request: Request):
+    """Process a chat message; supports "stream": true for Server-Sent Events."""
+    try:
+        data = await request.json()
+        query = data.get("message", "")
+        user_id = data.get("user_id", None)
+        stream = data.get("stream", False) or "text/event-stream" in request.headers.get("accept", "")
+
+        if not query:
+            return JSONResponse({"error": "No message provided"}, status_code=400)
+
+        cache_key = await asyncio.to_thread(_cache_key, query, user_id) if llm.configured else None
+        if cache_key:
+            cached = answer_cache.lookup(*cache_key)
+            if cached:
+                logger.info("Returning cached answer")
+                if stream:
+                    async def replay():
+                        yield _sse_event("sources", {"sources": cached["sources"]})
+                        yield _sse_event("token", {"content": cached["answer"]})
+                        yield _sse_event("done", {"answer": cached["answer"], "response_source": cached["response_source"], "cached": True})
+                    return StreamingResponse(replay(), media_type="text/event-stream", headers=STREAM_HEADERS)
+                return JSONResponse({**cached, "cached": True})
+
+        context = await _build_context_async(query, user_id)
+
+        if stream:
+            return StreamingResponse(
+                _stream_chat_async(query, context, cache_key),
+                media_type="text/event-stream",
+                headers=STREAM_HEADERS,
+            )
+
+        if llm.configured:
+            try:
+                response = await llm.achat_completion(
+                    _build_messages(query, context),
+                    model=CHAT_MODEL,
+                    max_tokens=500,
+                    temperature=0.7
+                )
+                result = {
+                    "answer": response.choices[0].message.content,
+                    "sources": context,
+                    "response_source": "openai"
+                }
+                if cache_key:
+                    answer_cache.store(cache_key[0], result, cache_key[1])
+                return JSONResponse(result)
+            except Exception as e:
+                logger.error(f"Error calling OpenAI API: {str(e)}")
+                logger.error("Falling back to vector database response")
+
+        answer, response_source = _fallback_answer(context)
+        return JSONResponse({"answer": answer, "sources": context, "response_source": response_source})
+
+    except Exception as e:
+        logger.error(f"Error processing chat request: {str(e)}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+async def consultation_ask(request: Request):
+    """Handle AI consultation questions"""
+    data = await request.json()
+    response = await ai_service.get_response(data.get("question"))
+    return JSONResponse(response)
+
+
+def make_interview_assessment_handler(flask_app):
+    """Build the async interview assessment handler bound to the Flask app (for JWT and models)."""
+
+    def load_form_and_assessment(user_id):
+        with flask_app.app_context():
+            form = get_latest_form(user_id)
+            if not form:
+                return None, None
+            existing = get_existing_assessment(user_id, form)
+            form_info = {
+                "application_id": form.application_id,
+                "form_data": form.form_data,
+                "fingerprint": assessment_fingerprint(form.form_data),
+            }
+            existing_info = None
+            if is_assessment_current(existing, form):
+                existing_info = {
+                    "assessment": existing.assessment,
+                    "created_at": existing.created_at.isoformat(),
+                }
+            return form_info, existing_info
+
+    def store_assessment(user_id, form_info, assessment_text):
+        with flask_app.app_context():
+            form = DS160Form.query.filter_by(application_id=form_info["application_id"]).first()
+            save_assessment(user_id, form, assessment_text, fingerprint=form_info["fingerprint"])
+
+    async def interview_assessment(request: Request):
+        """Get interview assessment based on user's DS-160 forms"""
+        user_id = _authenticated_user_id(flask_app, request)
+        if user_id is None:
+            return JSONResponse({"msg": "Missing or invalid Authorization header"}, status_code=401)
+
+        force_refresh = request.query_params.get("refresh", "").lower() == "true"
+
+        try:
+            form_info, existing_info = await asyncio.to_thread(load_form_and_assessment, user_id)
+            if not form_info:
+                return JSONResponse({"error": "No DS-160 forms found"}, status_code=404)
+
+            if existing_info and not force_refresh:
+                logger.info("Returning existing assessment")
+                return JSONResponse({**existing_info, "form_data": form_info["form_data"]})
+
+            response = await llm.achat_completion(
+                assessment_messages(build_assessment_prompt(form_info["form_data"])),
+                model=ASSESSMENT_MODEL,
+                temperature=0.7,
+                max_tokens=1000,
+            )
+            assessment_text = response.choices[0].message.content
+
+            await asyncio.to_thread(store_assessment, user_id, form_info, assessment_text)
+            return JSONResponse({"assessment": assessment_text, "form_data": form_info["form_data"]})
+
+        except Exception as e:
+            logger.error(f"Error in assessment process: {str(e)}")
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+    return interview_assessment
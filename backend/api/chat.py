@@ -1,20 +1,21 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_restx import Api, Resource, Namespace
 import os
+import json
 from core.extensions import get_pg_connection, execute_pg_query
-from core.vector_db import VectorDB
+from core.vector_db import get_vector_db
+from core.semantic_cache import (
+    SemanticCache,
+    CHAT_CACHE_ENABLED,
+    CHAT_CACHE_SIMILARITY,
+    CHAT_CACHE_TTL,
+    CHAT_CACHE_MAX_ENTRIES,
+)
+from core.llm import get_llm_gateway
+from core.serialization import output_json
 from models.user import User
 import logging
 
-# Import OpenAI with new client
-try:
-    from openai import OpenAI
-    USING_NEW_CLIENT = True
-except ImportError:
-    # Fallback to old client for compatibility
-    import openai
-    USING_NEW_CLIENT = False
-
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,155 +23,276 @@ logger = logging.getLogger(__name__)
 # Create Blueprint
 chat_bp = Blueprint('chat', __name__, url_prefix='/api/chat')  # Add url_prefix to the Blueprint
 api = Api(chat_bp, version='1.0', title='Chat API', description='Chat API for visa assistant')
+api.representation('application/json')(output_json)
 ns = Namespace('', description='Chat operations')  # Empty namespace path since the blueprint already has the prefix
 api.add_namespace(ns)
 
-# Initialize VectorDB
-vector_db = VectorDB()
-
-# Get OpenAI API key from environment variable
-openai_api_key = os.getenv("OPENAI_API_KEY")
-if not openai_api_key:
+# All model calls go through the shared, rate-limited gateway
+llm = get_llm_gateway()
+if not llm.configured:
     logger.warning("OPENAI_API_KEY not found in environment variables. Chat responses will be limited.")
 else:
     logger.info("OpenAI API key found. Chat responses will use OpenAI.")
-    # Initialize OpenAI client if using new version
-    if USING_NEW_CLIENT:
-        openai_client = OpenAI(api_key=openai_api_key)
-        logger.info("Using new OpenAI client")
-    else:
-        # Set API key for old client
-        openai.api_key = openai_api_key
-        logger.info("Using legacy OpenAI client")
+
+CHAT_MODEL = "gpt-3.5-turbo"
+
+# Answers to near-duplicate questions are served from this cache
+answer_cache = SemanticCache(
+    threshold=CHAT_CACHE_SIMILARITY,
+    ttl=CHAT_CACHE_TTL,
+    max_entries=CHAT_CACHE_MAX_ENTRIES,
+)
+
+SYSTEM_PROMPT = "You are a helpful visa assistant. Use the provided context to answer the user's question accurately. If you don't know the answer, say so."
+
+
+# User-specific context for a chat query
+USER_CONTEXT_SQL = """
+SELECT u.id, u.email, u.full_name, f.form_type, f.status, f.submission_date
+FROM users u
+LEFT JOIN forms f ON u.id = f.user_id
+WHERE u.id = %s
+"""
+
+
+def _build_context(query, user_id=None):
+    """
+    Gather vector search results and user-specific data for a chat query.
+
+    Returns:
+        list: Context items with content, metadata, score and source
+    """
+    # Get search results from vector database
+    vector_results = []
+    try:
+        vector_results = get_vector_db().similarity_search(query, top_k=3)
+        logger.info(f"Found {len(vector_results)} results from vector search")
+    except Exception as e:
+        logger.error(f"Error searching vector database: {str(e)}")
+    
+    # Get user-specific data if user_id is provided
+    user_data = []
+    if user_id:
+        try:
+            # Query PostgreSQL directly instead of using Supabase client
+            user_data = execute_pg_query(USER_CONTEXT_SQL, (user_id,))
+            logger.info(f"Found {len(user_data)} user-specific data points")
+        except Exception as e:
+            logger.error(f"Error getting user data: {str(e)}")
+
+    return _assemble_context(vector_results, user_data)
+
+
+def _assemble_context(vector_results, user_data):
+    """Combine vector search results and user data into chat context items."""
+    context = []
+    
+    # Add vector search results to context
+    for result in vector_results:
+        context.append({
+            "content": result["content"],
+            "metadata": result["metadata"],
+            "score": result["score"],
+            "source": "vector_db"
+        })
+    
+    # Add user data to context if available
+    for item in user_data:
+        context.append({
+            "content": f"User {item.get('full_name', 'unknown')} has submitted a {item.get('form_type', 'unknown')} form with status {item.get('status', 'unknown')}.",
+            "metadata": item,
+            "score": 1.0,  # High relevance for user-specific data
+            "source": "user_db"
+        })
+
+    return context
+
+
+def _build_messages(query, context):
+    """Prepare the OpenAI messages for a query and its context."""
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+    ]
+    
+    # Add context to the messages
+    if context:
+        context_text = "\n\n".join([f"Source {i+1}: {item['content']}" for i, item in enumerate(context)])
+        messages.append({"role": "system", "content": f"Here is some context that might help you answer the user's question:\n\n{context_text}"})
+    
+    # Add user query
+    messages.append({"role": "user", "content": query})
+    return messages
+
+
+def _fallback_answer(context):
+    """
+    Build an answer from the context alone when OpenAI is unavailable.
+
+    Returns:
+        tuple: (answer, response_source)
+    """
+    if context:
+        answer = f"Based on my information: {context[0]['content']}"
+        if len(context) > 1:
+            answer += f"\n\nI also found: {context[1]['content']}"
+        return answer, "vector_db"  # Indicate that response came from vector database
+
+    return "I'm sorry, I couldn't find any relevant information to answer your question.", "fallback"
+
+
+def _cache_key(query, user_id):
+    """
+    Return (embedding, collection version) for the answer cache, or None when
+    the cache should be bypassed (disabled, or the answer depends on user data).
+    """
+    if not CHAT_CACHE_ENABLED or user_id:
+        return None
+    try:
+        vector_db = get_vector_db()
+        return vector_db.encode_query(query), vector_db.get_collection_version()
+    except Exception as e:
+        logger.error(f"Error preparing answer cache lookup: {str(e)}")
+        return None
+
+
+def _sse_event(event, data):
+    """Format a Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _stream_cached(cached):
+    """Replay a cached answer as Server-Sent Events."""
+    yield _sse_event("sources", {"sources": cached["sources"]})
+    yield _sse_event("token", {"content": cached["answer"]})
+    yield _sse_event("done", {"answer": cached["answer"], "response_source": cached["response_source"], "cached": True})
+
+
+def _stream_chat(query, context, cache_key=None):
+    """
+    Yield a chat answer as Server-Sent Events.
+
+    Emits one ``sources`` event with the retrieved context, a ``token`` event
+    per chunk of generated text, and a final ``done`` event with the full
+    answer and its response source.
+    """
+    yield _sse_event("sources", {"sources": context})
+
+    answer = ""
+    if llm.configured:
+        try:
+            logger.info("Calling OpenAI API (streaming)...")
+            stream = llm.chat_completion(
+                _build_messages(query, context),
+                model=CHAT_MODEL,
+                max_tokens=500,
+                temperature=0.7,
+                stream=True
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if token:
+                    answer += token
+                    yield _sse_event("token", {"content": token})
+
+            logger.info("Successfully streamed response from OpenAI")
+            if cache_key:
+                answer_cache.store(cache_key[0], {"answer": answer, "sources": context, "response_source": "openai"}, cache_key[1])
+            yield _sse_event("done", {"answer": answer, "response_source": "openai"})
+            return
+        except Exception as e:
+            logger.error(f"Error calling OpenAI API: {str(e)}")
+            if answer:
+                # Tokens were already sent; report what we have rather than switching answers
+                yield _sse_event("done", {"answer": answer, "response_source": "openai", "error": "Response interrupted"})
+                return
+            logger.error("Falling back to vector database response")
+
+    answer, response_source = _fallback_answer(context)
+    yield _sse_event("token", {"content": answer})
+    yield _sse_event("done", {"answer": answer, "response_source": response_source})
+
 
 @ns.route('')
 class ChatResource(Resource):
     def post(self):
         """
         Process a chat message and return a response
+
+        Set "stream": true in the body (or send Accept: text/event-stream) to
+        receive the answer as Server-Sent Events.
         """
         try:
             data = request.json
             query = data.get("message", "")
             user_id = data.get("user_id", None)
+            stream = data.get("stream", False) or request.accept_mimetypes.best == "text/event-stream"
             
             if not query:
                 return {"error": "No message provided"}, 400
+
+            # Serve near-duplicate questions from the semantic answer cache
+            cache_key = _cache_key(query, user_id) if llm.configured else None
+            if cache_key:
+                cached = answer_cache.lookup(*cache_key)
+                if cached:
+                    logger.info("Returning cached answer")
+                    if stream:
+                        return Response(
+                            stream_with_context(_stream_cached(cached)),
+                            mimetype="text/event-stream",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                        )
+                    return {**cached, "cached": True}
             
-            # Get search results from vector database
-            vector_results = []
-            try:
-                vector_results = vector_db.similarity_search(query, top_k=3)
-                logger.info(f"Found {len(vector_results)} results from vector search")
-            except Exception as e:
-                logger.error(f"Error searching vector database: {str(e)}")
-            
-            # Get user-specific data if user_id is provided
-            user_data = []
-            if user_id:
-                try:
-                    # Query PostgreSQL directly instead of using Supabase client
-                    sql_query = """
-                    SELECT u.id, u.email, u.full_name, f.form_type, f.status, f.submission_date
-                    FROM users u
-                    LEFT JOIN forms f ON u.id = f.user_id
-                    WHERE u.id = %s
-                    """
-                    user_data = execute_pg_query(sql_query, (user_id,))
-                    logger.info(f"Found {len(user_data)} user-specific data points")
-                except Exception as e:
-                    logger.error(f"Error getting user data: {str(e)}")
-            
-            # Combine vector search results and user data
-            context = []
-            
-            # Add vector search results to context
-            for result in vector_results:
-                context.append({
-                    "content": result["content"],
-                    "metadata": result["metadata"],
-                    "score": result["score"],
-                    "source": "vector_db"
-                })
-            
-            # Add user data to context if available
-            for item in user_data:
-                context.append({
-                    "content": f"User {item.get('full_name', 'unknown')} has submitted a {item.get('form_type', 'unknown')} form with status {item.get('status', 'unknown')}.",
-                    "metadata": item,
-                    "score": 1.0,  # High relevance for user-specific data
-                    "source": "user_db"
-                })
+            context = _build_context(query, user_id)
+
+            if stream:
+                return Response(
+                    stream_with_context(_stream_chat(query, context, cache_key)),
+                    mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                )
             
             # If OpenAI API key is available, use it to generate a response
-            if openai_api_key:
-                # Prepare messages for OpenAI
-                messages = [
-                    {"role": "system", "content": "You are a helpful visa assistant. Use the provided context to answer the user's question accurately. If you don't know the answer, say so."},
-                ]
-                
-                # Add context to the messages
-                if context:
-                    context_text = "\n\n".join([f"Source {i+1}: {item['content']}" for i, item in enumerate(context)])
-                    messages.append({"role": "system", "content": f"Here is some context that might help you answer the user's question:\n\n{context_text}"})
-                
-                # Add user query
-                messages.append({"role": "user", "content": query})
+            if llm.configured:
+                messages = _build_messages(query, context)
                 
                 # Call OpenAI API
                 try:
                     logger.info("Calling OpenAI API...")
                     
-                    if USING_NEW_CLIENT:
-                        # Use new OpenAI client
-                        response = openai_client.chat.completions.create(
-                            model="gpt-3.5-turbo",
-                            messages=messages,
-                            max_tokens=500,
-                            temperature=0.7
-                        )
-                        answer = response.choices[0].message.content
-                    else:
-                        # Use legacy OpenAI client
-                        response = openai.ChatCompletion.create(
-                            model="gpt-3.5-turbo",
-                            messages=messages,
-                            max_tokens=500,
-                            temperature=0.7
-                        )
-                        answer = response.choices[0].message.content
+                    response = llm.chat_completion(
+                        messages,
+                        model=CHAT_MODEL,
+                        max_tokens=500,
+                        temperature=0.7
+                    )
+                    answer = response.choices[0].message.content
                     
                     logger.info("Successfully received response from OpenAI")
                     
-                    return {
+                    result = {
                         "answer": answer,
                         "sources": context,
                         "response_source": "openai"  # Indicate that response came from OpenAI
                     }
+                    if cache_key:
+                        answer_cache.store(cache_key[0], result, cache_key[1])
+                    return result
                 except Exception as e:
                     logger.error(f"Error calling OpenAI API: {str(e)}")
                     logger.error("Falling back to vector database response")
                     # Fall back to basic response if OpenAI fails
             
             # If OpenAI is not available or fails, use a basic response based on the context
-            if context:
-                answer = f"Based on my information: {context[0]['content']}"
-                if len(context) > 1:
-                    answer += f"\n\nI also found: {context[1]['content']}"
-                
-                return {
-                    "answer": answer,
-                    "sources": context,
-                    "response_source": "vector_db"  # Indicate that response came from vector database
-                }
-            else:
-                answer = "I'm sorry, I couldn't find any relevant information to answer your question."
-                
-                return {
-                    "answer": answer,
-                    "sources": [],
-                    "response_source": "fallback"  # Indicate that response is a fallback
-                }
+            answer, response_source = _fallback_answer(context)
+            return {
+                "answer": answer,
+                "sources": context,
+                "response_source": response_source
+            }
             
         except Exception as e:
             logger.error(f"Error processing chat request: {str(e)}")
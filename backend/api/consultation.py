@@ -1,7 +1,7 @@
 from flask_restx import Namespace, Resource, fields
 from flask import request, jsonify
 from services.ai import AIService
-import asyncio
+from core.async_runtime import run_async
 
 api = Namespace("consultation", description="AI Consultation API")
 ai_service = AIService()
@@ -24,7 +24,7 @@ class AskQuestionResource(Resource):
         """Handle AI consultation questions"""
         data = request.json
         question = data.get("question")
-        response = asyncio.run(ai_service.get_response(question))
+        response = run_async(ai_service.get_response(question))
         return jsonify(response)
 
 
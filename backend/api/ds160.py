@@ -5,9 +5,40 @@ from flask_cors import cross_origin
 from models.ds160 import DS160Form, DS160FormTranslation
 from models.user import User
 from models.interview_assessment import InterviewAssessment
+from models.background_job import BackgroundJob
+from services.ds160_tasks import enqueue_form_translation, enqueue_interview_assessment
+from services.interview_assessment import (
+    generate_assessment,
+    get_latest_form,
+    get_existing_assessment,
+    is_assessment_current,
+    save_assessment,
+)
 from core.extensions import db
-import openai
-from openai import OpenAI
+from core.pagination import (
+    page_params,
+    keyset_paginate,
+    parse_fields,
+    wants_field,
+    defer_unrequested,
+    project,
+    paginated_response,
+)
+from core.http_cache import etag_for, cache_headers, not_modified
+from core.serialization import stream_json_list
+from services.form_patch import (
+    MERGE_PATCH,
+    PATCH_FORMATS,
+    apply_form_patch,
+    FormNotFound,
+    FormNotEditable,
+    VersionConflict,
+    InvalidPatch,
+)
+from sqlalchemy.orm import defer, selectinload
+from sqlalchemy.orm.exc import StaleDataError
+from werkzeug.http import quote_etag
+import re
 import os
 import logging
 
@@ -15,17 +46,6 @@ logger = logging.getLogger(__name__)
 
 api = Namespace("ds160", description="DS-160 API")
 
-# Configure OpenAI
-openai_api_key = os.getenv("OPENAI_API_KEY")
-USING_NEW_CLIENT = os.getenv("USING_NEW_OPENAI_CLIENT", "true").lower() == "true"
-
-if USING_NEW_CLIENT:
-    openai_client = OpenAI(api_key=openai_api_key)
-    logger.info("Using new OpenAI client for DS-160 assessment")
-else:
-    openai.api_key = openai_api_key
-    logger.info("Using legacy OpenAI client for DS-160 assessment")
-
 logger.info("Begin DS-160 API registration")
 
 # Allowed origins
@@ -118,43 +138,13 @@ class DS160FormResource(Resource):
         logger.info(f"Form status after creation: {status}, Will create translation: {status == 'submitted'}")
         
         # If the form is being submitted (not just saved as draft),
-        # create an English translation version
+        # queue an English translation to be produced in the background
+        translation_job = None
+        assessment_job = None
         if status == 'submitted':
-            print(f"Status is 'submitted', proceeding with translation")
-            logger.info("Status is 'submitted', proceeding with translation")
-            try:
-                # Import the translation service
-                from services.translation import translate_form_data
-                
-                # Log before translation
-                logger.info(f"Starting translation for application_id: {form.application_id}")
-                print("Starting form translation process...")
-                
-                # Translate the form data to English
-                english_form_data = translate_form_data(form_data, source_lang='zh', target_lang='en')
-                print(f"Translation completed, creating translation record")
-                logger.info(f"Translation completed successfully")
-                
-                # Verify DS160FormTranslation model is available
-                logger.info(f"Translation model class: {DS160FormTranslation.__name__}")
-                
-                # Create a new translation record in the dedicated translations table
-                translation = DS160FormTranslation(
-                    original_form_application_id=form.application_id,
-                    form_data=english_form_data
-                )
-                
-                # Log translation object
-                logger.info(f"Created translation object with application_id: {form.application_id}")
-                
-                db.session.add(translation)
-                logger.info(f"Added translation to session for form with application_id: {application_id}")
-            except Exception as e:
-                logger.error(f"Error creating English translation: {str(e)}")
-                # Print the full stack trace for debugging
-                import traceback
-                logger.error(f"Traceback: {traceback.format_exc()}")
-                # Continue even if translation fails - we still want to save the original form
+            logger.info("Status is 'submitted', queueing translation and interview assessment")
+            translation_job = enqueue_form_translation(form.application_id, user_id=user.id)
+            assessment_job = enqueue_interview_assessment(form.application_id, user_id=user.id)
         else:
             logger.info(f"Form status is '{status}', not 'submitted', skipping translation")
         
@@ -170,7 +160,12 @@ class DS160FormResource(Resource):
             return {"error": "Failed to save form"}, 500
         
         # Return the complete form data including the application_id
-        return form.to_dict(), 201
+        result = form.to_dict()
+        if translation_job:
+            result['translation_job_id'] = translation_job.id
+        if assessment_job:
+            result['assessment_job_id'] = assessment_job.id
+        return result, 201
 
 
 @api.route("/users")
@@ -186,24 +181,65 @@ class DS160UsersResource(Resource):
             if not current_user or current_user.role != 'admin':
                 return {"error": "Unauthorized"}, 403
             
-            # Get all users
-            users = User.query.all()
+            try:
+                limit, cursor = page_params(request.args)
+                users, next_cursor = keyset_paginate(
+                    User.query, User.created_at, User.id, limit, cursor
+                )
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            fields = parse_fields(request.args)
             user_list = [
-                {
+                project({
                     "id": str(user.id),
                     "username": user.username,
                     "email": user.email
-                }
+                }, fields)
                 for user in users
             ]
             
-            print('DS160 Users List:', user_list)
-            return user_list, 200
+            print(f'DS160 Users List: {len(user_list)} users')
+            return paginated_response(user_list, next_cursor)
         except Exception as e:
             print(f"Error fetching users: {str(e)}")
             return {"error": str(e)}, 500
 
 
+# Form ETags carry the version so If-Match can be checked without a read.
+# They are strong validators: If-Match uses the strong comparison function.
+# Compressed responses carry a content-coding suffix (see core.compression)
+FORM_ETAG_PATTERN = re.compile(r'^ds160-form-v(\d+)(?:-(?:gzip|br))?$')
+
+
+def _form_etag(version):
+    """ETag value of a DS-160 form at ``version``."""
+    return f"ds160-form-v{version}"
+
+
+def _expected_form_version():
+    """
+    Version a conditional write is based on.
+
+    Weak If-Match validators never match (RFC 9110 strong comparison), so a
+    W/"..." tag is treated like any other non-matching tag and gets 412.
+
+    Returns:
+        tuple: (version or None, "If-Match" or "version")
+    """
+    for tag in request.if_match.as_set():
+        match = FORM_ETAG_PATTERN.match(tag)
+        if match:
+            return int(match.group(1)), "If-Match"
+    if request.if_match:
+        return -1, "If-Match"
+
+    version = request.args.get("version")
+    if version is not None and version.isdigit():
+        return int(version), "version"
+    return None, None
+
+
 @api.route("/form/<string:application_id>")
 class DS160FormDetailResource(Resource):
     def options(self, application_id):
@@ -214,14 +250,19 @@ class DS160FormDetailResource(Resource):
             headers = {
                 'Access-Control-Allow-Origin': origin,
                 'Access-Control-Allow-Headers': '*',
-                'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS'
+                'Access-Control-Allow-Methods': 'GET,POST,PUT,PATCH,DELETE,OPTIONS'
             }
         return {'success': True}, 200, headers
 
     def get(self, application_id):
-        """Retrieve a DS-160 form"""
+        """Retrieve a DS-160 form (supports If-None-Match)"""
         try:
-            form = DS160Form.query.filter_by(application_id=application_id).first()
+            # form_data is only loaded once we know the client's copy is stale
+            form = (
+                DS160Form.query.options(defer(DS160Form.form_data))
+                .filter_by(application_id=application_id)
+                .first()
+            )
             print('DS160 Form:', form)
             if not form:
                 return {"error": "Form not found"}, 404
@@ -236,7 +277,12 @@ class DS160FormDetailResource(Resource):
                     'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS'
                 }
 
-            return form.to_dict(), 200, headers
+            etag = _form_etag(form.version)
+            cached = not_modified(etag, headers, weak=False)
+            if cached:
+                return cached
+
+            return form.to_dict(), 200, {**headers, **cache_headers(etag, weak=False)}
 
         except Exception as e:
             logger.error(f"Error retrieving form: {str(e)}")
@@ -256,6 +302,8 @@ class DS160FormDetailResource(Resource):
                 
             # Store the original status before update
             original_status = form.status
+            translation_job = None
+            assessment_job = None
             
             # Update form data
             if 'form_data' in data:
@@ -270,44 +318,12 @@ class DS160FormDetailResource(Resource):
                 form.status = data['status']
                 logger.info(f"Updating form status from {original_status} to {data['status']}")
                 
-                # If status is being changed to 'submitted', create translation
+                # If status is being changed to 'submitted', queue a translation
                 if data['status'] == 'submitted' and original_status != 'submitted':
-                    logger.info("Form status changed to 'submitted', creating translation")
-                    try:
-                        # Import the translation service
-                        from services.translation import translate_form_data
-                        
-                        # Log form data before translation
-                        logger.info(f"Form data before translation: {form.form_data}")
-                        
-                        # Translate the form data to English
-                        english_form_data = translate_form_data(form.form_data, source_lang='zh', target_lang='en')
-                        
-                        # Log translation result
-                        logger.info(f"Translation result: {english_form_data}")
-                        
-                        # Create a new translation record
-                        translation = DS160FormTranslation(
-                            original_form_application_id=form.application_id,
-                            form_data=english_form_data
-                        )
-                        
-                        # Log translation object details
-                        logger.info(f"Translation object created with: original_form_application_id={translation.original_form_application_id}")
-                        logger.info(f"Translation form_data: {translation.form_data}")
-                        
-                        db.session.add(translation)
-                        logger.info("Added translation to session")
-                        
-                        # Flush to detect any database errors early
-                        db.session.flush()
-                        logger.info("Session flushed successfully")
-                        
-                    except Exception as e:
-                        logger.error(f"Error creating English translation: {str(e)}")
-                        import traceback
-                        logger.error(f"Traceback: {traceback.format_exc()}")
-                        # Continue even if translation fails - we still want to save the form status
+                    logger.info("Form status changed to 'submitted', queueing translation and interview assessment")
+                    # PUT is unauthenticated, so the jobs belong to the form's owner
+                    translation_job = enqueue_form_translation(form.application_id, user_id=form.user_id)
+                    assessment_job = enqueue_interview_assessment(form.application_id, user_id=form.user_id)
 
             # Commit changes to database
             db.session.commit()
@@ -323,13 +339,79 @@ class DS160FormDetailResource(Resource):
                     'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS'
                 }
 
-            return form.to_dict(), 200, headers
+            result = form.to_dict()
+            if translation_job:
+                result['translation_job_id'] = translation_job.id
+            if assessment_job:
+                result['assessment_job_id'] = assessment_job.id
+            headers['ETag'] = quote_etag(_form_etag(form.version))
+            return result, 200, headers
 
+        except StaleDataError:
+            db.session.rollback()
+            return {"error": "Form was modified concurrently, reload and retry"}, 409
         except Exception as e:
             logger.error(f"Error updating form: {str(e)}")
             db.session.rollback()  # Rollback on error
             return {"error": str(e)}, 500
 
+    @jwt_required()
+    def patch(self, application_id):
+        """
+        Partially update one of the current user's draft DS-160 forms
+
+        Only forms created by or for the caller can be patched; other forms
+        are reported as not found.
+
+        Send an RFC 6902 JSON Patch (Content-Type: application/json-patch+json)
+        or an RFC 7396 merge patch (application/merge-patch+json). The version
+        the patch is based on must be given as If-Match (the form's ETag) or
+        ?version=; a stale version is rejected with 412 (If-Match) or 409.
+        """
+        origin = request.headers.get('Origin')
+        headers = {}
+        if origin in ALLOWED_ORIGINS:
+            headers = {
+                'Access-Control-Allow-Origin': origin,
+                'Access-Control-Allow-Headers': '*',
+                'Access-Control-Allow-Methods': 'GET,POST,PUT,PATCH,DELETE,OPTIONS'
+            }
+
+        if request.mimetype not in PATCH_FORMATS:
+            return {"error": f"Content-Type must be one of: {', '.join(PATCH_FORMATS)}"}, 415, headers
+
+        expected_version, version_source = _expected_form_version()
+        if expected_version is None:
+            return {"error": "If-Match header or version parameter required"}, 428, headers
+
+        patch = request.get_json(force=True, silent=True)
+        if patch is None:
+            return {"error": "Invalid JSON body"}, 400, headers
+        if request.mimetype == MERGE_PATCH and not isinstance(patch, dict):
+            return {"error": "Merge patch must be a JSON object"}, 400, headers
+
+        try:
+            result = apply_form_patch(
+                application_id, patch, request.mimetype, expected_version, user_id=int(get_jwt_identity())
+            )
+        except FormNotFound:
+            return {"error": "Form not found"}, 404, headers
+        except FormNotEditable as e:
+            return {"error": f"Only draft forms can be patched (status: {e})"}, 409, headers
+        except VersionConflict as e:
+            status = 412 if version_source == "If-Match" else 409
+            return {"error": "Form has been modified", "version": e.current_version}, status, headers
+        except InvalidPatch as e:
+            db.session.rollback()
+            return {"error": f"Invalid patch: {str(e)}"}, 422, headers
+        except Exception as e:
+            logger.error(f"Error patching form: {str(e)}")
+            db.session.rollback()
+            return {"error": str(e)}, 500, headers
+
+        headers['ETag'] = quote_etag(_form_etag(result['version']))
+        return result, 200, headers
+
 
 @api.route("/user/forms")
 class UserDS160FormsResource(Resource):
@@ -337,12 +419,17 @@ class UserDS160FormsResource(Resource):
     def get(self):
         """Get all DS-160 forms for the current user"""
         current_user_id = get_jwt_identity()
+        fields = parse_fields(request.args)
         forms = (
-            DS160Form.query.filter_by(target_user_id=current_user_id)
+            defer_unrequested(
+                DS160Form.query.filter_by(target_user_id=current_user_id),
+                fields,
+                DS160Form.form_data,
+            )
             .order_by(DS160Form.created_at.desc())
             .all()
         )
-        return [form.to_dict() for form in forms]
+        return stream_json_list(form.to_dict(fields) for form in forms)
 
 
 @api.route("/admin/forms")
@@ -358,71 +445,37 @@ class AdminDS160FormsResource(Resource):
         #if not user or not user.is_admin:
         #    return {"error": "Unauthorized. Admin access required."}, 403
             
-        # Get all forms ordered by creation date
-        forms = (
-            DS160Form.query
-            .order_by(DS160Form.created_at.desc())
-            .all()
+        # Get forms ordered by creation date, optionally one page at a time
+        fields = parse_fields(request.args)
+        try:
+            limit, cursor = page_params(request.args)
+            forms, next_cursor = keyset_paginate(
+                defer_unrequested(DS160Form.query, fields, DS160Form.form_data),
+                DS160Form.created_at,
+                DS160Form.id,
+                limit,
+                cursor,
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return paginated_response(
+            (form.to_dict(fields) for form in forms), next_cursor
         )
-        
-        return [form.to_dict() for form in forms]
 
 
 @api.route("/interview-assessment")
 class InterviewAssessmentResource(Resource):
-    def _generate_assessment_with_new_client(self, prompt: str) -> str:
-        """Generate assessment using the new OpenAI client"""
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an experienced US visa interview assessment expert.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-            max_tokens=1000,
-        )
-        return response.choices[0].message.content
-
-    def _generate_assessment_with_legacy_client(self, prompt: str) -> str:
-        """Generate assessment using the legacy OpenAI client"""
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an experienced US visa interview assessment expert.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-            max_tokens=1000,
-        )
-        return response.choices[0].message.content
-
     def _generate_and_save_assessment(
-        self, current_user_id: int, latest_form: DS160Form, prompt: str
+        self, current_user_id: int, latest_form: DS160Form
     ) -> dict:
         """Generate a new assessment and save it to the database"""
         try:
-            # Generate assessment using appropriate client
-            if USING_NEW_CLIENT:
-                assessment_text = self._generate_assessment_with_new_client(prompt)
-                logger.info("Generated assessment using new OpenAI client")
-            else:
-                assessment_text = self._generate_assessment_with_legacy_client(prompt)
-                logger.info("Generated assessment using legacy OpenAI client")
+            assessment_text = generate_assessment(latest_form.form_data)
+            logger.info("Generated assessment")
 
             # Create a new assessment record
-            assessment = InterviewAssessment(
-                user_id=current_user_id,
-                ds160_form_id=latest_form.application_id,
-                assessment=assessment_text,
-            )
-            db.session.add(assessment)
-            db.session.commit()
+            save_assessment(current_user_id, latest_form, assessment_text)
 
             return {"assessment": assessment_text, "form_data": latest_form.form_data}
         except Exception as e:
@@ -436,27 +489,18 @@ class InterviewAssessmentResource(Resource):
         force_refresh = request.args.get("refresh", "").lower() == "true"
 
         # Get the most recent form
-        latest_form = (
-            DS160Form.query.filter_by(user_id=current_user_id)
-            .order_by(DS160Form.created_at.desc())
-            .first()
-        )
+        latest_form = get_latest_form(current_user_id)
 
         if not latest_form:
             return {"error": "No DS-160 forms found"}, 404
 
         try:
             # Check if we already have an assessment for this form
-            existing_assessment = (
-                InterviewAssessment.query.filter_by(
-                    user_id=current_user_id, ds160_form_id=latest_form.application_id
-                )
-                .order_by(InterviewAssessment.created_at.desc())
-                .first()
-            )
+            existing_assessment = get_existing_assessment(current_user_id, latest_form)
 
-            # If we have an existing assessment and don't need to refresh, return it
-            if existing_assessment and not force_refresh:
+            # Return the stored assessment unless the fields it was built from
+            # have changed or a refresh was requested
+            if is_assessment_current(existing_assessment, latest_form) and not force_refresh:
                 logger.info("Returning existing assessment")
                 return {
                     "assessment": existing_assessment.assessment,
@@ -464,32 +508,7 @@ class InterviewAssessmentResource(Resource):
                     "created_at": existing_assessment.created_at.isoformat(),
                 }
 
-            # Prepare the prompt for OpenAI
-            prompt = f"""Based on the following DS-160 visa application information, provide a comprehensive interview assessment. 
-            Consider the following aspects:
-            1. Application Strength (评估申请优势)
-            2. Potential Risk Factors (潜在风险因素)
-            3. Suggested Preparation Points (建议准备要点)
-            4. Overall Success Probability (总体通过概率)
-
-            Applicant Information:
-            - Name: {latest_form.form_data.get('surname', '')} {latest_form.form_data.get('givenName', '')}
-            - Purpose of Trip: {latest_form.form_data.get('purposeOfTrip', '')}
-            - Specific Purpose: {latest_form.form_data.get('specificPurpose', '')}
-            - Occupation: {latest_form.form_data.get('primaryOccupation', '')}
-            - Employer/School: {latest_form.form_data.get('employer', '')}
-            - Monthly Income: {latest_form.form_data.get('monthlyIncome', '')}
-            - Previous US Visa: {latest_form.form_data.get('previousUsVisa', False)}
-            - Travel Plans: Staying for {latest_form.form_data.get('intendedLengthOfStay', '')}
-            - US Point of Contact: {latest_form.form_data.get('pointOfContact', '')}
-            - Relationship to Contact: {latest_form.form_data.get('relationshipToContact', '')}
-
-            Please provide the assessment in Chinese language with clear sections and detailed explanations.
-            """
-
-            return self._generate_and_save_assessment(
-                current_user_id, latest_form, prompt
-            )
+            return self._generate_and_save_assessment(current_user_id, latest_form)
 
         except Exception as e:
             logger.error(f"Error in assessment process: {str(e)}")
@@ -500,13 +519,20 @@ class DS160ClientResource(Resource):
     @jwt_required()
     def get(self, application_id):
         """Get DS-160 form translation data formatted for the Chrome extension"""        
-        # Find the translation
-        translation = DS160FormTranslation.query.filter_by(
-            original_form_application_id=application_id
-        ).first()
+        # Find the translation; form_data is only loaded if the client's copy is stale
+        translation = (
+            DS160FormTranslation.query.options(defer(DS160FormTranslation.form_data))
+            .filter_by(original_form_application_id=application_id)
+            .first()
+        )
         
         if not translation:
             return {"error": "Translation not found for this form"}, 404
+
+        etag = etag_for("ds160-client", application_id, translation.updated_at)
+        cached = not_modified(etag)
+        if cached:
+            return cached
         
         # Format the translation data for the extension
         client_data = {
@@ -519,7 +545,7 @@ class DS160ClientResource(Resource):
             client_data["translation_created_at"] = translation.created_at.isoformat()
             client_data["translation_updated_at"] = translation.updated_at.isoformat()
         
-        return client_data
+        return client_data, 200, cache_headers(etag)
 
 @api.route("/client/all")
 class DS160ClientAllResource(Resource):
@@ -527,20 +553,30 @@ class DS160ClientAllResource(Resource):
     def get(self):
         """Get all DS-160 form translations"""
         try:
-            # Query all translations ordered by updated_at date (most recent first)
-            translations = DS160FormTranslation.query.order_by(DS160FormTranslation.updated_at.desc()).all()
-            
-            if not translations:
-                return [], 200
+            # Query translations ordered by updated_at date (most recent first),
+            # loading only the columns the listing needs rather than form_data
+            try:
+                limit, cursor = page_params(request.args)
+                translations, next_cursor = keyset_paginate(
+                    DS160FormTranslation.query.with_entities(
+                        DS160FormTranslation.original_form_application_id,
+                        DS160FormTranslation.updated_at,
+                    ),
+                    DS160FormTranslation.updated_at,
+                    DS160FormTranslation.original_form_application_id,
+                    limit,
+                    cursor,
+                )
+            except ValueError as e:
+                return {"error": str(e)}, 400
             
             # Format the response similar to the single application endpoint
-            result = []
-            for translation in translations:
-                result.append({
-                    "application_id": translation.original_form_application_id
-                })
+            result = [
+                {"application_id": translation.original_form_application_id}
+                for translation in translations
+            ]
             
-            return result, 200
+            return paginated_response(result, next_cursor)
             
         except Exception as e:
             logger.error(f"Error retrieving translations: {str(e)}")
@@ -553,13 +589,20 @@ class DS160ClientDataByApplicationIDResource(Resource):
         """Get DS-160 form data formatted for the Chrome extension by application_id"""
         current_user_id = get_jwt_identity()
         
-        # Find the form by application_id
-        form = DS160Form.query.filter_by(
-            application_id=application_id, user_id=current_user_id
-        ).first()
+        # Find the form by application_id; form_data is only loaded if the client's copy is stale
+        form = (
+            DS160Form.query.options(defer(DS160Form.form_data))
+            .filter_by(application_id=application_id, user_id=current_user_id)
+            .first()
+        )
         
         if not form:
             return {"error": "Form not found with the given application ID"}, 404
+
+        etag = etag_for("ds160-client-data", form.id, form.version)
+        cached = not_modified(etag)
+        if cached:
+            return cached
         
         # Format the form data for the extension - return flat structure
         client_data = {
@@ -571,7 +614,7 @@ class DS160ClientDataByApplicationIDResource(Resource):
         if form.form_data:
             client_data.update(form.form_data)
         
-        return client_data
+        return client_data, 200, cache_headers(etag)
 
 @api.route("/events")
 class DS160EventResource(Resource):
@@ -598,12 +641,13 @@ class InterviewAssessmentHistoryResource(Resource):
     def get(self):
         """Get all interview assessments for the current user"""
         current_user_id = get_jwt_identity()
-        assessments = (
-            InterviewAssessment.query.filter_by(user_id=current_user_id)
-            .order_by(InterviewAssessment.created_at.desc())
-            .all()
-        )
-        return [assessment.to_dict() for assessment in assessments]
+        fields = parse_fields(request.args)
+        query = InterviewAssessment.query.filter_by(user_id=current_user_id)
+        if wants_field(fields, "form_data"):
+            # Load every referenced form in one extra query instead of one per row
+            query = query.options(selectinload(InterviewAssessment.ds160_form))
+        assessments = query.order_by(InterviewAssessment.created_at.desc()).all()
+        return stream_json_list(assessment.to_dict(fields) for assessment in assessments)
 
     @jwt_required()
     def post(self):
@@ -699,26 +743,47 @@ class DS160FormByApplicationIDResource(Resource):
         return form.to_dict()
 
 
+@api.route("/jobs/<int:job_id>")
+class DS160JobStatusResource(Resource):
+    @jwt_required()
+    def get(self, job_id):
+        """Get the status of one of the current user's background jobs, e.g. a form translation"""
+        job = db.session.get(BackgroundJob, job_id)
+        # Other users' jobs are reported as missing rather than forbidden
+        if not job or job.user_id is None or str(job.user_id) != str(get_jwt_identity()):
+            return {"error": "Job not found"}, 404
+        return job.to_dict(), 200
+
+
 @api.route("/form/<string:application_id>/translation")
 class DS160FormTranslationResource(Resource):
     """Resource to handle DS-160 form translations"""
     
     def get(self, application_id):
-        """Retrieve the English translation for a specific DS-160 form"""
+        """Retrieve the English translation for a specific DS-160 form (supports If-None-Match)"""
         # First check if the original form exists
-        original_form = DS160Form.query.filter_by(
-            application_id=application_id
-        ).first()
+        original_form = (
+            DS160Form.query.options(defer(DS160Form.form_data))
+            .filter_by(application_id=application_id)
+            .first()
+        )
         if not original_form:
             return {"error": "Original form not found"}, 404
             
-        # Find the translation for this form
-        translation = DS160FormTranslation.query.filter_by(
-            original_form_application_id=original_form.application_id
-        ).first()
+        # Find the translation for this form; form_data is only loaded if the client's copy is stale
+        translation = (
+            DS160FormTranslation.query.options(defer(DS160FormTranslation.form_data))
+            .filter_by(original_form_application_id=original_form.application_id)
+            .first()
+        )
         
         if not translation:
             return {"error": "No translation found for this form"}, 404
+
+        etag = etag_for("ds160-translation", application_id, translation.updated_at)
+        cached = not_modified(etag)
+        if cached:
+            return cached
             
         # Return the translation data
-        return translation.to_dict(), 200
+        return translation.to_dict(), 200, cache_headers(etag)
@@ -5,6 +5,15 @@ from models.evaluation import EvaluationResult
 from models.user import User, UserRole
 from models.temp_credentials import TempUserCredential
 from core.extensions import db
+from core.serialization import stream_json_list
+from core.pagination import (
+    page_params,
+    keyset_paginate,
+    parse_fields,
+    defer_unrequested,
+    project,
+    paginated_response,
+)
 import logging
 import random
 import string
@@ -68,10 +77,23 @@ class EvaluationResultsResource(Resource):
         if not user or user.role != 'admin':
             return {"error": "Unauthorized. Admin access required."}, 403
             
-        # Get all evaluation results
-        results = EvaluationResult.query.order_by(EvaluationResult.created_at.desc()).all()
-        
-        return [result.to_dict() for result in results], 200
+        # Get evaluation results, optionally one page at a time
+        fields = parse_fields(request.args)
+        try:
+            limit, cursor = page_params(request.args)
+            results, next_cursor = keyset_paginate(
+                defer_unrequested(EvaluationResult.query, fields, EvaluationResult.form_data),
+                EvaluationResult.created_at,
+                EvaluationResult.id,
+                limit,
+                cursor,
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return paginated_response(
+            (result.to_dict(fields) for result in results), next_cursor
+        )
         
 @api.route('/results/user')
 class UserEvaluationResultsResource(Resource):
@@ -85,9 +107,14 @@ class UserEvaluationResultsResource(Resource):
         if not user:
             return {"error": "User not found"}, 404
             
-        results = EvaluationResult.query.filter_by(email=user.email).order_by(EvaluationResult.created_at.desc()).all()
+        fields = parse_fields(request.args)
+        results = (
+            defer_unrequested(EvaluationResult.query.filter_by(email=user.email), fields, EvaluationResult.form_data)
+            .order_by(EvaluationResult.created_at.desc())
+            .all()
+        )
         
-        return [result.to_dict() for result in results], 200
+        return stream_json_list(result.to_dict(fields) for result in results)
         
 @api.route('/create-user')
 class CreateUserFromEvaluationResource(Resource):
@@ -182,10 +209,19 @@ class TempCredentialsResource(Resource):
         if not admin_user or admin_user.role != UserRole.ADMIN:
             return {"error": "Unauthorized. Admin access required."}, 403
             
-        # Get all temp credentials
-        credentials = TempUserCredential.query.order_by(TempUserCredential.created_at.desc()).all()
-        
-        return [cred.to_dict() for cred in credentials], 200
+        # Get temp credentials, optionally one page at a time
+        try:
+            limit, cursor = page_params(request.args)
+            credentials, next_cursor = keyset_paginate(
+                TempUserCredential.query, TempUserCredential.created_at, TempUserCredential.id, limit, cursor
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        fields = parse_fields(request.args)
+        return paginated_response(
+            (project(cred.to_dict(), fields) for cred in credentials), next_cursor
+        )
         
     @jwt_required()
     def post(self):
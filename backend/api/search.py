@@ -1,17 +1,27 @@
 """
 Search API endpoints for both Supabase PostgreSQL and Zilliz Cloud.
-Uses direct connections similar to the test scripts.
 """
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from flask_restx import Namespace, Resource, fields
 from flask import request
 import os
-import psycopg2
-from core.vector_db import VectorDB
+from core.extensions import get_pg_connection
+from core.vector_db import get_vector_db
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Deadline shared by both backends in the combined search
+SEARCH_DEADLINE_SECONDS = float(os.getenv("SEARCH_DEADLINE_SECONDS", "3"))
+
+# Thread pool used to query the vector and SQL backends concurrently
+_search_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SEARCH_MAX_WORKERS", "16")),
+    thread_name_prefix="search",
+)
+
 # Create namespace
 api = Namespace("search", description="Search operations")
 
@@ -41,14 +51,117 @@ search_response = api.model(
         "results": fields.List(fields.Nested(search_result), description="Search results"),
         "query": fields.String(description="Original query"),
         "total": fields.Integer(description="Total number of results"),
+        "timed_out": fields.List(fields.String, description="Backends that missed the search deadline"),
     },
 )
 
 
+def _search_vector_db(query, limit, deadline=None):
+    """
+    Search the shared vector database.
+
+    Args:
+        deadline: Optional time.monotonic() value the search must finish by
+
+    Returns:
+        list: Results formatted for the search response
+    """
+    results = []
+    vector_results = get_vector_db().similarity_search(query, top_k=limit, deadline=deadline)
+
+    # Format vector results
+    for result in vector_results:
+        results.append(
+            {
+                "id": str(result["metadata"].get("id", "unknown")),
+                "content": result["content"],
+                "metadata": result["metadata"],
+                "score": float(result["score"]),
+                "source": "vector_db",
+            }
+        )
+
+    return results
+
+
+def _escape_like(value):
+    """Escape LIKE wildcards so user input is matched literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _format_user_row(row):
+    """Format an (id, email, full_name, created_at, score) row for the search response."""
+    return {
+        "id": str(row[0]),
+        "content": f"User: {row[2]} ({row[1]})",
+        "metadata": {
+            "email": row[1],
+            "full_name": row[2],
+            "created_at": row[3].isoformat() if row[3] else None,
+        },
+        "score": float(row[4]),
+        "source": "postgresql",
+    }
+
+
+def _search_postgresql(query, limit, timeout=None):
+    """
+    Search users in PostgreSQL using a pooled connection.
+
+    Matches use the pg_trgm GIN indexes from migrations/0001_users_trigram_search.sql
+    and are ranked by trigram word similarity, a 0-1 score comparable with the
+    cosine scores returned by the vector database.
+
+    Args:
+        timeout: Optional statement timeout in seconds. A query abandoned at
+            the search deadline is cancelled by the server instead of holding
+            its pooled connection until it completes.
+
+    Returns:
+        list: Results formatted for the search response
+    """
+    results = []
+    pattern = f"%{_escape_like(query)}%"
+
+    with get_pg_connection() as conn:
+        cursor = conn.cursor()
+
+        if timeout is not None:
+            # Scoped to this transaction; the pool rolls it back on return
+            cursor.execute("SET LOCAL statement_timeout = %s", (max(int(timeout * 1000), 1),))
+
+        cursor.execute(
+            """
+            SELECT id, email, full_name, created_at,
+                GREATEST(
+                    word_similarity(%(query)s, email),
+                    word_similarity(%(query)s, COALESCE(full_name, ''))
+                ) AS score
+            FROM users
+            WHERE
+                %(query)s <%% email OR
+                %(query)s <%% full_name OR
+                email ILIKE %(pattern)s OR
+                full_name ILIKE %(pattern)s
+            ORDER BY score DESC
+            LIMIT %(limit)s
+            """,
+            {"query": query, "pattern": pattern, "limit": limit},
+        )
+
+        # Process results
+        for row in cursor.fetchall():
+            results.append(_format_user_row(row))
+
+        cursor.close()
+
+    return results
+
+
 @api.route("")
 class Search(Resource):
     @api.expect(search_model)
-    @api.marshal_with(search_response)
+    @api.response(200, "Success", search_response)
     def post(self):
         """
         Search across both databases.
@@ -57,72 +170,28 @@ class Search(Resource):
         query = data.get("query", "")
         limit = data.get("limit", 5)
 
-        # Initialize results
-        results = []
-
-        # Search vector database
-        try:
-            # Initialize VectorDB directly (like in test_Zilliz_connection.py)
-            vector_db = VectorDB()
-            vector_results = vector_db.similarity_search(query, top_k=limit)
-
-            # Format vector results
-            for result in vector_results:
-                results.append(
-                    {
-                        "id": result["metadata"].get("id", "unknown"),
-                        "content": result["content"],
-                        "metadata": result["metadata"],
-                        "score": result["score"],
-                        "source": "vector_db",
-                    }
-                )
-        except Exception as e:
-            api.logger.error(f"Error searching vector database: {e}")
+        # Query both backends concurrently under a shared deadline. cancel()
+        # cannot stop a running future, so each backend enforces it as well.
+        deadline = time.monotonic() + SEARCH_DEADLINE_SECONDS
+        backends = {
+            "vector_db": _search_executor.submit(_search_vector_db, query, limit, deadline),
+            "postgresql": _search_executor.submit(_search_postgresql, query, limit, SEARCH_DEADLINE_SECONDS),
+        }
+        wait(backends.values(), timeout=SEARCH_DEADLINE_SECONDS)
 
-        # Search PostgreSQL database
-        try:
-            # Get database URL from environment (like in test_supabase_connection.py)
-            database_url = os.getenv("SUPABASE_DIRECT_URL")
-            if database_url:
-                # Connect to PostgreSQL
-                conn = psycopg2.connect(database_url)
-                cursor = conn.cursor()
-
-                # Example query - adjust based on your schema
-                cursor.execute(
-                    """
-                    SELECT id, email, full_name, created_at
-                    FROM users
-                    WHERE 
-                        email ILIKE %s OR
-                        full_name ILIKE %s
-                    LIMIT %s
-                    """,
-                    (f"%{query}%", f"%{query}%", limit),
-                )
-
-                # Process results
-                for row in cursor.fetchall():
-                    results.append(
-                        {
-                            "id": str(row[0]),
-                            "content": f"User: {row[2]} ({row[1]})",
-                            "metadata": {
-                                "email": row[1],
-                                "full_name": row[2],
-                                "created_at": row[3].isoformat() if row[3] else None,
-                            },
-                            "score": 1.0,  # Direct match score
-                            "source": "postgresql",
-                        }
-                    )
-
-                # Close cursor and connection
-                cursor.close()
-                conn.close()
-        except Exception as e:
-            api.logger.error(f"Error searching PostgreSQL database: {e}")
+        # Merge whatever finished in time
+        results = []
+        timed_out = []
+        for name, future in backends.items():
+            if not future.done():
+                future.cancel()
+                timed_out.append(name)
+                api.logger.warning(f"Search backend {name} missed the {SEARCH_DEADLINE_SECONDS}s deadline")
+                continue
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                api.logger.error(f"Error searching {name}: {e}")
 
         # Sort results by score (descending)
         results.sort(key=lambda x: x["score"], reverse=True)
@@ -132,13 +201,14 @@ class Search(Resource):
             "results": results[:limit],
             "query": query,
             "total": len(results),
+            "timed_out": timed_out,
         }
 
 
 @api.route("/vector")
 class VectorSearch(Resource):
     @api.expect(search_model)
-    @api.marshal_with(search_response)
+    @api.response(200, "Success", search_response)
     def post(self):
         """
         Search only in the vector database.
@@ -152,21 +222,7 @@ class VectorSearch(Resource):
 
         # Search vector database
         try:
-            # Initialize VectorDB directly (like in test_Zilliz_connection.py)
-            vector_db = VectorDB()
-            vector_results = vector_db.similarity_search(query, top_k=limit)
-
-            # Format vector results
-            for result in vector_results:
-                results.append(
-                    {
-                        "id": result["metadata"].get("id", "unknown"),
-                        "content": result["content"],
-                        "metadata": result["metadata"],
-                        "score": result["score"],
-                        "source": "vector_db",
-                    }
-                )
+            results = _search_vector_db(query, limit)
         except Exception as e:
             api.logger.error(f"Error searching vector database: {e}")
 
@@ -175,13 +231,14 @@ class VectorSearch(Resource):
             "results": results,
             "query": query,
             "total": len(results),
+            "timed_out": [],
         }
 
 
 @api.route("/sql")
 class SQLSearch(Resource):
     @api.expect(search_model)
-    @api.marshal_with(search_response)
+    @api.response(200, "Success", search_response)
     def post(self):
         """
         Search only in the PostgreSQL database.
@@ -195,45 +252,7 @@ class SQLSearch(Resource):
 
         # Search PostgreSQL database
         try:
-            # Get database URL from environment (like in test_supabase_connection.py)
-            database_url = os.getenv("SUPABASE_DIRECT_URL")
-            if database_url:
-                # Connect to PostgreSQL
-                conn = psycopg2.connect(database_url)
-                cursor = conn.cursor()
-
-                # Example query - adjust based on your schema
-                cursor.execute(
-                    """
-                    SELECT id, email, full_name, created_at
-                    FROM users
-                    WHERE 
-                        email ILIKE %s OR
-                        full_name ILIKE %s
-                    LIMIT %s
-                    """,
-                    (f"%{query}%", f"%{query}%", limit),
-                )
-
-                # Process results
-                for row in cursor.fetchall():
-                    results.append(
-                        {
-                            "id": str(row[0]),
-                            "content": f"User: {row[2]} ({row[1]})",
-                            "metadata": {
-                                "email": row[1],
-                                "full_name": row[2],
-                                "created_at": row[3].isoformat() if row[3] else None,
-                            },
-                            "score": 1.0,  # Direct match score
-                            "source": "postgresql",
-                        }
-                    )
-
-                # Close cursor and connection
-                cursor.close()
-                conn.close()
+            results = _search_postgresql(query, limit)
         except Exception as e:
             api.logger.error(f"Error searching PostgreSQL database: {e}")
 
@@ -242,4 +261,5 @@ class SQLSearch(Resource):
             "results": results,
             "query": query,
             "total": len(results),
+            "timed_out": [],
         }
@@ -9,29 +9,37 @@ from datetime import timedelta
 load_dotenv()
 
 from core.extensions import db  # Import the shared db instance
+from core.serialization import OrjsonProvider, output_json
+from core.compression import init_compression
+from core.cors import (
+    CORS_ORIGINS,
+    CORS_METHODS,
+    CORS_ALLOW_HEADERS,
+    CORS_EXPOSE_HEADERS,
+    CORS_SUPPORTS_CREDENTIALS,
+    CORS_MAX_AGE,
+    cors_response_headers,
+)
 
 app = Flask(__name__)
 
-# Configure CORS to allow requests from the frontend
+# Serialize JSON responses with the fast encoder (jsonify and Flask-RESTX)
+app.json = OrjsonProvider(app)
+
+# Compress large JSON responses (gzip, or brotli when installed)
+init_compression(app)
+
+# Configure CORS to allow requests from the frontend (shared with asgi.py)
 CORS(
     app,
     resources={
         r"/*": {  # Match all routes to be safe
-            "origins": [
-                "http://localhost:3000",
-                "http://localhost:3001",
-                "http://127.0.0.1:3000",
-                "http://127.0.0.1:3001",
-                "https://visaimmigration.netlify.app",
-                "https://www.visaimmigration.netlify.app",
-                "https://leonexusus.com",
-                "chrome-extension://oimcinbapiapghcakhbbobdfdfncdgfe"
-            ],
-            "methods": ["GET", "POST", "OPTIONS", "PUT", "DELETE", "PATCH"],
-            "allow_headers": ["*"],  # Allow all headers
-            "supports_credentials": False,
-            "expose_headers": ["Content-Range", "X-Content-Range"],
-            "max_age": 600
+            "origins": CORS_ORIGINS,
+            "methods": CORS_METHODS,
+            "allow_headers": CORS_ALLOW_HEADERS,
+            "supports_credentials": CORS_SUPPORTS_CREDENTIALS,
+            "expose_headers": CORS_EXPOSE_HEADERS,
+            "max_age": CORS_MAX_AGE
         }
     }
 )
@@ -40,22 +48,7 @@ CORS(
 # Add CORS headers to all responses
 @app.after_request
 def after_request(response):
-    origin = request.headers.get('Origin')
-    if origin in [
-        "http://localhost:3000",
-        "http://localhost:3001",
-        "http://127.0.0.1:3000",
-        "http://127.0.0.1:3001",
-        "http://192.168.86.59:3000",
-        "https://visaimmigration.netlify.app",
-        "https://www.visaimmigration.netlify.app",
-        "https://leonexusus.com",
-        "chrome-extension://oimcinbapiapghcakhbbobdfdfncdgfe"
-    ]:
-        response.headers['Access-Control-Allow-Origin'] = origin
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-        response.headers['Access-Control-Allow-Credentials'] = 'true'
+    response.headers.update(cors_response_headers(request.headers.get('Origin')))
     return response
 
 
@@ -63,48 +56,19 @@ def after_request(response):
 @app.route("/<path:path>", methods=["OPTIONS"])
 def options_handler(path):
     response = app.make_default_options_response()
-    origin = request.headers.get('Origin')
-    if origin in [
-        "http://localhost:3000",
-        "http://localhost:3001",
-        "http://127.0.0.1:3000",
-        "http://127.0.0.1:3001",
-        "http://192.168.86.59:3000",
-        "https://visaimmigration.netlify.app",
-        "https://www.visaimmigration.netlify.app",
-        "https://leonexusus.com",
-        "chrome-extension://oimcinbapiapghcakhbbobdfdfncdgfe"
-    ]:
-        response.headers['Access-Control-Allow-Origin'] = origin
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-        response.headers['Access-Control-Allow-Credentials'] = 'true'
+    response.headers.update(cors_response_headers(request.headers.get('Origin')))
     return response
 
 # Root OPTIONS handler
 @app.route("/", methods=["OPTIONS"])
 def root_options_handler():
     response = app.make_default_options_response()
-    origin = request.headers.get('Origin')
-    if origin in [
-        "http://localhost:3000",
-        "http://localhost:3001",
-        "http://127.0.0.1:3000",
-        "http://127.0.0.1:3001",
-        "http://192.168.86.59:3000",
-        "https://visaimmigration.netlify.app",
-        "https://www.visaimmigration.netlify.app",
-        "https://leonexusus.com",
-        "chrome-extension://oimcinbapiapghcakhbbobdfdfncdgfe"
-    ]:
-        response.headers['Access-Control-Allow-Origin'] = origin
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-        response.headers['Access-Control-Allow-Credentials'] = 'true'
+    response.headers.update(cors_response_headers(request.headers.get('Origin')))
     return response
 
 
 api = Api(app, doc="/docs", prefix="/api")
+api.representation("application/json")(output_json)
 
 # Configure database - use Supabase PostgreSQL
 supabase_url = os.getenv("SUPABASE_URL")
@@ -144,6 +108,27 @@ api.add_namespace(evaluation_ns, path="/evaluation")
 app.register_blueprint(chat_bp)
 
 
+def warm_up():
+    """
+    Warm up the shared VectorDB so the first search/chat request does not pay
+    for model loading. Failures are logged and retried lazily on first use.
+
+    Called by the server entry points (``__main__`` below and asgi.py's
+    startup) rather than at import time, so scripts and tests that import the
+    app, and the reloader's watcher process, do not load the model. A WSGI
+    server should call it once per worker, e.g. from gunicorn's
+    ``post_worker_init`` hook.
+    """
+    if os.getenv("VECTOR_DB_WARMUP", "true").lower() != "true":
+        return
+    try:
+        from core.vector_db import warm_up_vector_db
+        warm_up_vector_db()
+        app.logger.info("VectorDB warmed up")
+    except Exception as e:
+        app.logger.error(f"VectorDB warm-up failed: {e}")
+
+
 @app.route("/api/health")
 def health_check():
     response = jsonify({"status": "healthy", "version": "1.0.0"})
@@ -153,4 +138,9 @@ def health_check():
 if __name__ == "__main__":
     with app.app_context():
         db.create_all()  # Create tables
-    app.run(debug=os.getenv("FLASK_DEBUG", "True") == "True")
\ No newline at end of file
+    debug = os.getenv("FLASK_DEBUG", "True") == "True"
+    # With the reloader on, only the child process that serves requests
+    # (WERKZEUG_RUN_MAIN=true) warms up, not the file watcher
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        warm_up()
+    app.run(debug=debug)
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+ASGI entry point: ``uvicorn asgi:app``.
+
+I/O-bound endpoints (chat, search, consultation and interview assessment) are
+served by async Starlette handlers so slow OpenAI and database calls do not
+hold a worker thread each. Every other route is passed through to the Flask
+application unchanged.
+"""
+from asgiref.wsgi import WsgiToAsgi
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Route
+
+from app import app as flask_app, warm_up
+from api import async_api
+from core.async_pg import close_async_pg_pool
+from core.cors import (
+    CORS_ORIGINS,
+    CORS_METHODS,
+    CORS_ALLOW_HEADERS,
+    CORS_EXPOSE_HEADERS,
+    CORS_SUPPORTS_CREDENTIALS,
+    CORS_MAX_AGE,
+)
+
+async_routes = [
+    Route("/api/chat", async_api.chat, methods=["POST"]),
+    Route("/api/search", async_api.search, methods=["POST"]),
+    Route("/api/search/vector", async_api.vector_search, methods=["POST"]),
+    Route("/api/search/sql", async_api.sql_search, methods=["POST"]),
+    Route("/api/consultation/ask", async_api.consultation_ask, methods=["POST"]),
+    Route(
+        "/api/ds160/interview-assessment",
+        async_api.make_interview_assessment_handler(flask_app),
+        methods=["GET"],
+    ),
+]
+
+async_app = Starlette(
+    routes=async_routes,
+    middleware=[
+        Middleware(
+            CORSMiddleware,
+            allow_origins=CORS_ORIGINS,
+            allow_methods=CORS_METHODS,
+            allow_headers=CORS_ALLOW_HEADERS,
+            allow_credentials=CORS_SUPPORTS_CREDENTIALS,
+            expose_headers=CORS_EXPOSE_HEADERS,
+            max_age=CORS_MAX_AGE,
+        )
+    ],
+    on_startup=[warm_up],
+    on_shutdown=[close_async_pg_pool],
+)
+
+ASYNC_PATHS = {route.path for route in async_routes}
+
+wsgi_app = WsgiToAsgi(flask_app)
+
+
+async def app(scope, receive, send):
+    """Route async paths to Starlette and everything else to Flask."""
+    if scope["type"] == "lifespan":
+        await async_app(scope, receive, send)
+    elif scope["type"] == "http" and scope["path"].rstrip("/") in ASYNC_PATHS:
+        await async_app(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
@@ -0,0 +1,66 @@
+"""
+Async PostgreSQL access for the ASGI request path.
+"""
+import asyncio
+
+import asyncpg
+
+from core.extensions import DATABASE_URL, PG_POOL_MIN_SIZE, PG_POOL_MAX_SIZE, PG_POOL_TIMEOUT
+
+_async_pool = None
+_async_pool_lock = None
+
+
+async def get_async_pg_pool():
+    """
+    Returns the asyncpg pool for the running event loop, creating it on first use.
+
+    Returns:
+        asyncpg.Pool: The connection pool
+    """
+    global _async_pool, _async_pool_lock
+
+    if not DATABASE_URL:
+        raise ValueError("PostgreSQL connection not initialized. Please check your environment variables.")
+
+    if _async_pool_lock is None:
+        _async_pool_lock = asyncio.Lock()
+
+    if _async_pool is None:
+        async with _async_pool_lock:
+            if _async_pool is None:
+                _async_pool = await asyncpg.create_pool(
+                    DATABASE_URL,
+                    min_size=PG_POOL_MIN_SIZE,
+                    max_size=PG_POOL_MAX_SIZE,
+                    timeout=PG_POOL_TIMEOUT,
+                    # Supabase's transaction pooler does not support prepared statements
+                    statement_cache_size=0,
+                )
+
+    return _async_pool
+
+
+async def async_execute_pg_query(query, *args, timeout=None):
+    """
+    Execute a query with asyncpg ($1, $2, ... placeholders).
+
+    Args:
+        timeout: Optional query timeout in seconds; the query is cancelled on the server when it expires
+
+    Returns:
+        list: Query results as a list of dictionaries
+    """
+    pool = await get_async_pg_pool()
+    async with pool.acquire(timeout=PG_POOL_TIMEOUT) as conn:
+        rows = await conn.fetch(query, *args, timeout=timeout)
+    return [dict(row) for row in rows]
+
+
+async def close_async_pg_pool():
+    """Close the asyncpg pool, if one was created."""
+    global _async_pool
+
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
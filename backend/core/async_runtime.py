@@ -0,0 +1,34 @@
+"""
+Shared asyncio event loop for calling coroutines from synchronous Flask code.
+"""
+import asyncio
+import threading
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    """Start the background event loop thread on first use."""
+    global _loop
+
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="async-runtime", daemon=True)
+                thread.start()
+                _loop = loop
+
+    return _loop
+
+
+def run_async(coro, timeout=None):
+    """
+    Run a coroutine on the shared event loop and wait for its result.
+
+    Unlike asyncio.run, this does not create and tear down an event loop per
+    call, so async clients and their connection pools are reused across requests.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    return future.result(timeout=timeout)
@@ -0,0 +1,150 @@
+"""
+Negotiated gzip / brotli compression of API responses.
+
+Buffered responses are compressed when they are at least
+COMPRESSION_MIN_SIZE bytes; streamed responses (e.g. stream_json_list) are
+compressed chunk by chunk as they are produced. Only allowlisted content
+types are compressed, so Server-Sent Events keep flushing token by token.
+A strong ETag identifies the exact bytes, so compressed responses get a
+per-encoding strong ETag ("<tag>-gzip", "<tag>-br"); core.http_cache strips
+the suffix again when comparing If-None-Match, and the DS-160 If-Match check
+accepts it. Streamed chunks are flushed through the compressor one by one
+so the client starts receiving rows before the stream ends.
+Brotli is used when the optional brotli package is installed and the client
+prefers it.
+"""
+import os
+import zlib
+
+from flask import request
+
+from core.http_cache import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Compression configuration
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/problem+json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/plain",
+    "text/xml",
+}
+
+
+class _GzipEncoder:
+    def __init__(self):
+        # wbits=31 produces a gzip container
+        self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+ENCODERS = {"gzip": _GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = _BrotliEncoder
+
+
+def choose_encoding(accept_encodings) -> str:
+    """Pick the supported content coding the client weights highest, or None."""
+    best, best_quality = None, 0
+    # Listed in order of preference when qualities are equal
+    for encoding in ("br", "gzip"):
+        if encoding not in ENCODERS:
+            continue
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compress_stream(chunks, encoder):
+    """Compress an iterable of chunks, flushing after each one and closing it when done."""
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if not chunk:
+                continue
+            yield encoder.compress(chunk) + encoder.flush()
+        yield encoder.finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def compress_response(response):
+    """after_request hook that compresses eligible responses."""
+    if (
+        request.method == "HEAD"
+        or response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    encoder = ENCODERS[encoding]()
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoder)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+        response.set_data(encoder.compress(data) + encoder.finish())
+
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        # The compressed bytes are a different representation
+        response.set_etag(encoded_etag(etag, encoding))
+    return response
+
+
+def init_compression(app) -> None:
+    """Register response compression on a Flask app."""
+    if COMPRESSION_ENABLED:
+        app.after_request(compress_response)
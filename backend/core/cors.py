@@ -0,0 +1,44 @@
+"""
+Shared CORS configuration.
+
+Used by both the Flask app (app.py) and the Starlette app (asgi.py) so a
+browser sees the same CORS behaviour whichever of them serves a route.
+"""
+
+CORS_ORIGINS = [
+    "http://localhost:3000",
+    "http://localhost:3001",
+    "http://127.0.0.1:3000",
+    "http://127.0.0.1:3001",
+    "http://192.168.86.59:3000",
+    "https://visaimmigration.netlify.app",
+    "https://www.visaimmigration.netlify.app",
+    "https://leonexusus.com",
+    "chrome-extension://oimcinbapiapghcakhbbobdfdfncdgfe"
+]
+CORS_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+CORS_ALLOW_HEADERS = ["*"]  # Allow all headers
+CORS_EXPOSE_HEADERS = ["Content-Range", "X-Content-Range", "X-Next-Cursor", "ETag"]
+CORS_SUPPORTS_CREDENTIALS = False
+CORS_MAX_AGE = 600
+
+# Headers the Flask after_request / OPTIONS handlers have always added for
+# allowed origins, on top of what flask_cors sends
+RESPONSE_ALLOW_HEADERS = "Content-Type, Authorization, If-None-Match, If-Match"
+
+
+def cors_response_headers(origin):
+    """
+    CORS headers the Flask after_request / OPTIONS handlers add for ``origin``.
+
+    Returns the same values the handlers in app.py have always set, or {} if
+    the origin is not allowed.
+    """
+    if origin not in CORS_ORIGINS:
+        return {}
+    return {
+        "Access-Control-Allow-Origin": origin,
+        "Access-Control-Allow-Methods": ", ".join(CORS_METHODS),
+        "Access-Control-Allow-Headers": RESPONSE_ALLOW_HEADERS,
+        "Access-Control-Allow-Credentials": "true",
+    }
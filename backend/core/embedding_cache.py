@@ -0,0 +1,159 @@
+"""
+LRU cache for query embeddings with an optional on-disk tier.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+import numpy as np
+
+# Cache configuration
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+EMBEDDING_CACHE_TTL = float(os.getenv("EMBEDDING_CACHE_TTL", "86400"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH")
+# Fold case in cache keys: "auto" (only for uncased models), "true" or "false"
+EMBEDDING_CACHE_LOWERCASE = os.getenv("EMBEDDING_CACHE_LOWERCASE", "auto").lower()
+
+
+def normalize_query(text: str, lowercase: bool = False) -> str:
+    """
+    Normalise query text so trivially different inputs share a cache entry.
+
+    Whitespace is always collapsed. Case is only folded when ``lowercase`` is
+    set, which is safe only for uncased models: a cased model embeds
+    "US visa" and "us visa" differently.
+    """
+    text = " ".join(text.split())
+    return text.lower() if lowercase else text
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU cache of query embeddings keyed on (model name, normalised text).
+
+    Pass ``lowercase=True`` only for uncased models (see normalize_query).
+
+    Entries expire after ``ttl`` seconds. When ``path`` is set, entries are also
+    written to a SQLite file so the cache survives restarts; in-memory misses
+    fall through to that file before the caller has to encode.
+    """
+
+    def __init__(self, model_name: str, max_size: int = 10000, ttl: float = 86400,
+                 path: Optional[str] = None, lowercase: bool = False):
+        self.model_name = model_name
+        self.lowercase = lowercase
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+
+        if path:
+            self._disk = sqlite3.connect(path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, dim INTEGER NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._disk.commit()
+
+    def _key(self, text: str) -> str:
+        # The case mode is part of the key so entries from the other mode are never reused
+        case_mode = "uncased" if self.lowercase else "cased"
+        raw = f"{self.model_name}\x00{case_mode}\x00{normalize_query(text, self.lowercase)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        Look up the embedding for a query.
+
+        Returns:
+            The cached embedding, or None on a miss
+        """
+        key = self._key(text)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                vector, created_at = entry
+                if now - created_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                del self._entries[key]
+
+            disk_entry = self._get_from_disk(key, now)
+            if disk_entry is not None:
+                vector, created_at = disk_entry
+                self._store(key, vector, created_at)
+                self.hits += 1
+                return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, vector: np.ndarray) -> None:
+        """Store the embedding for a query."""
+        key = self._key(text)
+        now = time.time()
+        vector = np.asarray(vector, dtype=np.float32)
+
+        with self._lock:
+            self._store(key, vector, now)
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, dim, created_at) VALUES (?, ?, ?, ?)",
+                    (key, vector.tobytes(), vector.shape[0], now),
+                )
+                self._disk.commit()
+
+    def clear(self) -> None:
+        """Drop every cached embedding, including the on-disk tier."""
+        with self._lock:
+            self._entries.clear()
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM embeddings")
+                self._disk.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+    def _store(self, key: str, vector: np.ndarray, created_at: float) -> None:
+        self._entries[key] = (vector, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _get_from_disk(self, key: str, now: float):
+        if self._disk is None:
+            return None
+
+        row = self._disk.execute(
+            "SELECT vector, created_at FROM embeddings WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        blob, created_at = row
+        if now - created_at > self.ttl:
+            self._disk.execute("DELETE FROM embeddings WHERE key = ?", (key,))
+            self._disk.commit()
+            return None
+
+        return np.frombuffer(blob, dtype=np.float32), created_at
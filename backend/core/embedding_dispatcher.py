@@ -0,0 +1,84 @@
+"""
+Micro-batching dispatcher that groups concurrent query encodes into one forward pass.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# Dispatcher configuration
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+
+
+class EmbeddingDispatcher:
+    """
+    Collects encode requests from many threads and runs them as batches.
+
+    A single background thread waits for the first pending request, keeps
+    gathering requests for up to ``max_wait_ms`` milliseconds (or until
+    ``max_batch_size`` is reached) and then encodes the whole batch with one
+    ``encoder.encode`` call. Each caller gets a Future for its own vector.
+    """
+
+    def __init__(self, encoder, max_batch_size: int = 32, max_wait_ms: float = 5):
+        self.encoder = encoder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embedding-dispatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue a text for encoding.
+
+        Returns:
+            Future: Resolves to the embedding for ``text``
+        """
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def encode(self, text: str, timeout: float = None):
+        """Encode a single text through the dispatcher and wait for the result."""
+        return self.submit(text).result(timeout=timeout)
+
+    def _collect_batch(self) -> List:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            # Skip callers that gave up before the batch ran
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                embeddings = self.encoder.encode([text for text, _ in batch], batch_size=len(batch))
+            except Exception as e:
+                logger.error(f"Error encoding batch of {len(batch)} queries: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
@@ -1,6 +1,13 @@
 import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
 import psycopg2
+from psycopg2 import extensions as pg_extensions
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 from flask_sqlalchemy import SQLAlchemy
 
 # Initialize SQLAlchemy
@@ -12,53 +19,209 @@ supabase_user = os.getenv("SUPABASE_USER", "postgres")
 supabase_db = os.getenv("SUPABASE_DB", "postgres")
 supabase_port = os.getenv("SUPABASE_PORT", "5432")
 
+# Connection pool configuration
+PG_POOL_MIN_SIZE = int(os.getenv("PG_POOL_MIN_SIZE", "1"))
+PG_POOL_MAX_SIZE = int(os.getenv("PG_POOL_MAX_SIZE", "10"))
+PG_POOL_TIMEOUT = float(os.getenv("PG_POOL_TIMEOUT", "10"))
+PG_POOL_HEALTHCHECK_INTERVAL = float(os.getenv("PG_POOL_HEALTHCHECK_INTERVAL", "30"))
+
 # Check if Supabase credentials are available
 if not DATABASE_URL:
     print("SUPABASE_URL not found in environment variables.")
     print("SQL search functionality will be limited.")
 
-# Create a PostgreSQL connection for Supabase
-pg_conn = None
-if DATABASE_URL:
-    try:
-        pg_conn = psycopg2.connect(DATABASE_URL)
-        print("Successfully connected to PostgreSQL database")
-    except Exception as e:
-        print(f"Error connecting to PostgreSQL: {e}")
 
-# Function to get the PostgreSQL connection
-def get_pg_connection():
+class PGConnectionPool:
     """
-    Returns the PostgreSQL connection for Supabase.
-    
+    Bounded, thread-safe pool of PostgreSQL connections.
+
+    Wraps psycopg2's ThreadedConnectionPool with a semaphore so callers wait
+    (up to ``timeout`` seconds) for a free connection instead of failing
+    immediately, checks idle connections before handing them out, and
+    discards connections that are closed or left in a broken state.
+    """
+
+    def __init__(self, dsn, min_size=1, max_size=10, timeout=10.0, healthcheck_interval=30.0):
+        self.dsn = dsn
+        self.max_size = max_size
+        self.timeout = timeout
+        self.healthcheck_interval = healthcheck_interval
+        self._pool = ThreadedConnectionPool(min_size, max_size, dsn)
+        self._slots = threading.BoundedSemaphore(max_size)
+        # Keyed on the connection itself: an id() can be reused by a new
+        # connection once a discarded one is garbage collected
+        self._last_used = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def getconn(self):
+        """
+        Check out a healthy connection from the pool.
+
+        Dead idle connections are discarded one after another (after a
+        database restart they all are), until a live one is found or the pool
+        opens a fresh connection.
+
+        Raises:
+            TimeoutError: If no connection becomes available within the timeout
+            psycopg2.OperationalError: If no live connection can be obtained
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Timed out after {self.timeout}s waiting for a PostgreSQL connection")
+
+        try:
+            # At most max_size idle connections can be dead; the next getconn opens a new one
+            for _ in range(self.max_size + 1):
+                conn = self._pool.getconn()
+                if self._is_healthy(conn):
+                    return conn
+                self._discard(conn)
+            raise psycopg2.OperationalError("Could not obtain a live PostgreSQL connection")
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn):
+        """Return a connection to the pool, discarding it if it is unusable."""
+        try:
+            close = bool(conn.closed)
+            if not close and conn.get_transaction_status() != pg_extensions.TRANSACTION_STATUS_IDLE:
+                # Never hand the next caller a connection mid-transaction or
+                # stuck in an aborted transaction
+                try:
+                    conn.rollback()
+                except Exception:
+                    close = True
+
+            with self._lock:
+                if close:
+                    self._last_used.pop(conn, None)
+                else:
+                    self._last_used[conn] = time.monotonic()
+
+            self._pool.putconn(conn, close=close)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks a connection out and always returns it."""
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def closeall(self):
+        """Close every connection held by the pool."""
+        self._pool.closeall()
+
+    def _discard(self, conn):
+        """Close a dead connection and forget it."""
+        with self._lock:
+            self._last_used.pop(conn, None)
+        self._pool.putconn(conn, close=True)
+
+    def _is_healthy(self, conn):
+        """Return False if the connection is closed or fails a liveness check."""
+        if conn.closed:
+            return False
+
+        with self._lock:
+            last_used = self._last_used.get(conn)
+
+        # Only ping connections that have been idle for a while
+        if last_used is not None and time.monotonic() - last_used < self.healthcheck_interval:
+            return True
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+
+# The pool is created lazily on first use rather than at import time
+_pg_pool = None
+_pg_pool_lock = threading.Lock()
+
+
+def get_pg_pool():
+    """
+    Returns the shared PostgreSQL connection pool, creating it on first use.
+
     Returns:
-        connection: The PostgreSQL connection
+        PGConnectionPool: The connection pool
     """
-    if not pg_conn:
+    global _pg_pool
+
+    if not DATABASE_URL:
         raise ValueError("PostgreSQL connection not initialized. Please check your environment variables.")
-    return pg_conn
+
+    if _pg_pool is None:
+        with _pg_pool_lock:
+            if _pg_pool is None:
+                _pg_pool = PGConnectionPool(
+                    DATABASE_URL,
+                    min_size=PG_POOL_MIN_SIZE,
+                    max_size=PG_POOL_MAX_SIZE,
+                    timeout=PG_POOL_TIMEOUT,
+                    healthcheck_interval=PG_POOL_HEALTHCHECK_INTERVAL,
+                )
+                print("Successfully created PostgreSQL connection pool")
+
+    return _pg_pool
+
+
+# Function to get a PostgreSQL connection
+@contextmanager
+def get_pg_connection():
+    """
+    Check out a PostgreSQL connection for Supabase from the shared pool.
+
+    Use as a context manager; the connection is returned to the pool (and
+    rolled back if a transaction was left open) when the block exits.
+
+    Yields:
+        connection: A pooled PostgreSQL connection
+    """
+    with get_pg_pool().connection() as conn:
+        yield conn
 
 # Function to execute a query on PostgreSQL
-def execute_pg_query(query, params=None):
+def execute_pg_query(query, params=None, fetch_one=False):
     """
     Execute a query on the PostgreSQL database.
-    
+
     Args:
         query (str): The SQL query to execute
         params (tuple, optional): Parameters for the query
-        
+        fetch_one (bool, optional): Return only the first row as a dictionary
+
     Returns:
-        list: Query results as a list of dictionaries
+        list: Query results as a list of dictionaries (or a single dictionary
+        when ``fetch_one`` is set)
     """
-    if not pg_conn:
-        raise ValueError("PostgreSQL connection not initialized")
-    
     try:
-        cursor = pg_conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        cursor.close()
-        return [dict(row) for row in results]
+        with get_pg_connection() as conn:
+            try:
+                cursor = conn.cursor(cursor_factory=RealDictCursor)
+                cursor.execute(query, params)
+                results = cursor.fetchall() if cursor.description else []
+                cursor.close()
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    except ValueError:
+        raise
     except Exception as e:
         print(f"Error executing PostgreSQL query: {e}")
-        return []
+        return {} if fetch_one else []
+
+    rows = [dict(row) for row in results]
+    if fetch_one:
+        return rows[0] if rows else {}
+    return rows
@@ -0,0 +1,87 @@
+"""
+Conditional GET helpers (ETag / If-None-Match).
+
+Resources derive a weak ETag from whatever changes when their representation
+changes (e.g. updated_at), check it against If-None-Match before loading the
+heavy columns, and answer 304 Not Modified on a match.
+
+Strong ETags get a content-coding suffix when core.compression compresses
+the response ("<tag>-gzip"); the helpers here treat all encodings of a tag
+as the same resource version.
+"""
+import hashlib
+from typing import Any, Dict, Optional
+
+from flask import request, Response
+from werkzeug.http import quote_etag
+
+# Responses must be revalidated before reuse. Shared caches (CDN, proxies) may
+# store and revalidate them too; VARY keys their copies on the caller's token
+# so one user's representation is never served to another.
+CACHE_CONTROL = "no-cache"
+VARY = "Authorization"
+
+# Content codings core.compression can apply, as ETag suffixes
+ETAG_ENCODINGS = ("gzip", "br")
+
+
+def etag_for(*parts: Any) -> str:
+    """Build an (unquoted) ETag value from the parts that identify a representation version."""
+    raw = "\x00".join("" if part is None else str(part) for part in parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Strong ETag of the ``encoding``-compressed representation of ``etag``."""
+    return f"{etag}-{encoding}"
+
+
+def strip_etag_encoding(etag: str) -> str:
+    """Undo encoded_etag(): the tag of the uncompressed representation."""
+    for encoding in ETAG_ENCODINGS:
+        suffix = f"-{encoding}"
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)]
+    return etag
+
+
+def cache_headers(etag: str, weak: bool = True) -> Dict[str, str]:
+    """
+    ETag, Cache-Control and Vary headers for a 200 response.
+
+    Use ``weak=False`` only for ETags that clients send back in If-Match,
+    which requires strong comparison.
+    """
+    return {"ETag": quote_etag(etag, weak=weak), "Cache-Control": CACHE_CONTROL, "Vary": VARY}
+
+
+def not_modified(etag: str, headers: Optional[Dict[str, str]] = None, weak: bool = True) -> Optional[Response]:
+    """
+    Return a 304 response if the request's If-None-Match matches ``etag``.
+
+    Args:
+        etag: Current ETag of the resource (unquoted)
+        headers: Extra headers to include, e.g. CORS headers
+        weak: Whether the resource's ETag is sent as a weak validator
+
+    Returns:
+        Response or None: The 304 response, or None if the client's copy is stale
+    """
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag or if_none_match.contains_weak(etag):
+        matched = etag
+    else:
+        # The client may hold a compressed representation ("<tag>-gzip")
+        matched = next(
+            (tag for tag in if_none_match.as_set(include_weak=True) if strip_etag_encoding(tag) == etag),
+            None,
+        )
+        if matched is None:
+            return None
+
+    # Echo the validator the client holds so its cached representation stays current
+    response = Response(status=304)
+    response.headers.update(cache_headers(matched, weak=weak))
+    if headers:
+        response.headers.update(headers)
+    return response
@@ -0,0 +1,379 @@
+"""
+Shared gateway for OpenAI chat completion calls.
+
+Every model call in the process goes through one LLMGateway, so they share a
+pooled HTTP connection set, one pair of token buckets (requests and tokens
+per minute), a common cooldown after rate-limit responses, and usage metrics.
+Transient failures (429, 5xx, timeouts, connection errors) are retried with
+jittered exponential backoff.
+
+The limits are per process; set them to your OpenAI quota divided by the
+number of processes (web workers plus job workers). A limit of 0 disables
+that bucket.
+"""
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional
+
+import httpx
+from openai import (
+    OpenAI,
+    AsyncOpenAI,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rate limits (per process)
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "90000"))
+
+# Retry, timeout and connection pool configuration
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that refills continuously at ``rate_per_minute``.
+
+    ``reserve`` always succeeds and returns how long the caller must wait
+    before proceeding, so the same bucket serves both threads (time.sleep)
+    and coroutines (asyncio.sleep).
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take ``amount`` tokens, going into debt if necessary.
+
+        Returns:
+            float: Seconds to wait until the reservation is covered
+        """
+        if not self.enabled:
+            return 0.0
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def adjust(self, amount: float) -> None:
+        """Return (positive) or take (negative) tokens after the real cost is known."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+class LLMMetrics:
+    """Thread-safe per-model usage counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, float]] = {}
+
+    def _entry(self, model: str) -> Dict[str, float]:
+        return self._models.setdefault(model, {
+            "requests": 0,
+            "failures": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "latency_seconds": 0.0,
+        })
+
+    def record(self, model: str, **counts) -> None:
+        with self._lock:
+            entry = self._entry(model)
+            for name, value in counts.items():
+                entry[name] += value
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {model: dict(entry) for model, entry in self._models.items()}
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: Optional[int]) -> int:
+    """Rough token cost of a request: about four characters per prompt token plus the completion budget."""
+    prompt_chars = sum(len(message.get("content") or "") for message in messages)
+    return prompt_chars // 4 + len(messages) * 4 + (max_tokens or 0)
+
+
+class LLMGateway:
+    """Rate-limited, retrying access to the OpenAI chat completions API."""
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.request_bucket = TokenBucket(LLM_REQUESTS_PER_MINUTE)
+        self.token_bucket = TokenBucket(LLM_TOKENS_PER_MINUTE)
+        self.metrics = LLMMetrics()
+
+        # Shared cooldown set by rate-limit responses, see _handle_retryable()
+        self._resume_at = 0.0
+        self._cooldown_lock = threading.Lock()
+
+        self._limits = httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        )
+        self._client = None
+        # httpx async pools are bound to the loop that created them, so each
+        # running event loop (uvicorn's, core.async_runtime's) gets its own client
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._client_lock = threading.Lock()
+
+    @property
+    def configured(self) -> bool:
+        """Whether an API key is available."""
+        return bool(self.api_key)
+
+    @property
+    def client(self) -> OpenAI:
+        """Pooled synchronous client, created on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = OpenAI(
+                        api_key=self._require_api_key(),
+                        http_client=httpx.Client(limits=self._limits, timeout=LLM_TIMEOUT),
+                        max_retries=0,
+                        timeout=LLM_TIMEOUT,
+                    )
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """
+        Pooled asynchronous client for the running event loop, created on first use.
+
+        Must be accessed from inside a coroutine. Clients are dropped together
+        with their loop.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            with self._client_lock:
+                client = self._async_clients.get(loop)
+                if client is None:
+                    client = AsyncOpenAI(
+                        api_key=self._require_api_key(),
+                        http_client=httpx.AsyncClient(limits=self._limits, timeout=LLM_TIMEOUT),
+                        max_retries=0,
+                        timeout=LLM_TIMEOUT,
+                    )
+                    self._async_clients[loop] = client
+        return client
+
+    def _require_api_key(self) -> str:
+        if not self.api_key:
+            raise ValueError("OPENAI_API_KEY is not configured")
+        return self.api_key
+
+    def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ):
+        """
+        Create a chat completion.
+
+        With ``stream=True`` the stream object is returned; only opening the
+        stream is retried, not failures part-way through it.
+
+        Args:
+            messages: Chat messages
+            model: Model name
+            max_tokens: Completion token limit (also used for rate limiting)
+            timeout: Per-attempt timeout in seconds (default LLM_TIMEOUT)
+            **kwargs: Passed through to chat.completions.create
+
+        Returns:
+            The ChatCompletion (or Stream) returned by the OpenAI client
+        """
+        estimate = estimate_tokens(messages, max_tokens)
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        time.sleep(self._reserve(estimate))
+
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            time.sleep(self._cooldown_remaining())
+            started = time.monotonic()
+            try:
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    timeout=timeout or LLM_TIMEOUT,
+                    **kwargs,
+                )
+            except RETRYABLE_ERRORS as e:
+                delay = self._handle_retryable(model, e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            except Exception:
+                self.metrics.record(model, requests=1, failures=1)
+                raise
+
+            self._record_success(model, response, estimate, time.monotonic() - started)
+            return response
+
+    async def achat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ):
+        """Async variant of chat_completion, sharing the same limits and metrics."""
+        estimate = estimate_tokens(messages, max_tokens)
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        await asyncio.sleep(self._reserve(estimate))
+
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            await asyncio.sleep(self._cooldown_remaining())
+            started = time.monotonic()
+            try:
+                response = await self.async_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    timeout=timeout or LLM_TIMEOUT,
+                    **kwargs,
+                )
+            except RETRYABLE_ERRORS as e:
+                delay = self._handle_retryable(model, e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                self.metrics.record(model, requests=1, failures=1)
+                raise
+
+            self._record_success(model, response, estimate, time.monotonic() - started)
+            return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Usage counters per model."""
+        return self.metrics.snapshot()
+
+    def _reserve(self, estimate: int) -> float:
+        """Reserve one request and ``estimate`` tokens; returns the wait in seconds."""
+        return max(self.request_bucket.reserve(1), self.token_bucket.reserve(estimate))
+
+    def _cooldown_remaining(self) -> float:
+        with self._cooldown_lock:
+            return max(0.0, self._resume_at - time.monotonic())
+
+    def _handle_retryable(self, model: str, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Record a retryable failure and work out the backoff.
+
+        Returns:
+            float or None: Seconds to wait before the next attempt, or None to give up
+        """
+        rate_limited = isinstance(error, RateLimitError)
+        self.metrics.record(model, requests=1, failures=1, rate_limited=int(rate_limited))
+
+        if attempt >= LLM_MAX_RETRIES:
+            logger.error(f"Giving up on {model} after {attempt + 1} attempts: {str(error)}")
+            return None
+
+        delay = min(LLM_BACKOFF_BASE * (2 ** attempt), LLM_BACKOFF_MAX)
+        delay += random.uniform(0, delay / 2)
+        if rate_limited:
+            delay = max(delay, _retry_after(error))
+            # Pause every caller, not just this one, until the limit resets
+            with self._cooldown_lock:
+                self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+        self.metrics.record(model, retries=1)
+        logger.warning(f"{type(error).__name__} from {model} (attempt {attempt + 1}), retrying in {delay:.1f}s")
+        return delay
+
+    def _record_success(self, model: str, response, estimate: int, latency: float) -> None:
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            # Streams do not report usage; keep the estimate
+            self.metrics.record(model, requests=1, latency_seconds=latency)
+            return
+
+        self.token_bucket.adjust(estimate - usage.total_tokens)
+        self.metrics.record(
+            model,
+            requests=1,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            latency_seconds=latency,
+        )
+
+
+def _retry_after(error: Exception) -> float:
+    """Seconds requested by a Retry-After header, or 0."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return 0.0
+    try:
+        return float(response.headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# Process-wide gateway shared by every caller
+_gateway_instance = None
+_gateway_lock = threading.Lock()
+
+def get_llm_gateway() -> LLMGateway:
+    """
+    Returns the process-wide LLMGateway instance, creating it on first use.
+
+    Returns:
+        LLMGateway: The shared gateway
+    """
+    global _gateway_instance
+
+    if _gateway_instance is None:
+        with _gateway_lock:
+            if _gateway_instance is None:
+                _gateway_instance = LLMGateway()
+
+    return _gateway_instance
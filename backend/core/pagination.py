@@ -0,0 +1,155 @@
+"""
+Keyset (cursor) pagination and field projection for list endpoints.
+
+Pagination is opt-in: a request with ``limit`` or ``cursor`` gets one page,
+ordered newest first on (sort column, id), and the cursor for the next page
+in the ``X-Next-Cursor`` response header. The body stays a plain list so
+existing clients keep working. ``fields=a,b,c`` limits each item to those keys,
+and large columns that are not requested are not loaded from the database.
+"""
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import defer
+
+from core.serialization import stream_json_list
+
+# Page size configuration
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    """Encode the (sort value, id) of the last row on a page."""
+    if isinstance(sort_value, datetime):
+        sort_value = {"dt": sort_value.isoformat()}
+    raw = json.dumps([sort_value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if isinstance(sort_value, dict) and "dt" in sort_value:
+        sort_value = datetime.fromisoformat(sort_value["dt"])
+    return sort_value, row_id
+
+
+def page_params(args) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Read ``limit`` and ``cursor`` from the query string.
+
+    Returns:
+        tuple: (page size, cursor); the page size is None when the request
+        did not ask for pagination
+
+    Raises:
+        ValueError: If limit is not a positive integer
+    """
+    limit = args.get("limit")
+    cursor = args.get("cursor") or None
+
+    if limit is None:
+        return (PAGE_SIZE_DEFAULT if cursor else None), cursor
+
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, PAGE_SIZE_MAX), cursor
+
+
+def keyset_paginate(query, sort_column, id_column, limit: Optional[int], cursor: Optional[str] = None):
+    """
+    Apply newest-first keyset pagination on (sort_column, id_column).
+
+    Rows with a NULL sort value come first (PostgreSQL's default for DESC, so
+    a (sort_column, id) index still serves the order) and are paged by id;
+    a plain row comparison would silently drop them.
+
+    Args:
+        query: SQLAlchemy query (model rows or with_entities rows exposing
+            both columns as attributes)
+        sort_column: Column to order by, e.g. Model.created_at
+        id_column: Unique tie-breaker column, e.g. Model.id
+        limit: Page size, or None to return every row
+        cursor: Cursor from the previous page's X-Next-Cursor header
+
+    Returns:
+        tuple: (rows, next cursor or None)
+    """
+    query = query.order_by(sort_column.desc().nulls_first(), id_column.desc())
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        if sort_value is None:
+            # Still inside the NULL rows: the rest of them, then every dated row
+            query = query.filter(or_(
+                and_(sort_column.is_(None), id_column < row_id),
+                sort_column.isnot(None),
+            ))
+        else:
+            # NULL rows were all on earlier pages; the comparison excludes them
+            query = query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+
+    if limit is None:
+        return query.all(), None
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+
+def parse_fields(args) -> Optional[Set[str]]:
+    """Return the set of keys requested with ``fields=``, or None for all of them."""
+    fields = args.get("fields")
+    if not fields:
+        return None
+    return {field.strip() for field in fields.split(",") if field.strip()}
+
+
+def wants_field(fields: Optional[Set[str]], name: str) -> bool:
+    """Whether ``name`` is included by a ``fields=`` projection."""
+    return fields is None or name in fields
+
+
+def defer_unrequested(query, fields: Optional[Set[str]], *columns):
+    """Defer loading of ``columns`` (e.g. JSON blobs) that the projection leaves out."""
+    for column in columns:
+        if not wants_field(fields, column.key):
+            query = query.options(defer(column))
+    return query
+
+
+def project(item: Dict[str, Any], fields: Optional[Set[str]]) -> Dict[str, Any]:
+    """Keep only the requested keys of a serialised item."""
+    if fields is None:
+        return item
+    return {key: value for key, value in item.items() if key in fields}
+
+
+def paginated_response(items: Iterable[Dict[str, Any]], next_cursor: Optional[str], status: int = 200):
+    """Build a streamed JSON array response for a page (items may be a generator)."""
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return stream_json_list(items, status, headers)
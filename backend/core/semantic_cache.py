@@ -0,0 +1,114 @@
+"""
+Semantic response cache keyed on query embeddings.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# Cache configuration
+CHAT_CACHE_ENABLED = os.getenv("CHAT_CACHE_ENABLED", "true").lower() == "true"
+CHAT_CACHE_SIMILARITY = float(os.getenv("CHAT_CACHE_SIMILARITY", "0.95"))
+CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", "3600"))
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "2000"))
+
+
+class SemanticCache:
+    """
+    Thread-safe cache that returns a stored response for any query whose
+    embedding has cosine similarity of at least ``threshold`` with a cached one.
+
+    Each entry records the knowledge-base version it was answered against;
+    lookups with a different version miss, so answers are invalidated when the
+    collection changes.
+    """
+
+    def __init__(self, threshold: float = 0.95, ttl: float = 3600, max_entries: int = 2000):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._entries = []
+
+    def lookup(self, embedding: np.ndarray, version: Any) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached response for a semantically equivalent query.
+
+        Returns:
+            The cached response, or None on a miss
+        """
+        query = _normalize(embedding)
+
+        with self._lock:
+            self._evict_expired()
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            scores = self._vectors @ query
+            for index in np.argsort(-scores):
+                if scores[index] < self.threshold:
+                    break
+                entry = self._entries[index]
+                if entry["version"] == version:
+                    self.hits += 1
+                    return entry["response"]
+
+            self.misses += 1
+            return None
+
+    def store(self, embedding: np.ndarray, response: Dict[str, Any], version: Any) -> None:
+        """Cache a response for a query embedding."""
+        vector = _normalize(embedding)
+
+        with self._lock:
+            self._evict_expired()
+            self._entries.append({"response": response, "version": version, "created_at": time.time()})
+            if self._vectors is None:
+                self._vectors = vector.reshape(1, -1)
+            else:
+                self._vectors = np.vstack([self._vectors, vector])
+
+            # Drop the oldest entries beyond the size limit
+            overflow = len(self._entries) - self.max_entries
+            if overflow > 0:
+                self._entries = self._entries[overflow:]
+                self._vectors = self._vectors[overflow:]
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._entries = []
+            self._vectors = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+            }
+
+    def _evict_expired(self) -> None:
+        # Entries are appended in creation order, so expired ones are at the front
+        cutoff = time.time() - self.ttl
+        expired = 0
+        while expired < len(self._entries) and self._entries[expired]["created_at"] < cutoff:
+            expired += 1
+        if expired:
+            self._entries = self._entries[expired:]
+            self._vectors = self._vectors[expired:] if self._entries else None
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
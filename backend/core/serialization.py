@@ -0,0 +1,117 @@
+"""
+Fast JSON response serialization.
+
+Uses orjson when it is installed and falls back to the standard library
+json module otherwise. Provides:
+
+- ``output_json``: a Flask-RESTX representation for application/json
+- ``OrjsonProvider``: a Flask JSON provider so jsonify() uses the same encoder
+- ``stream_json_list``: a response that encodes a large list item by item
+"""
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from flask import Response, make_response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Items per chunk written by stream_json_list
+STREAM_CHUNK_ITEMS = 100
+
+
+def _default(value: Any) -> Any:
+    """Encode the types orjson / json do not handle natively."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    # numpy scalars and arrays (e.g. vector search scores)
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data: Any) -> bytes:
+    """Serialize ``data`` to UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def output_json(data: Any, code: int, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Flask-RESTX representation for application/json."""
+    response = make_response(dumps(data), code)
+    response.mimetype = "application/json"
+    response.headers.extend(headers or {})
+    return response
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by the fast encoder (used by jsonify)."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return loads(s)
+
+
+def _encode_chunk(iterator: Iterator[Any]) -> bytes:
+    """Encode up to STREAM_CHUNK_ITEMS items from ``iterator`` as comma-joined JSON, or b"" when exhausted."""
+    return b",".join(dumps(item) for item in islice(iterator, STREAM_CHUNK_ITEMS))
+
+
+def stream_json_list(items: Iterable[Any], status: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Stream a JSON array, encoding ``items`` lazily in chunks.
+
+    Peak memory stays at one chunk of encoded items instead of the whole
+    serialized list, and the first bytes go out before the last row is read.
+    ``items`` may be a generator; it is consumed inside the request context.
+
+    The first chunk is read before the response is built, so a failing query
+    raises here and becomes an ordinary error response. The status line has
+    already been sent when a later chunk fails, so the error is logged and the
+    array is closed, leaving the client valid (if short) JSON.
+    """
+    iterator = iter(items)
+    first_chunk = _encode_chunk(iterator)
+
+    def generate():
+        yield b"[" + first_chunk
+        if first_chunk:
+            try:
+                while True:
+                    chunk = _encode_chunk(iterator)
+                    if not chunk:
+                        break
+                    yield b"," + chunk
+            except Exception:
+                logger.exception("Error while streaming JSON list; closing the array early")
+        yield b"]"
+
+    response = Response(stream_with_context(generate()), status=status, mimetype="application/json")
+    response.headers.extend(headers or {})
+    return response
@@ -0,0 +1,363 @@
+"""
+Storage backends for the vector database.
+
+ZillizBackend talks to Zilliz Cloud. LocalVectorBackend is an in-process,
+brute-force cosine index over a memory-mapped NumPy snapshot of the same
+collection, used for offline work or when the cloud is unavailable.
+"""
+import os
+import json
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Iterator, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Zilliz Cloud configuration
+ZILLIZ_CLOUD_URI = os.getenv("ZILLIZ_CLOUD_URI")
+ZILLIZ_CLOUD_TOKEN = os.getenv("ZILLIZ_CLOUD_TOKEN")
+ZILLIZ_COLLECTION_NAME = os.getenv("ZILLIZ_COLLECTION_NAME", "visa_assistant_vectors")
+
+# Local snapshot configuration
+VECTOR_DB_LOCAL_PATH = os.getenv("VECTOR_DB_LOCAL_PATH", os.path.join("data", "vector_snapshot"))
+
+VECTORS_FILE = "vectors.npy"
+DOCUMENTS_FILE = "documents.jsonl"
+# Row count and content hashes of the two files, checked on load
+MANIFEST_FILE = "manifest.json"
+
+
+class VectorBackend(ABC):
+    """Interface implemented by every vector storage backend."""
+
+    name = "base"
+
+    @abstractmethod
+    def search(self, embedding: np.ndarray, top_k: int, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Return the ``top_k`` nearest documents as dicts with content, metadata and score.
+
+        ``timeout`` bounds remote calls in seconds; in-process backends may ignore it.
+        """
+
+    @abstractmethod
+    def insert(self, contents: List[str], metadata: List[Dict[str, Any]], embeddings: np.ndarray) -> None:
+        """Insert a chunk of documents with their embeddings."""
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Make inserted documents durable and searchable."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Return the number of stored documents."""
+
+
+class ZillizBackend(VectorBackend):
+    """Backend storing vectors in a Zilliz Cloud collection."""
+
+    name = "zilliz"
+
+    def __init__(self):
+        from pymilvus import connections, Collection
+
+        # Connect to Zilliz Cloud
+        connections.connect(
+            alias="default",
+            uri=ZILLIZ_CLOUD_URI,
+            token=ZILLIZ_CLOUD_TOKEN,
+        )
+
+        # Ensure collection exists
+        self._ensure_collection_exists()
+
+        # Get collection
+        self.collection = Collection(ZILLIZ_COLLECTION_NAME)
+        self.collection.load()
+
+    def _ensure_collection_exists(self) -> None:
+        """Ensure the collection exists, create it if not."""
+        from pymilvus import Collection, utility, CollectionSchema, FieldSchema, DataType
+
+        if not utility.has_collection(ZILLIZ_COLLECTION_NAME):
+            print(f"Collection {ZILLIZ_COLLECTION_NAME} does not exist. Creating...")
+
+            # Define fields
+            fields = [
+                FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
+                FieldSchema(name="content", dtype=DataType.VARCHAR, max_length=65535),
+                FieldSchema(name="metadata", dtype=DataType.JSON),
+                FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=384)  # Match embedding model
+            ]
+
+            # Create schema and collection
+            schema = CollectionSchema(fields=fields, description="Visa Assistant Knowledge Base")
+            collection = Collection(name=ZILLIZ_COLLECTION_NAME, schema=schema)
+
+            # Create index
+            index_params = {
+                "metric_type": "COSINE",
+                "index_type": "HNSW",
+                "params": {"M": 8, "efConstruction": 64}
+            }
+            collection.create_index(field_name="embedding", index_params=index_params)
+            print(f"Collection {ZILLIZ_COLLECTION_NAME} created successfully.")
+        else:
+            print(f"Collection {ZILLIZ_COLLECTION_NAME} already exists.")
+
+    def search(self, embedding: np.ndarray, top_k: int, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        # Search parameters
+        search_params = {"metric_type": "COSINE", "params": {"ef": 64}}
+
+        # Perform search
+        results = self.collection.search(
+            data=[np.asarray(embedding).tolist()],
+            anns_field="embedding",
+            param=search_params,
+            limit=top_k,
+            output_fields=["content", "metadata"],
+            timeout=timeout
+        )
+
+        # Format results
+        documents = []
+        for hits in results:
+            for hit in hits:
+                documents.append({
+                    "content": hit.entity.content,
+                    "metadata": hit.entity.metadata,
+                    "score": hit.score
+                })
+
+        return documents
+
+    def insert(self, contents: List[str], metadata: List[Dict[str, Any]], embeddings: np.ndarray) -> None:
+        self.collection.insert([contents, metadata, np.asarray(embeddings).tolist()])
+
+    def flush(self) -> None:
+        self.collection.flush()
+
+    def count(self) -> int:
+        return self.collection.num_entities
+
+    def iterate_documents(self, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """Yield every stored document, with its embedding, in batches."""
+        iterator = self.collection.query_iterator(
+            batch_size=batch_size,
+            expr="id >= 0",
+            output_fields=["content", "metadata", "embedding"],
+        )
+        try:
+            while True:
+                batch = iterator.next()
+                if not batch:
+                    break
+                yield batch
+        finally:
+            iterator.close()
+
+
+class LocalVectorBackend(VectorBackend):
+    """
+    In-process backend doing exact cosine search over a memory-mapped matrix.
+
+    The snapshot directory holds ``vectors.npy`` (L2-normalised float32 rows),
+    ``documents.jsonl`` (content and metadata, one line per row) and
+    ``manifest.json`` tying the two together. The matrix and document list
+    are swapped in as one tuple, so a search never pairs rows from one
+    snapshot with documents from another.
+    """
+
+    name = "local"
+
+    def __init__(self, path: str = VECTOR_DB_LOCAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending_vectors = []
+        self._pending_documents = []
+        self._index = (np.zeros((0, 0), dtype=np.float32), [])
+        self._load()
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._index[0]
+
+    @property
+    def documents(self) -> List[Dict[str, Any]]:
+        return self._index[1]
+
+    @staticmethod
+    def exists(path: str = VECTOR_DB_LOCAL_PATH) -> bool:
+        """Return True if a snapshot is present at ``path``."""
+        return os.path.exists(os.path.join(path, VECTORS_FILE))
+
+    def _load(self) -> None:
+        """
+        Load the snapshot and swap it in.
+
+        Raises:
+            ValueError: If the files do not belong to the same snapshot
+        """
+        vectors_path = os.path.join(self.path, VECTORS_FILE)
+        documents_path = os.path.join(self.path, DOCUMENTS_FILE)
+
+        if not os.path.exists(vectors_path):
+            self._index = (np.zeros((0, 0), dtype=np.float32), [])
+            return
+
+        _verify_snapshot(self.path)
+        vectors = np.load(vectors_path, mmap_mode="r")
+        with open(documents_path, encoding="utf-8") as f:
+            documents = [json.loads(line) for line in f if line.strip()]
+        if len(vectors) != len(documents):
+            raise ValueError(
+                f"Vector snapshot at {self.path} is inconsistent: "
+                f"{len(vectors)} vectors for {len(documents)} documents"
+            )
+
+        # Single assignment, so readers see either the old pair or the new one
+        self._index = (vectors, documents)
+
+    def search(self, embedding: np.ndarray, top_k: int, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        vectors, documents = self._index
+        if not len(vectors) or top_k <= 0:
+            return []
+
+        query = _normalize(np.asarray(embedding, dtype=np.float32).reshape(1, -1))[0]
+        scores = vectors @ query
+
+        top_k = min(top_k, len(scores))
+        top_indices = np.argpartition(-scores, top_k - 1)[:top_k]
+        top_indices = top_indices[np.argsort(-scores[top_indices])]
+
+        return [
+            {
+                "content": documents[i]["content"],
+                "metadata": documents[i].get("metadata", {}),
+                "score": float(scores[i]),
+            }
+            for i in top_indices
+        ]
+
+    def insert(self, contents: List[str], metadata: List[Dict[str, Any]], embeddings: np.ndarray) -> None:
+        with self._lock:
+            self._pending_vectors.append(_normalize(np.asarray(embeddings, dtype=np.float32)))
+            self._pending_documents.extend(
+                {"content": content, "metadata": meta} for content, meta in zip(contents, metadata)
+            )
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending_vectors:
+                return
+            current_vectors, current_documents = self._index
+            matrices = [np.asarray(current_vectors)] if len(current_vectors) else []
+            vectors = np.concatenate(matrices + self._pending_vectors)
+            documents = current_documents + self._pending_documents
+            write_snapshot(self.path, vectors, documents)
+            self._pending_vectors = []
+            self._pending_documents = []
+            self._load()
+
+    def count(self) -> int:
+        return len(self.documents)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise each row so a dot product equals cosine similarity."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _verify_snapshot(path: str) -> None:
+    """
+    Check that vectors.npy and documents.jsonl match the snapshot manifest.
+
+    Snapshots written before manifests existed are only checked for equal
+    row counts by the caller.
+
+    Raises:
+        ValueError: If either file differs from what the manifest records
+    """
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    for name, key in ((VECTORS_FILE, "vectors_sha256"), (DOCUMENTS_FILE, "documents_sha256")):
+        if _file_sha256(os.path.join(path, name)) != manifest.get(key):
+            raise ValueError(
+                f"Vector snapshot at {path} is inconsistent ({name} does not match the manifest); "
+                "re-create it with scripts/snapshot_vectors.py"
+            )
+
+
+def write_snapshot(path: str, vectors: np.ndarray, documents: List[Dict[str, Any]]) -> None:
+    """
+    Write a local snapshot, replacing any existing one.
+
+    All files are written to temporary paths first and then renamed:
+    documents, the manifest, and the vectors last. A crash part-way leaves a
+    pair of files that fails the manifest check on load instead of a
+    silently mismatched index.
+
+    Args:
+        path: Snapshot directory
+        vectors: Matrix of L2-normalised embeddings, one row per document
+        documents: Documents with 'content' and 'metadata', in row order
+    """
+    os.makedirs(path, exist_ok=True)
+
+    vectors_tmp = os.path.join(path, f"{VECTORS_FILE}.tmp")
+    with open(vectors_tmp, "wb") as f:
+        np.save(f, np.asarray(vectors, dtype=np.float32))
+
+    documents_tmp = os.path.join(path, f"{DOCUMENTS_FILE}.tmp")
+    with open(documents_tmp, "w", encoding="utf-8") as f:
+        for document in documents:
+            f.write(json.dumps(document, ensure_ascii=False) + "\n")
+
+    manifest_tmp = os.path.join(path, f"{MANIFEST_FILE}.tmp")
+    with open(manifest_tmp, "w", encoding="utf-8") as f:
+        json.dump({
+            "count": len(documents),
+            "vectors_sha256": _file_sha256(vectors_tmp),
+            "documents_sha256": _file_sha256(documents_tmp),
+        }, f)
+
+    os.replace(documents_tmp, os.path.join(path, DOCUMENTS_FILE))
+    os.replace(manifest_tmp, os.path.join(path, MANIFEST_FILE))
+    os.replace(vectors_tmp, os.path.join(path, VECTORS_FILE))
+
+
+def snapshot_zilliz_collection(source: ZillizBackend, path: str = VECTOR_DB_LOCAL_PATH,
+                               batch_size: int = 1000) -> int:
+    """
+    Copy every document in the Zilliz collection into a local snapshot.
+
+    Returns:
+        int: Number of documents written
+    """
+    vectors = []
+    documents = []
+    for batch in source.iterate_documents(batch_size=batch_size):
+        vectors.append(_normalize(np.asarray([row["embedding"] for row in batch], dtype=np.float32)))
+        documents.extend({"content": row["content"], "metadata": row.get("metadata") or {}} for row in batch)
+
+    matrix = np.concatenate(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+    write_snapshot(path, matrix, documents)
+    return len(documents)
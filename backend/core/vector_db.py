@@ -1,74 +1,108 @@
 """
 Vector database configuration and utilities for Zilliz Cloud integration.
+
+The storage backend is selected with VECTOR_DB_BACKEND: "zilliz" (default) or
+"local" for an in-process index over a snapshot of the collection. With
+VECTOR_DB_LOCAL_FALLBACK enabled, Zilliz failures fall back to the local
+snapshot when one exists.
 """
 import os
-from typing import List, Optional, Dict, Any
+import json
+import threading
+import time
+from itertools import islice
+from typing import List, Optional, Dict, Any, Iterable, Callable
 
-from pymilvus import connections, Collection, utility, CollectionSchema, FieldSchema, DataType
 from sentence_transformers import SentenceTransformer
 import numpy as np
 from dotenv import load_dotenv
 
+from core.embedding_cache import (
+    EmbeddingCache,
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_TTL,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_LOWERCASE,
+)
+from core.embedding_dispatcher import (
+    EmbeddingDispatcher,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_BATCH_WAIT_MS,
+)
+from core.vector_backends import (
+    VectorBackend,
+    ZillizBackend,
+    LocalVectorBackend,
+    ZILLIZ_COLLECTION_NAME,
+    VECTOR_DB_LOCAL_PATH,
+)
+
 # Load environment variables
 load_dotenv()
 
-# Zilliz Cloud configuration
-ZILLIZ_CLOUD_URI = os.getenv("ZILLIZ_CLOUD_URI")
-ZILLIZ_CLOUD_TOKEN = os.getenv("ZILLIZ_CLOUD_TOKEN")
-ZILLIZ_COLLECTION_NAME = os.getenv("ZILLIZ_COLLECTION_NAME", "visa_assistant_vectors")
+# Backend selection
+VECTOR_DB_BACKEND = os.getenv("VECTOR_DB_BACKEND", "zilliz").lower()
+VECTOR_DB_LOCAL_FALLBACK = os.getenv("VECTOR_DB_LOCAL_FALLBACK", "false").lower() == "true"
 
 # Embedding model
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
 
+# Number of documents encoded and inserted per chunk during ingestion
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+
+# How long the collection version (entity count) is reused before re-checking
+COLLECTION_VERSION_TTL = float(os.getenv("COLLECTION_VERSION_TTL", "60"))
+
 
 class VectorDB:
-    """Vector database client for Zilliz Cloud."""
+    """Vector database client backed by Zilliz Cloud or a local snapshot."""
 
     def __init__(self):
         """Initialize the vector database connection."""
         self.encoder = SentenceTransformer(EMBEDDING_MODEL)
-
-        # Connect to Zilliz Cloud
-        connections.connect(
-            alias="default",
-            uri=ZILLIZ_CLOUD_URI,
-            token=ZILLIZ_CLOUD_TOKEN,
+        self.embedding_cache = EmbeddingCache(
+            EMBEDDING_MODEL,
+            max_size=EMBEDDING_CACHE_SIZE,
+            ttl=EMBEDDING_CACHE_TTL,
+            path=EMBEDDING_CACHE_PATH,
+            lowercase=_cache_folds_case(self.encoder),
         )
+        # Concurrent query encodes are grouped into batched forward passes
+        self.embedding_dispatcher = EmbeddingDispatcher(
+            self.encoder,
+            max_batch_size=EMBEDDING_BATCH_SIZE,
+            max_wait_ms=EMBEDDING_BATCH_WAIT_MS,
+        )
+
+        self.backend, self.fallback_backend = self._create_backends()
+
+        # Cached knowledge-base version, see get_collection_version()
+        self._ingest_generation = 0
+        self._collection_version = None
+        self._collection_version_checked_at = 0.0
+        self._version_lock = threading.Lock()
+
+    def _create_backends(self):
+        """
+        Build the primary backend and, if enabled, a local fallback.
 
-        # Ensure collection exists
-        self._ensure_collection_exists()
-
-        # Get collection
-        self.collection = Collection(ZILLIZ_COLLECTION_NAME)
-        self.collection.load()
-
-    def _ensure_collection_exists(self) -> None:
-        """Ensure the collection exists, create it if not."""
-        if not utility.has_collection(ZILLIZ_COLLECTION_NAME):
-            print(f"Collection {ZILLIZ_COLLECTION_NAME} does not exist. Creating...")
-            
-            # Define fields
-            fields = [
-                FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
-                FieldSchema(name="content", dtype=DataType.VARCHAR, max_length=65535),
-                FieldSchema(name="metadata", dtype=DataType.JSON),
-                FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=384)  # Match embedding model
-            ]
-
-            # Create schema and collection
-            schema = CollectionSchema(fields=fields, description="Visa Assistant Knowledge Base")
-            collection = Collection(name=ZILLIZ_COLLECTION_NAME, schema=schema)
-
-            # Create index
-            index_params = {
-                "metric_type": "COSINE",
-                "index_type": "HNSW",
-                "params": {"M": 8, "efConstruction": 64}
-            }
-            collection.create_index(field_name="embedding", index_params=index_params)
-            print(f"Collection {ZILLIZ_COLLECTION_NAME} created successfully.")
-        else:
-            print(f"Collection {ZILLIZ_COLLECTION_NAME} already exists.")
+        Returns:
+            tuple: (primary backend, fallback backend or None)
+        """
+        if VECTOR_DB_BACKEND == "local":
+            return LocalVectorBackend(VECTOR_DB_LOCAL_PATH), None
+
+        fallback = None
+        if VECTOR_DB_LOCAL_FALLBACK and LocalVectorBackend.exists(VECTOR_DB_LOCAL_PATH):
+            fallback = LocalVectorBackend(VECTOR_DB_LOCAL_PATH)
+
+        try:
+            return ZillizBackend(), fallback
+        except Exception as e:
+            if fallback is None:
+                raise
+            print(f"Error connecting to Zilliz Cloud, serving from local snapshot: {e}")
+            return fallback, None
 
     def add_documents(self, documents: List[Dict[str, Any]]) -> None:
         """
@@ -80,70 +114,209 @@ class VectorDB:
         if not documents:
             print("No documents provided for insertion.")
             return
-        
-        contents = [doc["content"] for doc in documents]
-        metadata = [doc.get("metadata", {}) for doc in documents]
-
-        # Generate embeddings
-        embeddings = self.encoder.encode(contents)
-
-        # Insert into collection
-        entities = [
-            contents,
-            metadata,
-            embeddings.tolist()
-        ]
-
-        # Insert into collection
-        self.collection.insert(entities)
-        self.collection.flush()
-        print(f"Inserted {len(documents)} documents successfully.")
-
-    def similarity_search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+
+        self.ingest_documents(documents)
+
+    def ingest_documents(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        batch_size: int = INGEST_BATCH_SIZE,
+        checkpoint_path: Optional[str] = None,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        source_id: Optional[str] = None,
+    ) -> int:
+        """
+        Stream documents into the vector database chunk by chunk.
+
+        Documents are pulled lazily from ``documents``, encoded and inserted
+        ``batch_size`` at a time, and the collection is flushed once at the end,
+        so memory use and request size stay bounded regardless of corpus size.
+
+        Args:
+            documents: Iterable (or generator) of documents with 'content' and optional 'metadata'
+            batch_size: Number of documents to encode and insert per chunk
+            checkpoint_path: Optional JSON file recording how many documents have been
+                inserted; an interrupted run resumes after that many documents. The
+                file is removed once ingestion completes.
+            progress_callback: Optional callable receiving the running total after each chunk
+            source_id: Optional fingerprint of the input (e.g. a file hash) stored in the
+                checkpoint; a checkpoint written for a different input is refused
+
+        Raises:
+            ValueError: If the checkpoint was written for a different source_id
+
+        Returns:
+            int: Total number of documents inserted, including ones from a resumed checkpoint
+        """
+        processed = _read_checkpoint(checkpoint_path, source_id)
+        iterator = iter(documents)
+
+        if processed:
+            print(f"Resuming ingestion after {processed} documents from checkpoint.")
+            for _ in islice(iterator, processed):
+                pass
+
+        inserted = 0
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                break
+
+            contents = [doc["content"] for doc in batch]
+            metadata = [doc.get("metadata", {}) for doc in batch]
+
+            # Generate embeddings
+            embeddings = self.encoder.encode(contents, batch_size=len(contents))
+
+            # Insert into the backend
+            self.backend.insert(contents, metadata, embeddings)
+
+            inserted += len(batch)
+            processed += len(batch)
+            _write_checkpoint(checkpoint_path, processed, source_id)
+            if progress_callback:
+                progress_callback(processed)
+
+        if inserted:
+            self.backend.flush()
+            with self._version_lock:
+                self._ingest_generation += 1
+                self._collection_version = None
+        # A finished run must not make the next run over the same path skip everything
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        print(f"Inserted {inserted} documents successfully.")
+
+        return processed
+
+    def get_collection_version(self):
+        """
+        Return a value that changes whenever the knowledge base changes.
+
+        Combines the backend's document count (re-read at most every
+        COLLECTION_VERSION_TTL seconds) with a counter bumped by ingestion in
+        this process. Used to invalidate caches derived from search results.
+        """
+        with self._version_lock:
+            now = time.monotonic()
+            if self._collection_version is None or now - self._collection_version_checked_at > COLLECTION_VERSION_TTL:
+                try:
+                    count = self.backend.count()
+                except Exception as e:
+                    print(f"Error reading collection size: {e}")
+                    count = None
+                self._collection_version = (self.backend.name, count, self._ingest_generation)
+                self._collection_version_checked_at = now
+            return self._collection_version
+
+    def encode_query(self, query: str) -> np.ndarray:
+        """
+        Encode a query, reusing a cached embedding when one is available.
+
+        Args:
+            query: Query text
+
+        Returns:
+            The query embedding
+        """
+        embedding = self.embedding_cache.get(query)
+        if embedding is None:
+            embedding = self.embedding_dispatcher.encode(query)
+            self.embedding_cache.put(query, embedding)
+        return embedding
+
+    def similarity_search(self, query: str, top_k: int = 5, deadline: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Perform similarity search.
 
         Args:
             query: Query text
             top_k: Number of results to return
-            
+            deadline: Optional time.monotonic() value; the backend call gets the
+                remaining time as its timeout and is skipped once it has passed
+
         Returns:
             List of documents with similarity scores
+
+        Raises:
+            TimeoutError: If the deadline passes before the backend is queried
         """
         # Generate query embedding
-        query_embedding = self.encoder.encode([query])[0]  # Ensure correct shape
-
-        # Search parameters
-        search_params = {"metric_type": "COSINE", "params": {"ef": 64}}
-        
-        # Perform search
-        results = self.collection.search(
-            data=[query_embedding.tolist()],
-            anns_field="embedding",
-            param=search_params,
-            limit=top_k,
-            output_fields=["content", "metadata"]
+        query_embedding = self.encode_query(query)
+
+        try:
+            return self.backend.search(query_embedding, top_k, timeout=_remaining(deadline))
+        except TimeoutError:
+            raise
+        except Exception as e:
+            if self.fallback_backend is None:
+                raise
+            print(f"Error searching {self.backend.name} backend, using local snapshot: {e}")
+            return self.fallback_backend.search(query_embedding, top_k, timeout=_remaining(deadline))
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left until ``deadline`` (None for no deadline); raises TimeoutError once it has passed."""
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("Search deadline passed")
+    return remaining
+
+
+def _cache_folds_case(encoder: SentenceTransformer) -> bool:
+    """
+    Whether query embedding cache keys may ignore case.
+
+    EMBEDDING_CACHE_LOWERCASE=true/false forces the choice; "auto" folds case
+    only when the model lowercases its input itself (an uncased tokenizer or
+    a do_lower_case Transformer module), so casing cannot change the vector.
+    """
+    if EMBEDDING_CACHE_LOWERCASE in ("true", "false"):
+        return EMBEDDING_CACHE_LOWERCASE == "true"
+    try:
+        if getattr(encoder.tokenizer, "do_lower_case", False):
+            return True
+        return bool(getattr(encoder._first_module(), "do_lower_case", False))
+    except Exception:
+        return False
+
+
+def _read_checkpoint(path: Optional[str], source_id: Optional[str] = None) -> int:
+    """Return the number of documents already ingested according to a checkpoint file."""
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if source_id is not None and checkpoint.get("source") != source_id:
+        raise ValueError(
+            f"Checkpoint {path} was written for a different input; "
+            "delete it to start over"
         )
+    return int(checkpoint.get("processed", 0))
 
-        # Format results
-        documents = []
-        for hits in results:
-            for hit in hits:
-                documents.append({
-                    "content": hit.entity.content,  
-                    "metadata": hit.entity.metadata,
-                    "score": hit.score
-                })
 
-        return documents
+def _write_checkpoint(path: Optional[str], processed: int, source_id: Optional[str] = None) -> None:
+    """Atomically record ingestion progress (and the input it belongs to) in a checkpoint file."""
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"processed": processed, "source": source_id}, f)
+    os.replace(tmp_path, path)
 
 
-# Create a singleton instance
+# Process-wide singleton instance shared by every endpoint
 _vector_db_instance = None
+_vector_db_lock = threading.Lock()
 
 def get_vector_db() -> VectorDB:
     """
-    Returns the initialized VectorDB instance.
+    Returns the process-wide VectorDB instance, creating it on first use.
+
+    Initialisation loads the embedding model and connects to Zilliz Cloud, so it
+    is guarded by a lock to make sure concurrent requests only do it once.
     
     Returns:
         VectorDB: The vector database instance
@@ -151,9 +324,22 @@ def get_vector_db() -> VectorDB:
     global _vector_db_instance
     
     if _vector_db_instance is None:
-        try:
-            _vector_db_instance = VectorDB()
-        except Exception as e:
-            raise ValueError(f"Failed to initialize VectorDB: {e}")
+        with _vector_db_lock:
+            if _vector_db_instance is None:
+                try:
+                    _vector_db_instance = VectorDB()
+                except Exception as e:
+                    raise ValueError(f"Failed to initialize VectorDB: {e}")
     
     return _vector_db_instance
+
+
+def warm_up_vector_db() -> None:
+    """
+    Initialise the shared VectorDB and run a dummy encode and search.
+
+    Called at application startup so the first real request does not pay for
+    model loading, the first forward pass or the collection load.
+    """
+    vector_db = get_vector_db()
+    vector_db.similarity_search("warm up", top_k=1)
@@ -0,0 +1,11 @@
+-- migrate:no-transaction
+-- Trigram indexes backing the ranked user search in api/search.py.
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_email_trgm
+    ON users USING gin (email gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_full_name_trgm
+    ON users USING gin (full_name gin_trgm_ops);
@@ -0,0 +1,10 @@
+-- Content-addressed translation cache used by services/translation.py.
+
+CREATE TABLE IF NOT EXISTS translation_cache (
+    cache_key VARCHAR(64) PRIMARY KEY,
+    source_text TEXT NOT NULL,
+    translated_text TEXT NOT NULL,
+    target_lang VARCHAR(20) NOT NULL,
+    prompt_version VARCHAR(20) NOT NULL,
+    created_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc')
+);
@@ -0,0 +1,4 @@
+-- Fingerprint of the form fields each interview assessment was generated
+-- from, used to regenerate assessments only when those fields change.
+
+ALTER TABLE interview_assessments ADD COLUMN IF NOT EXISTS form_fingerprint VARCHAR(64);
@@ -0,0 +1,39 @@
+-- migrate:no-transaction
+-- Indexes for the hot DS-160, interview assessment and evaluation lookups.
+-- Check them with scripts/explain_queries.py.
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+
+-- User forms list (api/ds160.py UserDS160FormsResource)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ds160_forms_target_user_created
+    ON ds160_forms (target_user_id, created_at);
+
+-- Latest form lookup for interview assessments
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ds160_forms_user_created
+    ON ds160_forms (user_id, created_at);
+
+-- Admin forms listing (keyset pagination)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ds160_forms_created_id
+    ON ds160_forms (created_at, id);
+
+-- Stored assessment lookup and assessment history
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_interview_assessments_user_form_created
+    ON interview_assessments (user_id, ds160_form_id, created_at);
+
+-- Per-user evaluation results
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_evaluation_results_email_created
+    ON evaluation_results (email, created_at);
+
+-- Admin evaluation results listing (keyset pagination)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_evaluation_results_created_id
+    ON evaluation_results (created_at, id);
+
+-- /client/all translation listing (keyset pagination)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ds160_form_translations_updated_app
+    ON ds160_form_translations (updated_at, original_form_application_id);
+
+-- Admin temp credentials and DS-160 user listings (keyset pagination)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_temp_user_credentials_created_id
+    ON temp_user_credentials (created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_created_id
+    ON users (created_at, id);
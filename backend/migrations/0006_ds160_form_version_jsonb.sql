@@ -0,0 +1,7 @@
+-- Optimistic concurrency for DS-160 form updates (DS160Form.version) and a
+-- jsonb form_data column so PATCH can be applied with jsonb operators.
+-- The type change rewrites ds160_forms; run it during a quiet period.
+
+ALTER TABLE ds160_forms ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+ALTER TABLE ds160_forms ALTER COLUMN form_data TYPE jsonb USING form_data::jsonb;
@@ -0,0 +1,4 @@
+-- Submitting user of each background job; the job status endpoint only
+-- returns jobs to their owner.
+
+ALTER TABLE background_jobs ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id);
@@ -0,0 +1,50 @@
+from core.extensions import db
+from datetime import datetime
+
+
+class BackgroundJob(db.Model):
+    """
+    A unit of work queued in the database and executed by scripts/run_worker.py.
+    """
+    __tablename__ = 'background_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))  # submitting user; only they can read the job
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, succeeded, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    last_error = db.Column(db.Text)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_background_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+    def error_summary(self):
+        """Last line of the stored traceback (e.g. "ValueError: ..."), without the stack."""
+        if not self.last_error:
+            return None
+        lines = [line.strip() for line in self.last_error.strip().splitlines() if line.strip()]
+        return lines[-1][:200] if lines else None
+
+    def to_dict(self):
+        # payload and the full traceback stay internal
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'error': self.error_summary(),
+            'run_after': self.run_after.isoformat() if self.run_after else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -1,5 +1,6 @@
 from core.extensions import db
 from datetime import datetime
+from sqlalchemy.dialects.postgresql import JSONB
 
 class DS160Form(db.Model):
     __tablename__ = 'ds160_forms'
@@ -8,22 +9,48 @@ class DS160Form(db.Model):
     application_id = db.Column(db.String(50), unique=True, nullable=False)  # Unique identifier for the form
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     status = db.Column(db.String(20), default='draft')
-    form_data = db.Column(db.JSON)
+    form_data = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     target_user_id = db.Column(db.Integer)
+    # Bumped on every write; used for optimistic concurrency and ETags
+    version = db.Column(db.Integer, nullable=False, default=1)
 
-    def to_dict(self):
-        return {
+    __table_args__ = (
+        db.Index('idx_ds160_forms_target_user_created', 'target_user_id', 'created_at'),
+        db.Index('idx_ds160_forms_user_created', 'user_id', 'created_at'),
+        db.Index('idx_ds160_forms_created_id', 'created_at', 'id'),
+    )
+
+    __mapper_args__ = {
+        'version_id_col': version
+    }
+
+    def to_dict(self, fields=None):
+        """
+        Serialise the form.
+
+        Args:
+            fields: Optional set of keys to include. form_data is only read
+                (and loaded, if deferred) when it is included.
+        """
+        data = {
             'id': self.id,
             'application_id': self.application_id,
             'user_id': self.user_id,
             'status': self.status,
-            'form_data': self.form_data,
+            'version': self.version,
+        }
+        if fields is None or 'form_data' in fields:
+            data['form_data'] = self.form_data
+        data.update({
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
             'target_user_id': self.target_user_id
-        }
+        })
+        if fields is None:
+            return data
+        return {key: value for key, value in data.items() if key in fields}
 
 
 class DS160FormTranslation(db.Model):
@@ -41,6 +68,10 @@ class DS160FormTranslation(db.Model):
     form_data = db.Column(db.JSON)  # The translated form data
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_ds160_form_translations_updated_app', 'updated_at', 'original_form_application_id'),
+    )
     
     # Relationship to the original form
     original_form = db.relationship('DS160Form', backref=db.backref('translations', lazy=True))
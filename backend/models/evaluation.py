@@ -12,15 +12,31 @@ class EvaluationResult(db.Model):
     risk_level = db.Column(db.String(50), nullable=False)
     form_data = db.Column(db.JSON, nullable=False)  # Store all form inputs
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_evaluation_results_email_created', 'email', 'created_at'),
+        db.Index('idx_evaluation_results_created_id', 'created_at', 'id'),
+    )
     
-    def to_dict(self):
-        return {
+    def to_dict(self, fields=None):
+        """
+        Serialise the result.
+
+        Args:
+            fields: Optional set of keys to include. form_data is only read
+                (and loaded, if deferred) when it is included.
+        """
+        data = {
             'id': self.id,
             'email': self.email,
             'name': self.name,
             'phone': self.phone,
             'score': self.score,
             'risk_level': self.risk_level,
-            'form_data': self.form_data,
-            'created_at': self.created_at.isoformat() if self.created_at else None
         }
+        if fields is None or 'form_data' in fields:
+            data['form_data'] = self.form_data
+        data['created_at'] = self.created_at.isoformat() if self.created_at else None
+        if fields is None:
+            return data
+        return {key: value for key, value in data.items() if key in fields}
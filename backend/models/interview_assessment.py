@@ -11,18 +11,36 @@ class InterviewAssessment(db.Model):
         db.Integer, db.ForeignKey("ds160_forms.id"), nullable=False
     )
     assessment = db.Column(db.Text, nullable=False)
+    # sha256 of the form fields the assessment was generated from
+    form_fingerprint = db.Column(db.String(64))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("idx_interview_assessments_user_form_created", "user_id", "ds160_form_id", "created_at"),
+    )
+
     # Relationships
     user = db.relationship("User", backref="interview_assessments")
     ds160_form = db.relationship("DS160Form", backref="interview_assessments")
 
-    def to_dict(self):
-        return {
+    def to_dict(self, fields=None):
+        """
+        Serialise the assessment.
+
+        Args:
+            fields: Optional set of keys to include. The related form is only
+                loaded when form_data is included; list queries should
+                selectinload(InterviewAssessment.ds160_form) in that case.
+        """
+        data = {
             "id": self.id,
             "user_id": self.user_id,
             "ds160_form_id": self.ds160_form_id,
             "assessment": self.assessment,
             "created_at": self.created_at.isoformat(),
-            "form_data": self.ds160_form.form_data if self.ds160_form else None,
         }
+        if fields is None or "form_data" in fields:
+            data["form_data"] = self.ds160_form.form_data if self.ds160_form else None
+        if fields is None:
+            return data
+        return {key: value for key, value in data.items() if key in fields}
@@ -11,6 +11,10 @@ class TempUserCredential(db.Model):
     password = db.Column(db.String(50), nullable=False)  # Store in plain text for admin to provide to user
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_used = db.Column(db.Boolean, default=False)
+
+    __table_args__ = (
+        db.Index('idx_temp_user_credentials_created_id', 'created_at', 'id'),
+    )
     
     def to_dict(self):
         return {
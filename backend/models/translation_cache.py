@@ -0,0 +1,19 @@
+from core.extensions import db
+from datetime import datetime
+
+
+class TranslationCacheEntry(db.Model):
+    """
+    Content-addressed cache of translated form values.
+
+    The key is a hash of (source text, target language, prompt version), so a
+    prompt change naturally invalidates old entries.
+    """
+    __tablename__ = 'translation_cache'
+
+    cache_key = db.Column(db.String(64), primary_key=True)
+    source_text = db.Column(db.Text, nullable=False)
+    translated_text = db.Column(db.Text, nullable=False)
+    target_lang = db.Column(db.String(20), nullable=False)
+    prompt_version = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
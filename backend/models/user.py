@@ -20,6 +20,10 @@ class User(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     role = db.Column(db.String(10), nullable=False, default=UserRole.USER)
 
+    __table_args__ = (
+        db.Index('idx_users_created_id', 'created_at', 'id'),
+    )
+
     # Relationships
     forms = db.relationship("DS160Form", backref="user", lazy=True)
 
@@ -0,0 +1,280 @@
+"""
+Query plan audit script.
+This script runs EXPLAIN (ANALYZE, FORMAT JSON) on the canonical query behind
+each hot DS-160, interview assessment and evaluation endpoint and flags any
+sequential scans.
+
+On a small database the planner prefers sequential scans regardless of
+indexes, so use --seed to insert synthetic rows first. Seeding happens inside
+a transaction that is rolled back at the end; nothing is left behind.
+
+Exits with status 1 if any query uses a sequential scan.
+"""
+import argparse
+import json
+import os
+import sys
+import uuid
+
+# Add the parent directory to the path so we can import the core module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.extensions import get_pg_connection
+
+PAGE_LIMIT = 51
+
+# name -> (endpoint, SQL with %(param)s placeholders)
+CANONICAL_QUERIES = {
+    "user_forms": (
+        "GET /api/ds160/user/forms",
+        """
+        SELECT id, application_id, user_id, status, created_at, updated_at, target_user_id
+        FROM ds160_forms
+        WHERE target_user_id = %(user_id)s
+        ORDER BY created_at DESC
+        """,
+    ),
+    "latest_form": (
+        "GET /api/ds160/interview-assessment",
+        """
+        SELECT * FROM ds160_forms
+        WHERE user_id = %(user_id)s
+        ORDER BY created_at DESC
+        LIMIT 1
+        """,
+    ),
+    "admin_forms_page": (
+        "GET /api/ds160/admin/forms?limit=50",
+        f"""
+        SELECT id, application_id, user_id, status, created_at, updated_at, target_user_id
+        FROM ds160_forms
+        ORDER BY created_at DESC, id DESC
+        LIMIT {PAGE_LIMIT}
+        """,
+    ),
+    "existing_assessment": (
+        "GET /api/ds160/interview-assessment",
+        """
+        SELECT * FROM interview_assessments
+        WHERE user_id = %(user_id)s AND ds160_form_id = %(form_id)s
+        ORDER BY created_at DESC
+        LIMIT 1
+        """,
+    ),
+    "assessment_history": (
+        "GET /api/ds160/interview-assessment/history",
+        """
+        SELECT * FROM interview_assessments
+        WHERE user_id = %(user_id)s
+        ORDER BY created_at DESC
+        """,
+    ),
+    "user_evaluations": (
+        "GET /api/evaluation/results/user",
+        """
+        SELECT id, email, name, phone, score, risk_level, created_at
+        FROM evaluation_results
+        WHERE email = %(email)s
+        ORDER BY created_at DESC
+        """,
+    ),
+    "admin_evaluations_page": (
+        "GET /api/evaluation/results?limit=50",
+        f"""
+        SELECT id, email, name, phone, score, risk_level, created_at
+        FROM evaluation_results
+        ORDER BY created_at DESC, id DESC
+        LIMIT {PAGE_LIMIT}
+        """,
+    ),
+    "client_all_page": (
+        "GET /api/ds160/client/all?limit=50",
+        f"""
+        SELECT original_form_application_id, updated_at
+        FROM ds160_form_translations
+        ORDER BY updated_at DESC, original_form_application_id DESC
+        LIMIT {PAGE_LIMIT}
+        """,
+    ),
+    "temp_credentials_page": (
+        "GET /api/evaluation/temp-credentials?limit=50",
+        f"""
+        SELECT * FROM temp_user_credentials
+        ORDER BY created_at DESC, id DESC
+        LIMIT {PAGE_LIMIT}
+        """,
+    ),
+    "users_page": (
+        "GET /api/ds160/users?limit=50",
+        f"""
+        SELECT id, username, email, created_at
+        FROM users
+        ORDER BY created_at DESC, id DESC
+        LIMIT {PAGE_LIMIT}
+        """,
+    ),
+}
+
+SEED_STATEMENTS = [
+    """
+    INSERT INTO users (username, email, role, is_active, created_at)
+    SELECT %(prefix)s || '-user-' || g, %(prefix)s || '-user-' || g || '@example.com', 'user', true,
+           (now() AT TIME ZONE 'utc') - (g || ' minutes')::interval
+    FROM generate_series(1, %(users)s) g
+    """,
+    """
+    INSERT INTO ds160_forms (application_id, user_id, target_user_id, status, form_data, created_at, updated_at)
+    SELECT %(prefix)s || '-app-' || g, u.id, u.id,
+           CASE WHEN g %% 3 = 0 THEN 'submitted' ELSE 'draft' END,
+           '{"surname": "Seed", "givenName": "Row"}',
+           (now() AT TIME ZONE 'utc') - (g || ' seconds')::interval,
+           (now() AT TIME ZONE 'utc') - (g || ' seconds')::interval
+    FROM generate_series(1, %(rows)s) g
+    JOIN (
+        SELECT id, row_number() OVER (ORDER BY id) AS n
+        FROM users WHERE email LIKE %(user_pattern)s
+    ) u ON u.n = (g %% %(users)s) + 1
+    """,
+    """
+    INSERT INTO interview_assessments (user_id, ds160_form_id, assessment, created_at)
+    SELECT user_id, id, 'Seed assessment', created_at
+    FROM ds160_forms WHERE application_id LIKE %(app_pattern)s
+    """,
+    """
+    INSERT INTO ds160_form_translations (original_form_application_id, form_data, created_at, updated_at)
+    SELECT application_id, form_data, created_at, updated_at
+    FROM ds160_forms WHERE application_id LIKE %(app_pattern)s AND status = 'submitted'
+    """,
+    """
+    INSERT INTO evaluation_results (email, name, score, risk_level, form_data, created_at)
+    SELECT %(prefix)s || '-user-' || ((g %% %(users)s) + 1) || '@example.com', 'Seed', 50, 'medium', '{}',
+           (now() AT TIME ZONE 'utc') - (g || ' seconds')::interval
+    FROM generate_series(1, %(rows)s) g
+    """,
+    """
+    INSERT INTO temp_user_credentials (user_id, email, username, password, created_at, is_used)
+    SELECT id, email, username, 'seed', created_at, false
+    FROM users WHERE email LIKE %(user_pattern)s
+    """,
+]
+
+SEEDED_TABLES = [
+    "users",
+    "ds160_forms",
+    "interview_assessments",
+    "ds160_form_translations",
+    "evaluation_results",
+    "temp_user_credentials",
+]
+
+
+def seed(cursor, rows):
+    """Insert synthetic rows (inside the caller's transaction) and refresh statistics."""
+    prefix = f"explain-seed-{uuid.uuid4().hex[:8]}"
+    params = {
+        "prefix": prefix,
+        "rows": rows,
+        "users": max(rows // 10, 1),
+        "user_pattern": f"{prefix}-user-%",
+        "app_pattern": f"{prefix}-app-%",
+    }
+    for statement in SEED_STATEMENTS:
+        cursor.execute(statement, params)
+    for table in SEEDED_TABLES:
+        cursor.execute(f"ANALYZE {table}")
+    print(f"Seeded {rows} forms and evaluations for {params['users']} users (prefix {prefix}).")
+    return params
+
+
+def sample_params(cursor):
+    """Pick realistic parameter values from existing rows."""
+    params = {"user_id": 0, "form_id": 0, "email": ""}
+
+    cursor.execute("SELECT user_id, id FROM ds160_forms ORDER BY created_at DESC LIMIT 1")
+    row = cursor.fetchone()
+    if row:
+        params["user_id"], params["form_id"] = row
+
+    cursor.execute("SELECT email FROM evaluation_results ORDER BY created_at DESC LIMIT 1")
+    row = cursor.fetchone()
+    if row:
+        params["email"] = row[0]
+
+    return params
+
+
+def walk_plan(node, depth=0):
+    """Yield (depth, plan node) for a plan tree."""
+    yield depth, node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child, depth + 1)
+
+
+def describe(node):
+    """One-line summary of a plan node."""
+    text = node["Node Type"]
+    if node.get("Index Name"):
+        text += f" using {node['Index Name']}"
+    if node.get("Relation Name"):
+        text += f" on {node['Relation Name']}"
+    return f"{text} (rows={node.get('Actual Rows')}, time={node.get('Actual Total Time')}ms)"
+
+
+def explain(cursor, sql, params):
+    """Run EXPLAIN ANALYZE and return the top-level plan document."""
+    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE the canonical endpoint queries and flag sequential scans.")
+    parser.add_argument("--seed", type=int, default=0, metavar="ROWS",
+                        help="Insert ROWS synthetic forms/evaluations first (rolled back afterwards)")
+    parser.add_argument("--query", action="append", choices=sorted(CANONICAL_QUERIES),
+                        help="Only explain the named query (repeatable)")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan node")
+    args = parser.parse_args()
+
+    names = args.query or list(CANONICAL_QUERIES)
+    flagged = []
+
+    with get_pg_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            if args.seed:
+                seed(cursor, args.seed)
+            params = sample_params(cursor)
+
+            for name in names:
+                endpoint, sql = CANONICAL_QUERIES[name]
+                result = explain(cursor, sql, params)
+
+                seq_scans = [
+                    node for _, node in walk_plan(result["Plan"])
+                    if node["Node Type"] == "Seq Scan"
+                ]
+                status = "SEQ SCAN" if seq_scans else "ok"
+                print(f"[{status}] {name} ({endpoint}): {result.get('Execution Time')}ms")
+
+                for depth, node in walk_plan(result["Plan"]):
+                    if args.verbose or node["Node Type"] == "Seq Scan" or node.get("Index Name"):
+                        print(f"    {'  ' * depth}{describe(node)}")
+
+                if seq_scans:
+                    flagged.append(name)
+        finally:
+            # EXPLAIN ANALYZE executes the queries; never keep seeded rows
+            conn.rollback()
+            cursor.close()
+
+    if flagged:
+        print(f"\nSequential scans in {len(flagged)} queries: {', '.join(flagged)}")
+        sys.exit(1)
+    print("\nNo sequential scans.")
+
+
+if __name__ == "__main__":
+    main()
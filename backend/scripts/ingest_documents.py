@@ -0,0 +1,77 @@
+"""
+Bulk ingestion script for the vector database.
+This script streams documents from a JSON Lines file into Zilliz Cloud in chunks.
+
+Each line of the input file must be a JSON object with a 'content' field and an
+optional 'metadata' object.
+
+Progress is checkpointed so an interrupted run can be resumed. The checkpoint
+records a hash of the input file and is removed when ingestion completes, so
+a changed input or a repeat run is never silently skipped.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+# Add the parent directory to the path so we can import the core module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.vector_db import get_vector_db, INGEST_BATCH_SIZE
+
+
+def read_documents(path):
+    """Lazily yield documents from a JSON Lines file."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            document = json.loads(line)
+            if "content" not in document:
+                raise ValueError(f"Line {line_number} is missing the 'content' field")
+            yield document
+
+
+def file_fingerprint(path):
+    """SHA-256 of a file's contents, used to tie a checkpoint to its input."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream documents into the vector database.")
+    parser.add_argument("path", help="JSON Lines file with one document per line")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE,
+                        help=f"Documents per encode/insert chunk (default: {INGEST_BATCH_SIZE})")
+    parser.add_argument("--checkpoint", default=None,
+                        help="Checkpoint file used to resume an interrupted run (default: <path>.checkpoint)")
+    parser.add_argument("--no-checkpoint", action="store_true", help="Do not read or write a checkpoint")
+    args = parser.parse_args()
+
+    checkpoint_path = None if args.no_checkpoint else (args.checkpoint or f"{args.path}.checkpoint")
+
+    def report_progress(processed):
+        print(f"Ingested {processed} documents...")
+
+    vector_db = get_vector_db()
+    try:
+        total = vector_db.ingest_documents(
+            read_documents(args.path),
+            batch_size=args.batch_size,
+            checkpoint_path=checkpoint_path,
+            progress_callback=report_progress,
+            source_id=file_fingerprint(args.path) if checkpoint_path else None,
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Ingestion complete: {total} documents in total.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Database migration script.
+This script applies the SQL files in backend/migrations in filename order and
+records each applied file in the schema_migrations table, so it is safe to
+run repeatedly.
+
+A migration whose first line is "-- migrate:no-transaction" runs in
+autocommit mode (needed for CREATE INDEX CONCURRENTLY); every other migration
+runs inside a single transaction. An invalid index left by a failed
+concurrent build is dropped and rebuilt when its migration is re-run.
+"""
+import argparse
+import os
+import re
+import sys
+
+# Add the parent directory to the path so we can import the core module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.extensions import get_pg_connection
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+NO_TRANSACTION_DIRECTIVE = "-- migrate:no-transaction"
+
+# Opening tag of a dollar-quoted string: $$ or $tag$
+DOLLAR_QUOTE = re.compile(r"\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$")
+# CREATE INDEX CONCURRENTLY IF NOT EXISTS <name>, capturing the (possibly qualified or quoted) name
+CONCURRENT_INDEX = re.compile(
+    r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+((?:"[^"]+"|[\w$]+)(?:\.(?:"[^"]+"|[\w$]+))?)',
+    re.IGNORECASE,
+)
+
+
+def list_migrations():
+    """Return migration filenames in the order they should be applied."""
+    return sorted(name for name in os.listdir(MIGRATIONS_DIR) if name.endswith(".sql"))
+
+
+def split_statements(sql):
+    """
+    Split a migration into individual statements for autocommit execution.
+
+    Semicolons only end a statement outside string literals, quoted
+    identifiers, dollar-quoted bodies ($$ ... $$, $tag$ ... $tag$) and
+    comments. Comments are dropped.
+    """
+    statements = []
+    current = []
+    i = 0
+    length = len(sql)
+    while i < length:
+        char = sql[i]
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = length if end == -1 else end
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+            # A comment separates tokens like whitespace does
+            current.append(" ")
+        elif char in ("'", '"'):
+            # '' / "" inside a literal is an escaped quote and simply reopens it
+            end = sql.find(char, i + 1)
+            end = length if end == -1 else end + 1
+            current.append(sql[i:end])
+            i = end
+        elif char == "$" and DOLLAR_QUOTE.match(sql, i):
+            tag = DOLLAR_QUOTE.match(sql, i).group(0)
+            end = sql.find(tag, i + len(tag))
+            end = length if end == -1 else end + len(tag)
+            current.append(sql[i:end])
+            i = end
+        elif char == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            i += 1
+        else:
+            current.append(char)
+            i += 1
+
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def drop_invalid_index(cursor, statement):
+    """
+    Drop the leftover of a failed CREATE INDEX CONCURRENTLY before retrying it.
+
+    A failed concurrent build leaves an INVALID index behind, which
+    IF NOT EXISTS would otherwise skip on the next run.
+    """
+    match = CONCURRENT_INDEX.match(statement)
+    if not match:
+        return
+    name = match.group(1)
+    cursor.execute(
+        "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)",
+        (name,),
+    )
+    row = cursor.fetchone()
+    if row and row[0]:
+        print(f"Dropping invalid index {name} left by an earlier failed build")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def applied_migrations(conn):
+    """Create the bookkeeping table if needed and return applied versions."""
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version TEXT PRIMARY KEY,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """
+    )
+    conn.commit()
+    cursor.execute("SELECT version FROM schema_migrations")
+    versions = {row[0] for row in cursor.fetchall()}
+    cursor.close()
+    # End the read transaction so no-transaction migrations can switch to autocommit
+    conn.commit()
+    return versions
+
+
+def apply_migration(conn, name):
+    """Apply one migration file and record it."""
+    with open(os.path.join(MIGRATIONS_DIR, name), encoding="utf-8") as f:
+        sql = f.read()
+
+    cursor = conn.cursor()
+    if sql.lstrip().startswith(NO_TRANSACTION_DIRECTIVE):
+        # psycopg2 refuses to change autocommit inside an open transaction
+        conn.rollback()
+        try:
+            conn.autocommit = True
+            for statement in split_statements(sql):
+                drop_invalid_index(cursor, statement)
+                cursor.execute(statement)
+            cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (name,))
+        finally:
+            conn.autocommit = False
+    else:
+        try:
+            cursor.execute(sql)
+            cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (name,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending SQL migrations.")
+    parser.add_argument("--dry-run", action="store_true", help="List pending migrations without applying them")
+    args = parser.parse_args()
+
+    with get_pg_connection() as conn:
+        applied = applied_migrations(conn)
+        pending = [name for name in list_migrations() if name not in applied]
+
+        if not pending:
+            print("Database is up to date.")
+            return
+
+        for name in pending:
+            if args.dry_run:
+                print(f"Pending: {name}")
+                continue
+            print(f"Applying {name}...")
+            apply_migration(conn, name)
+            print(f"Applied {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Background job worker.
+This script runs queued jobs (such as DS-160 translations) from the
+background_jobs table. Start as many copies as needed; jobs are claimed with
+row locks so each one runs on exactly one worker.
+"""
+import argparse
+import logging
+import os
+import sys
+
+# Add the parent directory to the path so we can import the app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Workers never serve search or chat, so skip loading the embedding model
+os.environ.setdefault("VECTOR_DB_WARMUP", "false")
+
+from app import app
+from services.jobs import run_worker
+import services.ds160_tasks  # noqa: F401  (registers job handlers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background jobs.")
+    parser.add_argument("--poll-interval", type=float, default=2.0,
+                        help="Seconds to wait when the queue is empty (default: 2)")
+    parser.add_argument("--once", action="store_true", help="Drain runnable jobs and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with app.app_context():
+        run_worker(poll_interval=args.poll_interval, once=args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Vector snapshot script.
+This script copies the Zilliz Cloud collection into a local snapshot that the
+"local" vector backend (VECTOR_DB_BACKEND=local or VECTOR_DB_LOCAL_FALLBACK=true)
+serves from.
+"""
+import argparse
+import os
+import sys
+
+# Add the parent directory to the path so we can import the core module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.vector_backends import ZillizBackend, snapshot_zilliz_collection, VECTOR_DB_LOCAL_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot the Zilliz collection to a local vector index.")
+    parser.add_argument("--path", default=VECTOR_DB_LOCAL_PATH,
+                        help=f"Snapshot directory (default: {VECTOR_DB_LOCAL_PATH})")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents fetched per query batch")
+    args = parser.parse_args()
+
+    print("Connecting to Zilliz Cloud...")
+    source = ZillizBackend()
+    print(f"Snapshotting {source.count()} documents to {args.path}...")
+    total = snapshot_zilliz_collection(source, args.path, batch_size=args.batch_size)
+    print(f"Snapshot complete: {total} documents written.")
+
+
+if __name__ == "__main__":
+    main()
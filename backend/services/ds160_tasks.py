@@ -0,0 +1,75 @@
+"""
+Background job handlers for DS-160 forms.
+"""
+import logging
+
+from core.extensions import db
+from models.ds160 import DS160Form, DS160FormTranslation
+from services.jobs import job_handler, enqueue_job
+
+logger = logging.getLogger(__name__)
+
+TRANSLATE_FORM_JOB = 'translate_ds160_form'
+ASSESS_FORM_JOB = 'generate_interview_assessment'
+
+
+def enqueue_form_translation(application_id: str, user_id=None):
+    """Queue an English translation of a submitted form on behalf of ``user_id``; returns the job."""
+    return enqueue_job(TRANSLATE_FORM_JOB, {'application_id': application_id}, user_id=user_id)
+
+
+def enqueue_interview_assessment(application_id: str, user_id=None):
+    """Queue pre-generation of the interview assessment of a submitted form on behalf of ``user_id``; returns the job."""
+    return enqueue_job(ASSESS_FORM_JOB, {'application_id': application_id}, user_id=user_id)
+
+
+@job_handler(TRANSLATE_FORM_JOB)
+def translate_form(payload):
+    """Translate a DS-160 form and store the result in ds160_form_translations."""
+    from services.translation import translate_form_data
+
+    application_id = payload['application_id']
+    form = DS160Form.query.filter_by(application_id=application_id).first()
+    if not form:
+        raise ValueError(f"Form {application_id} not found")
+
+    logger.info(f"Starting translation for application_id: {application_id}")
+    translated_form_data = translate_form_data(form.form_data, source_lang='zh', target_lang='pinyin')
+
+    # A resubmitted form replaces its previous translation
+    translation = db.session.get(DS160FormTranslation, application_id)
+    if translation:
+        translation.form_data = translated_form_data
+    else:
+        translation = DS160FormTranslation(
+            original_form_application_id=application_id,
+            form_data=translated_form_data
+        )
+        db.session.add(translation)
+
+    db.session.commit()
+    logger.info(f"Stored translation for application_id: {application_id}")
+
+
+@job_handler(ASSESS_FORM_JOB)
+def assess_form(payload):
+    """Generate and store the interview assessment of a DS-160 form, unless a current one exists."""
+    from services.interview_assessment import (
+        generate_assessment,
+        get_existing_assessment,
+        is_assessment_current,
+        save_assessment,
+    )
+
+    application_id = payload['application_id']
+    form = DS160Form.query.filter_by(application_id=application_id).first()
+    if not form:
+        raise ValueError(f"Form {application_id} not found")
+
+    if is_assessment_current(get_existing_assessment(form.user_id, form), form):
+        logger.info(f"Interview assessment for {application_id} is up to date, skipping")
+        return
+
+    logger.info(f"Generating interview assessment for application_id: {application_id}")
+    save_assessment(form.user_id, form, generate_assessment(form.form_data))
+    logger.info(f"Stored interview assessment for application_id: {application_id}")
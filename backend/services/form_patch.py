@@ -0,0 +1,269 @@
+"""
+Partial updates of DS-160 draft form_data.
+
+Supports RFC 6902 JSON Patch (application/json-patch+json) and RFC 7396 JSON
+Merge Patch (application/merge-patch+json), with optimistic concurrency on
+DS160Form.version.
+
+On PostgreSQL, patches made of independent add/replace/remove operations on
+object keys (and merge patches that only set or delete top-level keys) are
+applied in a single UPDATE with jsonb_set, #- and ||, so the form_data blob
+never leaves the database. Anything else is applied in Python and written
+back through the ORM.
+"""
+import copy
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import jsonpatch
+from sqlalchemy import text
+from sqlalchemy.orm.exc import StaleDataError
+
+from core.extensions import db
+from models.ds160 import DS160Form
+
+logger = logging.getLogger(__name__)
+
+JSON_PATCH = "application/json-patch+json"
+MERGE_PATCH = "application/merge-patch+json"
+PATCH_FORMATS = (JSON_PATCH, MERGE_PATCH)
+
+
+class FormNotFound(Exception):
+    """The form does not exist."""
+
+
+class FormNotEditable(Exception):
+    """Only draft forms can be patched."""
+
+
+class VersionConflict(Exception):
+    """The form changed since the client read it."""
+
+    def __init__(self, current_version):
+        super().__init__(f"Form is at version {current_version}")
+        self.current_version = current_version
+
+
+class InvalidPatch(ValueError):
+    """The patch document is malformed or cannot be applied."""
+
+
+def apply_form_patch(application_id: str, patch: Any, patch_format: str, expected_version: int,
+                     user_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Apply a patch to a draft form's form_data.
+
+    Args:
+        application_id: Form to patch
+        patch: Parsed patch document
+        patch_format: JSON_PATCH or MERGE_PATCH
+        expected_version: Version the client based its patch on
+        user_id: If given, only a form created by or for this user is
+            patched; anyone else's form is reported as not found
+
+    Returns:
+        dict: application_id, the new version and updated_at
+
+    Raises:
+        FormNotFound, FormNotEditable, VersionConflict, InvalidPatch
+    """
+    if patch_format == JSON_PATCH:
+        operations = _validate_json_patch(patch)
+        fast_update = _json_patch_sql(operations)
+    elif patch_format == MERGE_PATCH:
+        # A non-object merge patch would replace the whole form with a list or scalar
+        if not isinstance(patch, dict):
+            raise InvalidPatch("Merge patch must be a JSON object")
+        fast_update = _merge_patch_sql(patch)
+    else:
+        raise InvalidPatch(f"Unsupported patch format: {patch_format}")
+
+    if fast_update and db.session.get_bind().dialect.name == "postgresql":
+        result = _apply_in_database(application_id, expected_version, user_id, *fast_update)
+        if result:
+            return result
+        logger.info(f"Fast patch path did not apply to {application_id}, falling back to Python")
+
+    return _apply_in_python(application_id, patch, patch_format, expected_version, user_id)
+
+
+def merge_patch(target: Any, patch: Any) -> Any:
+    """Apply an RFC 7396 merge patch and return the result."""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+def _validate_json_patch(patch: Any) -> List[Dict[str, Any]]:
+    """Check the overall shape of a JSON Patch document."""
+    if not isinstance(patch, list):
+        raise InvalidPatch("JSON Patch must be an array of operations")
+    for operation in patch:
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise InvalidPatch("Each JSON Patch operation needs 'op' and 'path'")
+    return patch
+
+
+def _pointer_tokens(pointer: str) -> Optional[List[str]]:
+    """Split a JSON Pointer into unescaped tokens, or None if it is not a valid pointer."""
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        return None
+    if not pointer:
+        return []
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _is_object_key_path(tokens: Optional[List[str]]) -> bool:
+    """Whether a path addresses an object member (no array indexes, not the root)."""
+    return bool(tokens) and all(not token.isdigit() and token != "-" for token in tokens)
+
+
+def _json_patch_sql(operations: List[Dict[str, Any]]) -> Optional[Tuple[str, List[str], Dict[str, Any]]]:
+    """
+    Translate a JSON Patch into a jsonb expression, if it qualifies for the fast path.
+
+    Every operation must be add, replace or remove on an object key, and no
+    path may be a prefix of another, so the operations are independent and
+    their preconditions can be checked against the stored document.
+
+    Returns:
+        tuple or None: (SQL expression, WHERE conditions, bind params)
+    """
+    paths = []
+    for operation in operations:
+        tokens = _pointer_tokens(operation["path"])
+        if operation["op"] not in ("add", "replace", "remove") or not _is_object_key_path(tokens):
+            return None
+        if operation["op"] != "remove" and "value" not in operation:
+            return None
+        paths.append(tokens)
+
+    for i, first in enumerate(paths):
+        for second in paths[i + 1:]:
+            shorter = min(len(first), len(second))
+            if first[:shorter] == second[:shorter]:
+                return None
+
+    expression = "form_data"
+    conditions = []
+    params = {}
+    for i, (operation, tokens) in enumerate(zip(operations, paths)):
+        params[f"path_{i}"] = tokens
+        path = f"CAST(:path_{i} AS text[])"
+
+        if operation["op"] == "remove":
+            conditions.append(f"form_data #> {path} IS NOT NULL")
+            expression = f"({expression} #- {path})"
+            continue
+
+        params[f"value_{i}"] = json.dumps(operation["value"])
+        value = f"CAST(:value_{i} AS jsonb)"
+        if operation["op"] == "replace":
+            conditions.append(f"form_data #> {path} IS NOT NULL")
+            expression = f"jsonb_set({expression}, {path}, {value}, false)"
+        else:
+            params[f"parent_{i}"] = tokens[:-1]
+            conditions.append(f"jsonb_typeof(form_data #> CAST(:parent_{i} AS text[])) = 'object'")
+            expression = f"jsonb_set({expression}, {path}, {value}, true)"
+
+    return expression, conditions, params
+
+
+def _merge_patch_sql(patch: Any) -> Optional[Tuple[str, List[str], Dict[str, Any]]]:
+    """
+    Translate a merge patch that only sets or deletes top-level keys into a jsonb expression.
+
+    Returns:
+        tuple or None: (SQL expression, WHERE conditions, bind params)
+    """
+    if not isinstance(patch, dict) or any(isinstance(value, dict) for value in patch.values()):
+        return None
+
+    removed = [key for key, value in patch.items() if value is None]
+    merged = {key: value for key, value in patch.items() if value is not None}
+    return (
+        "(form_data - CAST(:removed AS text[])) || CAST(:merged AS jsonb)",
+        ["jsonb_typeof(form_data) = 'object'"],
+        {"removed": removed, "merged": json.dumps(merged)},
+    )
+
+
+def _apply_in_database(application_id: str, expected_version: int, user_id: Optional[int], expression: str,
+                       conditions: List[str], params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Run the patch as one guarded UPDATE.
+
+    Returns:
+        dict or None: The new version info, or None if the patch's
+        preconditions did not hold and the Python path should decide
+    """
+    clauses = ["application_id = :application_id", "version = :version", "status = 'draft'"] + conditions
+    if user_id is not None:
+        clauses.append("(user_id = :user_id OR target_user_id = :user_id)")
+        params = {**params, "user_id": user_id}
+    where = " AND ".join(clauses)
+    row = db.session.execute(
+        text(f"""
+            UPDATE ds160_forms
+            SET form_data = {expression},
+                version = version + 1,
+                updated_at = (now() AT TIME ZONE 'utc')
+            WHERE {where}
+            RETURNING version, updated_at
+        """),
+        {**params, "application_id": application_id, "version": expected_version},
+    ).first()
+
+    if row is None:
+        db.session.rollback()
+        _check_form_state(application_id, expected_version, user_id)
+        return None
+
+    db.session.commit()
+    return {"application_id": application_id, "version": row.version, "updated_at": row.updated_at.isoformat()}
+
+
+def _check_form_state(application_id: str, expected_version: int, user_id: Optional[int] = None) -> DS160Form:
+    """Load the form and raise if it is missing (or not the user's), not a draft or at another version."""
+    form = DS160Form.query.filter_by(application_id=application_id).first()
+    if not form or (user_id is not None and user_id not in (form.user_id, form.target_user_id)):
+        raise FormNotFound(application_id)
+    if form.status != "draft":
+        raise FormNotEditable(form.status)
+    if form.version != expected_version:
+        raise VersionConflict(form.version)
+    return form
+
+
+def _apply_in_python(application_id: str, patch: Any, patch_format: str, expected_version: int,
+                     user_id: Optional[int] = None) -> Dict[str, Any]:
+    """Apply the patch to the loaded document and save it through the ORM."""
+    form = _check_form_state(application_id, expected_version, user_id)
+
+    if patch_format == JSON_PATCH:
+        try:
+            form_data = jsonpatch.apply_patch(form.form_data or {}, patch)
+        except (jsonpatch.JsonPatchException, jsonpatch.JsonPointerException) as e:
+            raise InvalidPatch(str(e))
+    else:
+        form_data = merge_patch(form.form_data, patch)
+    if not isinstance(form_data, dict):
+        raise InvalidPatch("Patch must leave form_data a JSON object")
+
+    # version_id_col makes this UPDATE fail if another write got in first
+    form.form_data = form_data
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        raise VersionConflict(DS160Form.query.filter_by(application_id=application_id).first().version)
+
+    return {"application_id": application_id, "version": form.version, "updated_at": form.updated_at.isoformat()}
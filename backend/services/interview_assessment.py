@@ -0,0 +1,154 @@
+"""
+Interview assessment helpers shared by the Flask and async request paths.
+
+Each stored assessment records a fingerprint of the form fields its prompt
+was built from, so an assessment is only regenerated when one of those
+fields actually changes.
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from core.extensions import db
+from core.llm import get_llm_gateway
+from models.ds160 import DS160Form
+from models.interview_assessment import InterviewAssessment
+
+ASSESSMENT_MODEL = "gpt-3.5-turbo"
+ASSESSMENT_SYSTEM_PROMPT = "You are an experienced US visa interview assessment expert."
+
+# Bump whenever the prompt or model changes so stored assessments are regenerated
+ASSESSMENT_PROMPT_VERSION = "1"
+
+# form_data keys read by build_assessment_prompt
+ASSESSMENT_FIELDS = (
+    'surname',
+    'givenName',
+    'purposeOfTrip',
+    'specificPurpose',
+    'primaryOccupation',
+    'employer',
+    'monthlyIncome',
+    'previousUsVisa',
+    'intendedLengthOfStay',
+    'pointOfContact',
+    'relationshipToContact',
+)
+
+
+def build_assessment_prompt(form_data: Dict[str, Any]) -> str:
+    """Build the assessment prompt from a DS-160 form's data."""
+    return f"""Based on the following DS-160 visa application information, provide a comprehensive interview assessment. 
+            Consider the following aspects:
+            1. Application Strength (评估申请优势)
+            2. Potential Risk Factors (潜在风险因素)
+            3. Suggested Preparation Points (建议准备要点)
+            4. Overall Success Probability (总体通过概率)
+
+            Applicant Information:
+            - Name: {form_data.get('surname', '')} {form_data.get('givenName', '')}
+            - Purpose of Trip: {form_data.get('purposeOfTrip', '')}
+            - Specific Purpose: {form_data.get('specificPurpose', '')}
+            - Occupation: {form_data.get('primaryOccupation', '')}
+            - Employer/School: {form_data.get('employer', '')}
+            - Monthly Income: {form_data.get('monthlyIncome', '')}
+            - Previous US Visa: {form_data.get('previousUsVisa', False)}
+            - Travel Plans: Staying for {form_data.get('intendedLengthOfStay', '')}
+            - US Point of Contact: {form_data.get('pointOfContact', '')}
+            - Relationship to Contact: {form_data.get('relationshipToContact', '')}
+
+            Please provide the assessment in Chinese language with clear sections and detailed explanations.
+            """
+
+
+def assessment_messages(prompt: str) -> List[Dict[str, str]]:
+    """Return the chat messages used to generate an assessment."""
+    return [
+        {"role": "system", "content": ASSESSMENT_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def get_latest_form(user_id) -> Optional[DS160Form]:
+    """Return the user's most recent DS-160 form."""
+    return (
+        DS160Form.query.filter_by(user_id=user_id)
+        .order_by(DS160Form.created_at.desc())
+        .first()
+    )
+
+
+def get_existing_assessment(user_id, form: DS160Form) -> Optional[InterviewAssessment]:
+    """Return the newest stored assessment of ``form`` for the user."""
+    return (
+        InterviewAssessment.query.filter_by(
+            user_id=user_id, ds160_form_id=form.application_id
+        )
+        .order_by(InterviewAssessment.created_at.desc())
+        .first()
+    )
+
+
+def assessment_fingerprint(form_data: Optional[Dict[str, Any]]) -> str:
+    """Hash of the prompt-relevant form fields, the model and the prompt version."""
+    form_data = form_data or {}
+    relevant = {key: form_data.get(key) for key in ASSESSMENT_FIELDS}
+    raw = json.dumps(
+        [ASSESSMENT_PROMPT_VERSION, ASSESSMENT_MODEL, relevant],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_assessment_current(assessment: Optional[InterviewAssessment], form: DS160Form) -> bool:
+    """
+    Whether ``assessment`` was generated from the form's current data.
+
+    Assessments stored before fingerprints existed count as current if they
+    are newer than the form's last update.
+    """
+    if assessment is None:
+        return False
+    if assessment.form_fingerprint is None:
+        return bool(
+            assessment.created_at and form.updated_at
+            and assessment.created_at >= form.updated_at
+        )
+    return assessment.form_fingerprint == assessment_fingerprint(form.form_data)
+
+
+def generate_assessment(form_data: Dict[str, Any]) -> str:
+    """Generate an assessment of ``form_data`` through the shared LLM gateway."""
+    response = get_llm_gateway().chat_completion(
+        assessment_messages(build_assessment_prompt(form_data)),
+        model=ASSESSMENT_MODEL,
+        temperature=0.7,
+        max_tokens=1000,
+    )
+    return response.choices[0].message.content
+
+
+def save_assessment(
+    user_id, form: DS160Form, assessment_text: str, fingerprint: Optional[str] = None
+) -> InterviewAssessment:
+    """
+    Store a newly generated assessment.
+
+    Args:
+        user_id: Owner of the assessment
+        form: The assessed form
+        assessment_text: Generated assessment
+        fingerprint: Fingerprint of the form data the assessment was generated
+            from; defaults to that of the form's current data
+    """
+    assessment = InterviewAssessment(
+        user_id=user_id,
+        ds160_form_id=form.application_id,
+        assessment=assessment_text,
+        form_fingerprint=fingerprint or assessment_fingerprint(form.form_data),
+    )
+    db.session.add(assessment)
+    db.session.commit()
+    return assessment
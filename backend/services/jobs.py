@@ -0,0 +1,193 @@
+"""
+Database-backed background job queue.
+
+Jobs are rows in the background_jobs table. Request handlers enqueue them in
+the same transaction as the data they refer to; scripts/run_worker.py claims
+them with SELECT ... FOR UPDATE SKIP LOCKED, so any number of worker
+processes can run side by side. Failed jobs are retried with exponential
+backoff until max_attempts is reached.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import or_, and_, text
+
+from core.extensions import db
+from models.background_job import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+# Retry and locking configuration
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_BASE_SECONDS = float(os.getenv("JOB_BACKOFF_BASE_SECONDS", "10"))
+JOB_BACKOFF_MAX_SECONDS = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", "600"))
+JOB_LOCK_TIMEOUT_SECONDS = float(os.getenv("JOB_LOCK_TIMEOUT_SECONDS", "900"))
+# How often a running job refreshes locked_at; must be well below JOB_LOCK_TIMEOUT_SECONDS
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "60"))
+
+# Registered job handlers, keyed by job type
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+
+
+def job_handler(job_type: str):
+    """Register a function as the handler for ``job_type`` jobs."""
+    def decorator(func):
+        JOB_HANDLERS[job_type] = func
+        return func
+    return decorator
+
+
+def enqueue_job(job_type: str, payload: Dict[str, Any], max_attempts: int = JOB_MAX_ATTEMPTS,
+                user_id: Optional[int] = None) -> BackgroundJob:
+    """
+    Add a job to the current session.
+
+    The caller commits, so the job becomes visible to workers atomically with
+    the data it refers to. ``user_id`` is the user allowed to read the job's
+    status.
+
+    Returns:
+        BackgroundJob: The pending job (its id is available after a flush)
+    """
+    job = BackgroundJob(job_type=job_type, payload=payload, max_attempts=max_attempts, user_id=user_id)
+    db.session.add(job)
+    db.session.flush()
+    logger.info(f"Enqueued {job_type} job {job.id}")
+    return job
+
+
+def claim_next_job(worker_id: str) -> Optional[BackgroundJob]:
+    """
+    Lock and mark the next runnable job as running.
+
+    Pending jobs whose run_after has passed are runnable, as are running jobs
+    whose worker stopped refreshing its lock (e.g. it crashed). run_job
+    refreshes locked_at every JOB_HEARTBEAT_SECONDS, so long-running jobs are
+    not reclaimed while their worker is alive.
+
+    Returns:
+        BackgroundJob or None: The claimed job, if any
+    """
+    now = datetime.utcnow()
+    stale_lock = now - timedelta(seconds=JOB_LOCK_TIMEOUT_SECONDS)
+
+    job = (
+        BackgroundJob.query
+        .filter(or_(
+            and_(BackgroundJob.status == 'pending', BackgroundJob.run_after <= now),
+            and_(BackgroundJob.status == 'running', BackgroundJob.locked_at < stale_lock),
+        ))
+        .order_by(BackgroundJob.run_after)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+
+    if not job:
+        db.session.rollback()
+        return None
+
+    job.status = 'running'
+    job.attempts += 1
+    job.locked_by = worker_id
+    job.locked_at = now
+    db.session.commit()
+    return job
+
+
+def _backoff_seconds(attempts: int) -> float:
+    """Exponential backoff delay before the next attempt."""
+    return min(JOB_BACKOFF_BASE_SECONDS * (2 ** (attempts - 1)), JOB_BACKOFF_MAX_SECONDS)
+
+
+@contextmanager
+def _lock_heartbeat(job: BackgroundJob):
+    """Refresh the job's locked_at from a background thread while the block runs."""
+    engine = db.engine
+    job_id, worker_id = job.id, job.locked_by
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(JOB_HEARTBEAT_SECONDS):
+            try:
+                # Separate connection so the handler's session and transactions are untouched
+                with engine.begin() as conn:
+                    conn.execute(
+                        text(
+                            "UPDATE background_jobs SET locked_at = :now "
+                            "WHERE id = :id AND locked_by = :worker AND status = 'running'"
+                        ),
+                        {"now": datetime.utcnow(), "id": job_id, "worker": worker_id},
+                    )
+            except Exception as e:
+                logger.warning(f"Failed to refresh lock on job {job_id}: {str(e)}")
+
+    thread = threading.Thread(target=beat, name=f"job-{job_id}-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job: BackgroundJob) -> None:
+    """Execute a claimed job and record its outcome."""
+    handler = JOB_HANDLERS.get(job.job_type)
+
+    try:
+        if handler is None:
+            raise ValueError(f"No handler registered for job type '{job.job_type}'")
+        with _lock_heartbeat(job):
+            handler(job.payload or {})
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Job {job.id} ({job.job_type}) failed on attempt {job.attempts}: {str(e)}")
+        job.last_error = traceback.format_exc()
+        job.locked_by = None
+        job.locked_at = None
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.finished_at = datetime.utcnow()
+        else:
+            job.status = 'pending'
+            job.run_after = datetime.utcnow() + timedelta(seconds=_backoff_seconds(job.attempts))
+        db.session.commit()
+        return
+
+    job.status = 'succeeded'
+    job.last_error = None
+    job.locked_by = None
+    job.locked_at = None
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    logger.info(f"Job {job.id} ({job.job_type}) succeeded")
+
+
+def run_worker(poll_interval: float = 2.0, once: bool = False) -> None:
+    """
+    Claim and run jobs until interrupted.
+
+    Must be called inside an application context.
+
+    Args:
+        poll_interval: Seconds to sleep when the queue is empty
+        once: Drain the currently runnable jobs and return instead of polling
+    """
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info(f"Worker {worker_id} started")
+
+    while True:
+        job = claim_next_job(worker_id)
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
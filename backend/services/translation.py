@@ -1,164 +1,336 @@
 import os
+import re
+import hashlib
+import copy
 import logging
 import json
-from typing import Optional, Dict, Any
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Optional, Dict, Any, List, Tuple
+
+from core.llm import get_llm_gateway, LLM_MAX_RETRIES, LLM_BACKOFF_MAX
+from services.translation_cache import get_cached_translations, store_cached_translations
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-openai_api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=openai_api_key)
+# Per-field fallback configuration
+TRANSLATION_MAX_CONCURRENCY = int(os.getenv("TRANSLATION_MAX_CONCURRENCY", "8"))
+TRANSLATION_FIELD_TIMEOUT = float(os.getenv("TRANSLATION_FIELD_TIMEOUT", "30"))
+
+# Chunked whole-form translation configuration
+TRANSLATION_CHUNK_TOKEN_BUDGET = int(os.getenv("TRANSLATION_CHUNK_TOKEN_BUDGET", "1200"))
+TRANSLATION_CHUNK_MAX_TOKENS = 4000
+TRANSLATION_CHUNK_TIMEOUT = float(os.getenv("TRANSLATION_CHUNK_TIMEOUT", "120"))
+TRANSLATION_CHUNK_RETRIES = int(os.getenv("TRANSLATION_CHUNK_RETRIES", "1"))
+TRANSLATION_MAX_PARALLEL_CHUNKS = int(os.getenv("TRANSLATION_MAX_PARALLEL_CHUNKS", "4"))
+
+TRANSLATION_MODEL = "gpt-4o"
+
+# CJK ideographs (incl. extensions and compatibility forms), CJK punctuation and fullwidth forms
+CJK_PATTERN = re.compile(r'[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef\U00020000-\U0002fa1f]')
+
+FORM_TRANSLATION_PROMPT = """
+        Translate all Chinese text in the values of the following JSON object to Pinyin.
+        Each key is the path of the form field the value came from; use it only as context.
+        Keep all non-Chinese text, numbers, and special characters unchanged.
+        Return a JSON object with exactly the same keys.
+        Only translate Chinese characters to Pinyin.
+
+        Examples:
+        - "我喜歡學習" → "Wo xihuan xuexi"
+        - "王大明在北京大學學習" → "Wang Daming zai Beijing Daxue xuexi"
+        - "Y" → Keep as "Y"
+        - "aven@borderxai.com" → Keep as "aven@borderxai.com"
+        - "孙意" → "Sun Yi"
+
+        JSON to translate:
+        {payload}
+        """
+
+FORM_TRANSLATION_SYSTEM_PROMPT = "You are a Chinese to Pinyin converter. Only output the converted JSON, no explanations."
+
+# Cache namespace derived from everything that shapes a cached translation, so
+# editing the prompts or the model invalidates stale entries automatically
+PROMPT_VERSION = hashlib.sha256(
+    "\x00".join([TRANSLATION_MODEL, FORM_TRANSLATION_SYSTEM_PROMPT, FORM_TRANSLATION_PROMPT]).encode("utf-8")
+).hexdigest()[:16]
+
 
 def translate_text(text: str, source_lang: str = 'zh', target_lang: str = 'pinyin') -> Optional[str]:
     """
     Convert Chinese text to Pinyin (romanized Chinese).
-    
+
+    Runs the value through translate_form_data, so it shares the form prompt,
+    the translation cache and the per-field fallback.
+
     Args:
         text (str): The text to convert to Pinyin
         source_lang (str): Source language code (default: 'zh' for Chinese)
         target_lang (str): Target format (default: 'pinyin')
-        
+
     Returns:
         Optional[str]: Text with Chinese characters converted to Pinyin or None if conversion failed
     """
     if not text or not text.strip():
         return text
-        
-    try:
-        # Create a specific prompt for Pinyin conversion
-        prompt = f"""
-        Translate the following text from Chinese to English, following these specific rules:
-
-        1. TRANSLATION RULES:
-        - Translate general Chinese phrases to fluent English (e.g., "學生" → "student")
-        - Convert Chinese PERSON NAMES to capitalized Pinyin (e.g., "孫意" → "Sun Yi")
-        - For PLACE NAMES:
-            • Use standard English names where available (e.g., "北京" → "Beijing")
-            • Otherwise, convert to capitalized Pinyin (e.g., "天津大學" → "Tianjin University")
-
-        2. DO NOT translate or alter:
-        - English words, single letters (e.g., 'Y'), numbers, or dates
-        - Email addresses, country/state codes, abbreviations
-        - Any text that appears to be IDs or reference codes
-        - Field labels such as "Full Name in Native Alphabet" — leave them in Original characters exactly as they were
-          ("Full Name in Native Alphabet" field should be completed if the name is written using a non-Roman alphabet.)
-
-        3. FORMAT RULES:
-        - Do NOT include tone numbers in Pinyin
-        - Ensure correct spacing and capitalization
-        - If the input contains **no Chinese characters**, return it **unchanged**
-        - DO NOT add explanations or comments — only return the translated result
-
-        Examples:
-        - "我喜歡學習" → "I like to study"
-        - "王大明在北京大學學習" → "Wang Daming studies at Beijing University"
-        - "Y" → Keep as "Y"
-        - "aven@borderxai.com" → Keep as "aven@borderxai.com"
-        - "Full Name in Native Alphabet: 孙意" → Keep as "孙意"
 
-        Text to translate:
-        {text}
-        """
-        
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a Chinese to Pinyin converter. Only output the converted text, no explanations."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0,
-            max_tokens=1000
-        )
-        
-        translated_text = response.choices[0].message.content.strip()
-        return translated_text
-        
+    try:
+        translated = translate_form_data({"text": text}, source_lang, target_lang)["text"]
     except Exception as e:
         logger.error(f"Error converting to Pinyin: {str(e)}")
         return None
 
+    # translate_form_data leaves values it could not translate untouched
+    if contains_cjk(translated):
+        return None
+    return translated
+
+
 def translate_form_data(form_data: Dict[str, Any], source_lang: str = 'zh', target_lang: str = 'pinyin') -> Dict[str, Any]:
     """
     Convert all Chinese text in form data to Pinyin.
+
+    A local pre-pass walks the form and keeps only string values containing
+    CJK characters; everything else (emails, dates, codes, English) is copied
+    through untouched. Those values are looked up in the persistent
+    translation cache, the misses are sent to the model as a sparse payload
+    keyed by JSON Pointer path, and the results are merged back by path.
     """
     if not form_data:
         return form_data
-    
-    # Option 1: Process the entire form data at once
-    try:
-        # Convert the form data to a JSON string
-        form_data_str = json.dumps(form_data, ensure_ascii=False)
-        
-        # Create a prompt that instructs the model to translate all Chinese text to Pinyin
-        prompt = f"""
-        Translate all Chinese text in the following JSON to Pinyin. 
-        Keep all non-Chinese text, numbers, and special characters unchanged.
-        Keep the JSON structure exactly the same.
-        Only translate Chinese characters to Pinyin.
-        
-        Examples:
-        - "我喜歡學習" → "Wo xihuan xuexi"
-        - "王大明在北京大學學習" → "Wang Daming zai Beijing Daxue xuexi"
-        - "Y" → Keep as "Y"
-        - "aven@borderxai.com" → Keep as "aven@borderxai.com"
-        - "孙意" → "Sun Yi"
-        
-        JSON to translate:
-        {form_data_str}
-        """
-        
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a Chinese to Pinyin converter. Only output the converted JSON, no explanations."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0,
-            max_tokens=4000
-        )
-        
-        translated_json_str = response.choices[0].message.content.strip()
-        
-        # Try to parse the response as JSON
-        try:
-            # Find the JSON part in the response (in case the model adds any explanations)
-            import re
-            json_match = re.search(r'(\{.*\})', translated_json_str, re.DOTALL)
-            if json_match:
-                translated_json_str = json_match.group(1)
-            
-            translated_data = json.loads(translated_json_str)
-            return translated_data
-        except json.JSONDecodeError:
-            logger.error("Failed to parse the translated JSON response")
-            # Fall back to the recursive method
-            return _translate_form_data_recursive(form_data, source_lang, target_lang)
-    
-    except Exception as e:
-        logger.error(f"Error translating entire form data: {str(e)}")
-        # Fall back to the recursive method
-        return _translate_form_data_recursive(form_data, source_lang, target_lang)
 
-def _translate_form_data_recursive(form_data: Dict[str, Any], source_lang: str = 'zh', target_lang: str = 'pinyin') -> Dict[str, Any]:
+    entries = []
+    _collect_translatable(form_data, (), entries)
+
+    translated_data = copy.deepcopy(form_data)
+    if not entries:
+        logger.info("No Chinese text found in form data, skipping translation")
+        return translated_data
+
+    texts = {text for _, text in entries}
+    translations = get_cached_translations(texts, target_lang, PROMPT_VERSION)
+
+    # Send each uncached value once, under the first path it appears at
+    payload = {}
+    queued = set()
+    for path, text in entries:
+        if text not in translations and text not in queued:
+            payload[_json_pointer(path)] = text
+            queued.add(text)
+    logger.info(
+        f"Translation pre-pass: {len(entries)} values with Chinese text, "
+        f"{len(texts) - len(payload)} cached, {len(payload)} sent to the model"
+    )
+
+    if payload:
+        translated_payload = _translate_payload(payload, source_lang, target_lang)
+        new_translations = {payload[pointer]: translated for pointer, translated in translated_payload.items()}
+        store_cached_translations(new_translations, target_lang, PROMPT_VERSION)
+        translations.update(new_translations)
+
+    # Merge results back by path
+    for path, text in entries:
+        if text in translations:
+            _set_path(translated_data, path, translations[text])
+
+    return translated_data
+
+
+def contains_cjk(text: str) -> bool:
+    """Return True if the text contains any CJK ideographs or CJK punctuation."""
+    return bool(CJK_PATTERN.search(text))
+
+
+def _collect_translatable(value: Any, path: Tuple, entries: List[Tuple[Tuple, str]]) -> None:
+    """Gather (path, value) pairs for every string in the form that contains CJK text."""
+    if isinstance(value, str):
+        if contains_cjk(value):
+            entries.append((path, value))
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _collect_translatable(item, path + (key,), entries)
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            _collect_translatable(item, path + (index,), entries)
+
+
+def _json_pointer(path: Tuple) -> str:
+    """Render a path as an RFC 6901 JSON Pointer, e.g. ("spouse", "name") -> "/spouse/name"."""
+    return "".join("/" + str(part).replace("~", "~0").replace("/", "~1") for part in path)
+
+
+def _set_path(data: Any, path: Tuple, value: Any) -> None:
+    """Replace the value at ``path`` inside a nested dict/list structure."""
+    target = data
+    for part in path[:-1]:
+        target = target[part]
+    target[path[-1]] = value
+
+
+def _translate_payload(payload: Dict[str, str], source_lang: str = 'zh', target_lang: str = 'pinyin') -> Dict[str, str]:
     """
-    Convert all Chinese text in form data to Pinyin using a recursive approach.
+    Translate a sparse {path: text} payload in token-budgeted chunks.
+
+    The payload is split along top-level form sections into chunks of at most
+    TRANSLATION_CHUNK_TOKEN_BUDGET estimated tokens, and the chunks are
+    translated in parallel. Each chunk's response must contain exactly the
+    chunk's keys; only chunks that fail that check are retried, and values
+    from chunks that still fail go through the per-field fallback.
+
+    Returns:
+        dict: Path -> translated text. Values that could not be translated
+        are left out so they are not cached.
     """
-    translated_data = {}
-    
-    for key, value in form_data.items():
-        if isinstance(value, str):
-            translated_data[key] = translate_text(value, source_lang, target_lang)
-        elif isinstance(value, dict):
-            translated_data[key] = _translate_form_data_recursive(value, source_lang, target_lang)
-        elif isinstance(value, list):
-            translated_data[key] = [
-                _translate_form_data_recursive(item, source_lang, target_lang) if isinstance(item, dict)
-                else translate_text(item, source_lang, target_lang) if isinstance(item, str)
-                else item
-                for item in value
-            ]
-        else:
-            translated_data[key] = value
-            
-    return translated_data
+    chunks = _chunk_payload(payload, TRANSLATION_CHUNK_TOKEN_BUDGET)
+    logger.info(f"Translating {len(payload)} values in {len(chunks)} chunks")
+
+    translations = {}
+    for attempt in range(TRANSLATION_CHUNK_RETRIES + 1):
+        futures = {_chunk_executor.submit(_translate_chunk, chunk): chunk for chunk in chunks}
+
+        failed_chunks = []
+        for future, chunk in futures.items():
+            try:
+                translations.update(future.result())
+            except Exception as e:
+                logger.error(f"Translation chunk of {len(chunk)} values failed on attempt {attempt + 1}: {str(e)}")
+                failed_chunks.append(chunk)
+
+        chunks = failed_chunks
+        if not chunks:
+            return translations
+
+    # Fall back to translating the remaining values on their own
+    remaining = {pointer: text for chunk in chunks for pointer, text in chunk.items()}
+    translations.update(_translate_payload_individually(remaining, source_lang, target_lang))
+    return translations
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token estimate: about one token per CJK character, four characters per token otherwise."""
+    cjk_count = len(CJK_PATTERN.findall(text))
+    return cjk_count + (len(text) - cjk_count) // 4 + 1
+
+
+def _chunk_payload(payload: Dict[str, str], token_budget: int) -> List[Dict[str, str]]:
+    """
+    Split a {path: text} payload into chunks that fit the token budget.
+
+    Values from the same top-level section stay together unless the section
+    alone exceeds the budget, in which case it is split across chunks.
+    """
+    sections = {}
+    for pointer, text in payload.items():
+        section = pointer.split("/")[1] if pointer.count("/") else ""
+        sections.setdefault(section, []).append((pointer, text))
+
+    chunks = []
+    current, current_tokens = {}, 0
+    for items in sections.values():
+        section_tokens = sum(_estimate_tokens(pointer) + _estimate_tokens(text) for pointer, text in items)
+        if current and current_tokens + section_tokens > token_budget:
+            chunks.append(current)
+            current, current_tokens = {}, 0
+
+        for pointer, text in items:
+            item_tokens = _estimate_tokens(pointer) + _estimate_tokens(text)
+            if current and current_tokens + item_tokens > token_budget:
+                chunks.append(current)
+                current, current_tokens = {}, 0
+            current[pointer] = text
+            current_tokens += item_tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _translate_chunk(chunk: Dict[str, str], timeout: float = TRANSLATION_CHUNK_TIMEOUT) -> Dict[str, str]:
+    """
+    Translate one chunk with a single model call and validate the response.
+
+    This is the only path whose output is cached, so every cached value comes
+    from FORM_TRANSLATION_PROMPT.
+
+    Raises:
+        ValueError: If the response is not a JSON object of strings with exactly the chunk's keys
+    """
+    prompt = FORM_TRANSLATION_PROMPT.format(payload=json.dumps(chunk, ensure_ascii=False))
+
+    response = get_llm_gateway().chat_completion(
+        [
+            {"role": "system", "content": FORM_TRANSLATION_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        model=TRANSLATION_MODEL,
+        temperature=0,
+        max_tokens=TRANSLATION_CHUNK_MAX_TOKENS,
+        response_format={"type": "json_object"},
+        timeout=timeout
+    )
+
+    if response.choices[0].finish_reason == "length":
+        raise ValueError("Translation response was truncated")
+
+    translated_json_str = response.choices[0].message.content.strip()
+
+    # Find the JSON part in the response (in case the model adds any explanations)
+    json_match = re.search(r'(\{.*\})', translated_json_str, re.DOTALL)
+    if json_match:
+        translated_json_str = json_match.group(1)
+
+    translated_chunk = json.loads(translated_json_str)
+    if not isinstance(translated_chunk, dict):
+        raise ValueError("Translated JSON is not an object")
+
+    missing = set(chunk) - set(translated_chunk)
+    unexpected = set(translated_chunk) - set(chunk)
+    if missing or unexpected:
+        raise ValueError(f"Translated JSON keys do not match: {len(missing)} missing, {len(unexpected)} unexpected")
+    if not all(isinstance(value, str) for value in translated_chunk.values()):
+        raise ValueError("Translated JSON contains non-string values")
+
+    return translated_chunk
+
+
+def _translate_payload_individually(payload: Dict[str, str], source_lang: str = 'zh', target_lang: str = 'pinyin') -> Dict[str, str]:
+    """
+    Translate a {path: text} payload field by field, concurrently.
+
+    Each field is sent as a one-entry chunk with the same Pinyin prompt as the
+    chunked path, so both produce the same kind of result for the shared
+    cache. Fields run on a shared, bounded thread pool (TRANSLATION_MAX_CONCURRENCY).
+    Each model call has its own timeout; rate limiting and retries are handled
+    by the LLM gateway. Fields that still fail are left out of the result.
+    """
+    futures = {
+        _field_executor.submit(_translate_field, pointer, text): pointer
+        for pointer, text in payload.items()
+    }
+
+    # Bound the whole fallback by the worst case for a single field
+    overall_timeout = (TRANSLATION_FIELD_TIMEOUT + LLM_BACKOFF_MAX) * (LLM_MAX_RETRIES + 1)
+    done, not_done = wait(futures, timeout=overall_timeout)
+    for future in not_done:
+        future.cancel()
+        logger.error(f"Timed out translating field {futures[future]}")
+
+    translations = {}
+    for future in done:
+        translated = future.result()
+        if translated is not None:
+            translations[futures[future]] = translated
+
+    return translations
+
+
+_chunk_executor = ThreadPoolExecutor(max_workers=TRANSLATION_MAX_PARALLEL_CHUNKS, thread_name_prefix="translate-chunk")
+_field_executor = ThreadPoolExecutor(max_workers=TRANSLATION_MAX_CONCURRENCY, thread_name_prefix="translate-field")
+
+
+def _translate_field(pointer: str, text: str) -> Optional[str]:
+    """Translate one field, or return None if it fails."""
+    try:
+        return _translate_chunk({pointer: text}, timeout=TRANSLATION_FIELD_TIMEOUT)[pointer]
+    except Exception as e:
+        logger.error(f"Error converting to Pinyin: {str(e)}")
+        return None
@@ -0,0 +1,67 @@
+"""
+Persistent cache of translated form values, keyed on a hash of
+(source text, target language, prompt version).
+"""
+import hashlib
+import logging
+from typing import Dict, Iterable
+
+from core.extensions import db
+from models.translation_cache import TranslationCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of keys looked up per query
+LOOKUP_BATCH_SIZE = 500
+
+
+def translation_cache_key(text: str, target_lang: str, prompt_version: str) -> str:
+    """Return the content address of a translation."""
+    raw = f"{prompt_version}\x00{target_lang}\x00{text}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_cached_translations(texts: Iterable[str], target_lang: str, prompt_version: str) -> Dict[str, str]:
+    """
+    Look up cached translations.
+
+    Returns:
+        dict: Source text -> translated text for every cache hit. Empty if the
+        cache is unavailable (e.g. no application context).
+    """
+    keys = {translation_cache_key(text, target_lang, prompt_version): text for text in texts}
+    if not keys:
+        return {}
+
+    try:
+        key_list = list(keys)
+        hits = {}
+        for start in range(0, len(key_list), LOOKUP_BATCH_SIZE):
+            batch = key_list[start:start + LOOKUP_BATCH_SIZE]
+            entries = TranslationCacheEntry.query.filter(TranslationCacheEntry.cache_key.in_(batch)).all()
+            for entry in entries:
+                hits[keys[entry.cache_key]] = entry.translated_text
+        return hits
+    except Exception as e:
+        logger.error(f"Error reading translation cache: {str(e)}")
+        return {}
+
+
+def store_cached_translations(translations: Dict[str, str], target_lang: str, prompt_version: str) -> None:
+    """Persist newly translated values. Failures are logged and ignored."""
+    if not translations:
+        return
+
+    try:
+        for text, translated in translations.items():
+            db.session.merge(TranslationCacheEntry(
+                cache_key=translation_cache_key(text, target_lang, prompt_version),
+                source_text=text,
+                translated_text=translated,
+                target_lang=target_lang,
+                prompt_version=prompt_version,
+            ))
+        db.session.commit()
+    except Exception as e:
+        logger.error(f"Error writing translation cache: {str(e)}")
+        db.session.rollback()
@@ -0,0 +1,134 @@
+"""
+Tests for negotiated response compression (core/compression.py).
+"""
+import gzip
+import os
+import sys
+import zlib
+
+import pytest
+from flask import Flask, Response
+from werkzeug.http import parse_accept_header
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import compression
+from core.compression import COMPRESSION_MIN_SIZE, ENCODERS, choose_encoding, init_compression
+
+BODY = b'{"value": "' + b"x" * (COMPRESSION_MIN_SIZE * 2) + b'"}'
+
+
+def _accept(header):
+    """Parse an Accept-Encoding value the way request.accept_encodings does."""
+    return parse_accept_header(header)
+
+
+# --- Accept-Encoding negotiation ---------------------------------------------
+
+def test_choose_encoding_prefers_highest_quality():
+    assert choose_encoding(_accept("gzip;q=1.0, br;q=0.5")) == "gzip"
+
+
+def test_choose_encoding_without_supported_coding_is_none():
+    assert choose_encoding(_accept("")) is None
+    assert choose_encoding(_accept("deflate, identity")) is None
+    assert choose_encoding(_accept("gzip;q=0")) is None
+
+
+def test_choose_encoding_wildcard_picks_a_supported_coding():
+    assert choose_encoding(_accept("*")) in ENCODERS
+
+
+@pytest.mark.skipif("br" not in ENCODERS, reason="brotli is not installed")
+def test_choose_encoding_prefers_brotli_on_equal_quality():
+    assert choose_encoding(_accept("gzip, br")) == "br"
+
+
+def test_choose_encoding_skips_brotli_when_not_installed(monkeypatch):
+    monkeypatch.setattr(compression, "ENCODERS", {"gzip": ENCODERS["gzip"]})
+    assert choose_encoding(_accept("br, gzip;q=0.5")) == "gzip"
+
+
+# --- Responses ---------------------------------------------------------------
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    init_compression(app)
+
+    @app.route("/json")
+    def json_body():
+        response = Response(BODY, mimetype="application/json")
+        response.set_etag("v1")
+        return response
+
+    @app.route("/weak")
+    def weak_etag():
+        response = Response(BODY, mimetype="application/json")
+        response.set_etag("v1", weak=True)
+        return response
+
+    @app.route("/small")
+    def small_body():
+        return Response(b"{}", mimetype="application/json")
+
+    @app.route("/events")
+    def events():
+        return Response(BODY, mimetype="text/event-stream")
+
+    @app.route("/stream")
+    def stream():
+        return Response((chunk for chunk in [b"[1", b",2", b"", b"]"]), mimetype="application/json")
+
+    return app.test_client()
+
+
+def test_gzip_response_gets_encoded_strong_etag(client):
+    response = client.get("/json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["ETag"] == '"v1-gzip"'
+    assert gzip.decompress(response.get_data()) == BODY
+
+
+def test_weak_etag_is_kept_on_compressed_responses(client):
+    response = client.get("/weak", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == 'W/"v1"'
+
+
+def test_uncompressed_response_keeps_its_etag(client):
+    response = client.get("/json", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["ETag"] == '"v1"'
+    assert response.get_data() == BODY
+
+
+def test_small_and_unlisted_responses_are_not_compressed(client):
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/events", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_head_request_is_not_compressed(client):
+    assert "Content-Encoding" not in client.head("/json", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_streamed_response_is_compressed_chunk_by_chunk(client):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(response.get_data()) == b"[1,2]"
+
+
+def test_gzip_encoder_flush_emits_decodable_prefix():
+    encoder = ENCODERS["gzip"]()
+    first = encoder.compress(b"[1") + encoder.flush()
+
+    # Everything flushed so far decodes without the end of the stream
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(first) == b"[1"
+
+    rest = encoder.compress(b"]") + encoder.flush() + encoder.finish()
+    assert gzip.decompress(first + rest) == b"[1]"
@@ -0,0 +1,132 @@
+"""
+Tests for the query embedding cache (core/embedding_cache.py) and how
+VectorDB decides whether its keys may fold case.
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import embedding_cache
+from core.embedding_cache import EmbeddingCache, normalize_query
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(embedding_cache, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def _vector(*values):
+    return np.array(values, dtype=np.float32)
+
+
+# --- Key normalisation -------------------------------------------------------
+
+def test_normalize_query_collapses_whitespace_and_keeps_case():
+    assert normalize_query("  US \t visa\n fees ") == "US visa fees"
+
+
+def test_normalize_query_folds_case_only_when_asked():
+    assert normalize_query("US  Visa", lowercase=True) == "us visa"
+
+
+def test_cased_cache_keeps_case_variants_apart(clock):
+    cache = EmbeddingCache("model", lowercase=False)
+    cache.put("US visa", _vector(1, 0))
+    assert cache.get("us visa") is None
+    np.testing.assert_array_equal(cache.get("  US   visa "), _vector(1, 0))
+
+
+def test_uncased_cache_shares_case_variants(clock):
+    cache = EmbeddingCache("model", lowercase=True)
+    cache.put("US visa", _vector(1, 0))
+    np.testing.assert_array_equal(cache.get("us VISA"), _vector(1, 0))
+
+
+def test_keys_include_model_and_case_mode():
+    cased = EmbeddingCache("model", lowercase=False)
+    uncased = EmbeddingCache("model", lowercase=True)
+    other_model = EmbeddingCache("other-model", lowercase=False)
+    assert cased._key("visa") != uncased._key("visa")
+    assert cased._key("visa") != other_model._key("visa")
+    assert cased._key("visa ") == cased._key("visa")
+
+
+# --- Eviction and expiry -----------------------------------------------------
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = EmbeddingCache("model", max_size=2)
+    cache.put("a", _vector(1))
+    cache.put("b", _vector(2))
+    assert cache.get("a") is not None  # "b" is now the oldest
+    cache.put("c", _vector(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["size"] == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = EmbeddingCache("model", ttl=60)
+    cache.put("a", _vector(1))
+    clock.now += 60
+    assert cache.get("a") is not None
+    clock.now += 1
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 0)
+
+
+def test_disk_tier_survives_a_new_cache_instance(clock, tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    EmbeddingCache("model", path=path).put("visa", _vector(0.5, 0.25))
+
+    cache = EmbeddingCache("model", path=path)
+    np.testing.assert_array_equal(cache.get("visa"), _vector(0.5, 0.25))
+    assert cache.stats()["size"] == 1
+
+    # Expired rows on disk are dropped rather than served
+    clock.now += 10 ** 6
+    assert EmbeddingCache("model", path=path, ttl=60).get("visa") is None
+
+
+def test_clear_drops_memory_and_disk_entries(clock, tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    cache = EmbeddingCache("model", path=path)
+    cache.put("visa", _vector(1))
+    cache.clear()
+    assert cache.get("visa") is None
+    assert EmbeddingCache("model", path=path).get("visa") is None
+
+
+# --- Case folding decision ---------------------------------------------------
+
+def _encoder(tokenizer_lowercases=False, module_lowercases=False):
+    module = SimpleNamespace(do_lower_case=module_lowercases)
+    return SimpleNamespace(
+        tokenizer=SimpleNamespace(do_lower_case=tokenizer_lowercases),
+        _first_module=lambda: module,
+    )
+
+
+@pytest.mark.parametrize("setting, encoder, expected", [
+    ("auto", _encoder(), False),
+    ("auto", _encoder(tokenizer_lowercases=True), True),
+    ("auto", _encoder(module_lowercases=True), True),
+    ("true", _encoder(), True),
+    ("false", _encoder(tokenizer_lowercases=True), False),
+])
+def test_cache_folds_case_only_for_uncased_models(monkeypatch, setting, encoder, expected):
+    from core import vector_db
+
+    monkeypatch.setattr(vector_db, "EMBEDDING_CACHE_LOWERCASE", setting)
+    assert vector_db._cache_folds_case(encoder) is expected
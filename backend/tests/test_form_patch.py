@@ -0,0 +1,250 @@
+"""
+Tests for DS-160 draft patching (services/form_patch.py and the PATCH
+/api/ds160/form/<application_id> endpoint).
+
+The SQL builder tests need no database. The endpoint tests run against an
+in-memory SQLite database, which exercises the Python fallback path.
+"""
+import json
+import os
+import sys
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+from flask_restx import Api
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.extensions import db
+from models.ds160 import DS160Form
+from models.user import User
+from services.form_patch import (
+    JSON_PATCH,
+    MERGE_PATCH,
+    FormNotFound,
+    InvalidPatch,
+    VersionConflict,
+    _json_patch_sql,
+    _merge_patch_sql,
+    _pointer_tokens,
+    apply_form_patch,
+    merge_patch,
+)
+
+
+# --- JSON Pointer and SQL translation ---------------------------------------
+
+def test_pointer_tokens_unescapes_tilde_and_slash():
+    assert _pointer_tokens("/a~1b/c~0d") == ["a/b", "c~d"]
+    # ~01 is "~" followed by "1", not "/"
+    assert _pointer_tokens("/~01") == ["~1"]
+    assert _pointer_tokens("") == []
+    assert _pointer_tokens("no-leading-slash") is None
+
+
+def test_json_patch_sql_replace_uses_jsonb_set_without_create():
+    expression, conditions, params = _json_patch_sql(
+        [{"op": "replace", "path": "/personal/surname", "value": "Wang"}]
+    )
+    assert expression == "jsonb_set(form_data, CAST(:path_0 AS text[]), CAST(:value_0 AS jsonb), false)"
+    assert conditions == ["form_data #> CAST(:path_0 AS text[]) IS NOT NULL"]
+    assert params == {"path_0": ["personal", "surname"], "value_0": json.dumps("Wang")}
+
+
+def test_json_patch_sql_add_creates_key_under_existing_object():
+    expression, conditions, params = _json_patch_sql(
+        [{"op": "add", "path": "/personal/given~1name", "value": {"first": "Da"}}]
+    )
+    assert expression == "jsonb_set(form_data, CAST(:path_0 AS text[]), CAST(:value_0 AS jsonb), true)"
+    assert conditions == ["jsonb_typeof(form_data #> CAST(:parent_0 AS text[])) = 'object'"]
+    assert params["path_0"] == ["personal", "given/name"]
+    assert params["parent_0"] == ["personal"]
+    assert json.loads(params["value_0"]) == {"first": "Da"}
+
+
+def test_json_patch_sql_remove_uses_path_delete():
+    expression, conditions, params = _json_patch_sql([{"op": "remove", "path": "/a~0b"}])
+    assert expression == "(form_data #- CAST(:path_0 AS text[]))"
+    assert conditions == ["form_data #> CAST(:path_0 AS text[]) IS NOT NULL"]
+    assert params == {"path_0": ["a~b"]}
+
+
+def test_json_patch_sql_chains_independent_operations():
+    expression, _, params = _json_patch_sql([
+        {"op": "replace", "path": "/a", "value": 1},
+        {"op": "remove", "path": "/b"},
+    ])
+    assert expression == (
+        "(jsonb_set(form_data, CAST(:path_0 AS text[]), CAST(:value_0 AS jsonb), false)"
+        " #- CAST(:path_1 AS text[]))"
+    )
+    assert params["path_0"] == ["a"]
+    assert params["path_1"] == ["b"]
+
+
+@pytest.mark.parametrize("operations", [
+    [{"op": "move", "from": "/a", "path": "/b"}],
+    [{"op": "test", "path": "/a", "value": 1}],
+    [{"op": "replace", "path": "/items/0", "value": "x"}],
+    [{"op": "add", "path": "/items/-", "value": "x"}],
+    [{"op": "replace", "path": "", "value": {}}],
+    [{"op": "replace", "path": "/a"}],
+    # Overlapping paths depend on each other's result
+    [{"op": "add", "path": "/a", "value": {}}, {"op": "add", "path": "/a/b", "value": 1}],
+])
+def test_json_patch_sql_falls_back_for_unsupported_patches(operations):
+    assert _json_patch_sql(operations) is None
+
+
+def test_merge_patch_sql_sets_and_deletes_top_level_keys():
+    expression, conditions, params = _merge_patch_sql({"surname": "Wang", "alias": None})
+    assert expression == "(form_data - CAST(:removed AS text[])) || CAST(:merged AS jsonb)"
+    assert conditions == ["jsonb_typeof(form_data) = 'object'"]
+    assert params["removed"] == ["alias"]
+    assert json.loads(params["merged"]) == {"surname": "Wang"}
+
+
+def test_merge_patch_sql_falls_back_for_nested_objects():
+    assert _merge_patch_sql({"personal": {"surname": "Wang"}}) is None
+    assert _merge_patch_sql(["not", "an", "object"]) is None
+
+
+def test_merge_patch_follows_rfc_7396():
+    target = {"a": "b", "c": {"d": "e", "f": "g"}}
+    assert merge_patch(target, {"a": "z", "c": {"f": None}}) == {"a": "z", "c": {"d": "e"}}
+    assert target == {"a": "b", "c": {"d": "e", "f": "g"}}
+
+
+# --- Stale versions ----------------------------------------------------------
+
+@pytest.fixture
+def app():
+    from api.ds160 import api as ds160_ns
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["JWT_SECRET_KEY"] = "test-secret"
+    # Let Flask-RESTX hand JWT errors to flask_jwt_extended's 401 handlers
+    app.config["PROPAGATE_EXCEPTIONS"] = True
+    JWTManager(app)
+    db.init_app(app)
+    Api(app, prefix="/api").add_namespace(ds160_ns, path="/ds160")
+
+    with app.app_context():
+        db.create_all()
+        user = User(username="patch-test", email="patch-test@example.com")
+        other = User(username="patch-other", email="patch-other@example.com")
+        db.session.add_all([user, other])
+        db.session.flush()
+        db.session.add(DS160Form(
+            application_id="AA0000001",
+            user_id=user.id,
+            status="draft",
+            form_data={"surname": "Wang", "givenName": "Daming"},
+        ))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_apply_form_patch_bumps_version(app):
+    result = apply_form_patch("AA0000001", {"surname": "Li"}, MERGE_PATCH, expected_version=1)
+    assert result["version"] == 2
+    form = DS160Form.query.filter_by(application_id="AA0000001").first()
+    assert form.form_data == {"surname": "Li", "givenName": "Daming"}
+
+
+def test_apply_form_patch_rejects_non_object_merge_patch(app):
+    for patch in ([], "x", 1):
+        with pytest.raises(InvalidPatch):
+            apply_form_patch("AA0000001", patch, MERGE_PATCH, expected_version=1)
+    assert DS160Form.query.filter_by(application_id="AA0000001").first().form_data["surname"] == "Wang"
+
+
+def test_apply_form_patch_rejects_root_replacement_with_non_object(app):
+    with pytest.raises(InvalidPatch):
+        apply_form_patch("AA0000001", [{"op": "replace", "path": "", "value": []}], JSON_PATCH, 1)
+
+
+def test_apply_form_patch_hides_other_users_forms(app):
+    other = User.query.filter_by(username="patch-other").first()
+    with pytest.raises(FormNotFound):
+        apply_form_patch("AA0000001", {"surname": "Li"}, MERGE_PATCH, 1, user_id=other.id)
+
+
+def test_apply_form_patch_rejects_stale_version(app):
+    apply_form_patch("AA0000001", [{"op": "replace", "path": "/surname", "value": "Li"}], JSON_PATCH, 1)
+
+    with pytest.raises(VersionConflict) as excinfo:
+        apply_form_patch("AA0000001", [{"op": "replace", "path": "/surname", "value": "Zhao"}], JSON_PATCH, 1)
+    assert excinfo.value.current_version == 2
+    assert DS160Form.query.filter_by(application_id="AA0000001").first().form_data["surname"] == "Li"
+
+
+def _auth(username="patch-test"):
+    user = User.query.filter_by(username=username).first()
+    return {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+
+
+def _patch(client, body, headers=None, query="", username="patch-test"):
+    return client.patch(
+        f"/api/ds160/form/AA0000001{query}",
+        data=json.dumps(body),
+        headers={"Content-Type": MERGE_PATCH, **_auth(username), **(headers or {})},
+    )
+
+
+def test_patch_endpoint_returns_strong_etag(app):
+    response = _patch(app.test_client(), {"surname": "Li"}, {"If-Match": '"ds160-form-v1"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"ds160-form-v2"'
+
+
+def test_patch_endpoint_stale_if_match_is_412(app):
+    client = app.test_client()
+    assert _patch(client, {"surname": "Li"}, {"If-Match": '"ds160-form-v1"'}).status_code == 200
+
+    response = _patch(client, {"surname": "Zhao"}, {"If-Match": '"ds160-form-v1"'})
+    assert response.status_code == 412
+    assert response.get_json()["version"] == 2
+
+
+def test_patch_endpoint_weak_if_match_is_412(app):
+    response = _patch(app.test_client(), {"surname": "Li"}, {"If-Match": 'W/"ds160-form-v1"'})
+    assert response.status_code == 412
+
+
+def test_patch_endpoint_stale_version_param_is_409(app):
+    client = app.test_client()
+    assert _patch(client, {"surname": "Li"}, query="?version=1").status_code == 200
+
+    response = _patch(client, {"surname": "Zhao"}, query="?version=1")
+    assert response.status_code == 409
+    assert response.get_json()["version"] == 2
+
+
+def test_patch_endpoint_requires_a_version(app):
+    assert _patch(app.test_client(), {"surname": "Li"}).status_code == 428
+
+
+def test_patch_endpoint_requires_authentication(app):
+    response = app.test_client().patch(
+        "/api/ds160/form/AA0000001?version=1",
+        data=json.dumps({"surname": "Li"}),
+        headers={"Content-Type": MERGE_PATCH},
+    )
+    assert response.status_code == 401
+
+
+def test_patch_endpoint_other_users_form_is_404(app):
+    response = _patch(app.test_client(), {"surname": "Li"}, query="?version=1", username="patch-other")
+    assert response.status_code == 404
+
+
+def test_patch_endpoint_non_object_merge_patch_is_400(app):
+    response = _patch(app.test_client(), [], query="?version=1")
+    assert response.status_code == 400
@@ -0,0 +1,78 @@
+"""
+Tests for the conditional GET helpers (core/http_cache.py).
+"""
+import os
+import sys
+
+from flask import Flask
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.http_cache import (
+    CACHE_CONTROL,
+    cache_headers,
+    encoded_etag,
+    etag_for,
+    not_modified,
+    strip_etag_encoding,
+)
+
+app = Flask(__name__)
+
+
+def test_etag_for_changes_with_its_parts():
+    assert etag_for("form", 1, None) == etag_for("form", 1, None)
+    assert etag_for("form", 1) != etag_for("form", 2)
+    # Parts are separated, so shifting text between them changes the tag
+    assert etag_for("ab", "c") != etag_for("a", "bc")
+
+
+def test_encoded_etag_round_trips():
+    assert encoded_etag("abc", "gzip") == "abc-gzip"
+    assert strip_etag_encoding("abc-gzip") == "abc"
+    assert strip_etag_encoding("abc-br") == "abc"
+    assert strip_etag_encoding("abc-deflate") == "abc-deflate"
+
+
+def test_cache_headers_let_shared_caches_revalidate_per_user():
+    headers = cache_headers("abc")
+    assert headers["ETag"] == 'W/"abc"'
+    assert headers["Cache-Control"] == CACHE_CONTROL == "no-cache"
+    assert headers["Vary"] == "Authorization"
+    assert cache_headers("abc", weak=False)["ETag"] == '"abc"'
+
+
+def test_not_modified_without_if_none_match_is_none():
+    with app.test_request_context("/"):
+        assert not_modified("abc") is None
+
+
+def test_not_modified_stale_tag_is_none():
+    with app.test_request_context("/", headers={"If-None-Match": 'W/"old"'}):
+        assert not_modified("abc") is None
+
+
+def test_not_modified_matching_weak_tag_is_304():
+    with app.test_request_context("/", headers={"If-None-Match": 'W/"other", W/"abc"'}):
+        response = not_modified("abc", headers={"X-Extra": "1"})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == 'W/"abc"'
+    assert response.headers["X-Extra"] == "1"
+
+
+def test_not_modified_star_matches_anything():
+    with app.test_request_context("/", headers={"If-None-Match": "*"}):
+        assert not_modified("abc").status_code == 304
+
+
+def test_not_modified_matches_compressed_representation_and_echoes_it():
+    with app.test_request_context("/", headers={"If-None-Match": '"abc-gzip"'}):
+        response = not_modified("abc", weak=False)
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"abc-gzip"'
+
+
+def test_not_modified_ignores_other_resources_compressed_tags():
+    with app.test_request_context("/", headers={"If-None-Match": '"abcd-gzip"'}):
+        assert not_modified("abc", weak=False) is None
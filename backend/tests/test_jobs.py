@@ -0,0 +1,237 @@
+"""
+Tests for the database-backed job queue (services/jobs.py): claiming,
+retries with backoff, and the lock heartbeat.
+
+Runs against a SQLite file so the heartbeat thread can use its own connection.
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.extensions import db
+from models.background_job import BackgroundJob
+from models.ds160 import DS160Form  # noqa: F401 - resolves the User.forms relationship
+from models.user import User  # noqa: F401 - background_jobs.user_id references users
+from services import jobs
+from services.jobs import (
+    JOB_HANDLERS,
+    _backoff_seconds,
+    claim_next_job,
+    enqueue_job,
+    job_handler,
+    run_job,
+    run_worker,
+)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'jobs.sqlite3'}"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def handlers():
+    """Register test handlers and remove them afterwards."""
+    registered = dict(JOB_HANDLERS)
+    yield JOB_HANDLERS
+    JOB_HANDLERS.clear()
+    JOB_HANDLERS.update(registered)
+
+
+def _enqueue(job_type="test", payload=None, **kwargs):
+    job = enqueue_job(job_type, payload or {}, **kwargs)
+    db.session.commit()
+    return job
+
+
+# --- Claiming ----------------------------------------------------------------
+
+def test_claim_marks_the_job_running(app):
+    job = _enqueue()
+    claimed = claim_next_job("worker-1")
+
+    assert claimed.id == job.id
+    assert claimed.status == "running"
+    assert claimed.attempts == 1
+    assert claimed.locked_by == "worker-1"
+    assert claimed.locked_at is not None
+    # A running job with a fresh lock is not handed out twice
+    assert claim_next_job("worker-2") is None
+
+
+def test_claim_skips_jobs_scheduled_for_later(app):
+    _enqueue()
+    later = _enqueue()
+    later.run_after = datetime.utcnow() + timedelta(minutes=5)
+    db.session.commit()
+
+    assert claim_next_job("worker-1").id != later.id
+    assert claim_next_job("worker-1") is None
+
+
+def test_claim_takes_the_earliest_runnable_job_first(app):
+    newer = _enqueue()
+    older = _enqueue()
+    older.run_after = datetime.utcnow() - timedelta(minutes=5)
+    db.session.commit()
+
+    assert claim_next_job("worker-1").id == older.id
+    assert claim_next_job("worker-1").id == newer.id
+
+
+def test_claim_reclaims_jobs_with_a_stale_lock(app):
+    job = _enqueue()
+    claim_next_job("crashed-worker")
+    job.locked_at = datetime.utcnow() - timedelta(seconds=jobs.JOB_LOCK_TIMEOUT_SECONDS + 1)
+    db.session.commit()
+
+    reclaimed = claim_next_job("worker-2")
+    assert reclaimed.id == job.id
+    assert reclaimed.locked_by == "worker-2"
+    assert reclaimed.attempts == 2
+
+
+# --- Outcomes and retries ----------------------------------------------------
+
+def test_successful_job_is_finished_and_unlocked(app, handlers):
+    seen = []
+    job_handler("test")(seen.append)
+    _enqueue(payload={"application_id": "AA0000001"})
+
+    run_job(claim_next_job("worker-1"))
+
+    job = BackgroundJob.query.one()
+    assert seen == [{"application_id": "AA0000001"}]
+    assert job.status == "succeeded"
+    assert job.finished_at is not None
+    assert (job.locked_by, job.locked_at, job.last_error) == (None, None, None)
+
+
+def test_failed_job_is_rescheduled_with_backoff(app, handlers):
+    def fail(payload):
+        raise RuntimeError("translation service down")
+    job_handler("test")(fail)
+    _enqueue(max_attempts=3)
+
+    before = datetime.utcnow()
+    run_job(claim_next_job("worker-1"))
+
+    job = BackgroundJob.query.one()
+    assert job.status == "pending"
+    assert job.attempts == 1
+    assert job.locked_by is None
+    assert job.run_after >= before + timedelta(seconds=_backoff_seconds(1))
+    assert job.error_summary() == "RuntimeError: translation service down"
+    # Not runnable again until the backoff has passed
+    assert claim_next_job("worker-1") is None
+
+
+def test_job_fails_permanently_after_max_attempts(app, handlers):
+    def fail(payload):
+        raise RuntimeError("still down")
+    job_handler("test")(fail)
+    job = _enqueue(max_attempts=2)
+
+    for _ in range(2):
+        job.run_after = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        run_job(claim_next_job("worker-1"))
+
+    job = BackgroundJob.query.one()
+    assert job.status == "failed"
+    assert job.attempts == 2
+    assert job.finished_at is not None
+
+
+def test_job_without_a_handler_fails(app, handlers):
+    _enqueue(job_type="unknown", max_attempts=1)
+    run_job(claim_next_job("worker-1"))
+
+    job = BackgroundJob.query.one()
+    assert job.status == "failed"
+    assert "No handler registered" in job.error_summary()
+
+
+def test_backoff_doubles_up_to_the_maximum():
+    assert _backoff_seconds(1) == jobs.JOB_BACKOFF_BASE_SECONDS
+    assert _backoff_seconds(2) == min(jobs.JOB_BACKOFF_BASE_SECONDS * 2, jobs.JOB_BACKOFF_MAX_SECONDS)
+    assert _backoff_seconds(100) == jobs.JOB_BACKOFF_MAX_SECONDS
+
+
+def test_run_worker_once_drains_runnable_jobs(app, handlers):
+    seen = []
+    job_handler("test")(lambda payload: seen.append(payload["n"]))
+    for n in range(3):
+        _enqueue(payload={"n": n})
+
+    run_worker(once=True)
+
+    assert sorted(seen) == [0, 1, 2]
+    assert {job.status for job in BackgroundJob.query.all()} == {"succeeded"}
+
+
+# --- Heartbeat ---------------------------------------------------------------
+
+def test_heartbeat_refreshes_the_lock_while_the_handler_runs(app, handlers, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_HEARTBEAT_SECONDS", 0.05)
+    job_id = _enqueue().id
+    claimed = claim_next_job("worker-1")
+    claimed_at = claimed.locked_at
+    observed = []
+
+    def slow(payload):
+        time.sleep(0.3)
+        with db.engine.connect() as conn:
+            observed.append(conn.execute(
+                text("SELECT locked_at FROM background_jobs WHERE id = :id"), {"id": job_id}
+            ).scalar())
+
+    job_handler("test")(slow)
+    run_job(claimed)
+
+    refreshed = observed[0]
+    if isinstance(refreshed, str):
+        refreshed = datetime.fromisoformat(refreshed)
+    assert refreshed > claimed_at
+    assert BackgroundJob.query.one().status == "succeeded"
+
+
+def test_heartbeat_does_not_touch_a_job_taken_over_by_another_worker(app, handlers, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_HEARTBEAT_SECONDS", 0.05)
+    job_id = _enqueue().id
+    claimed = claim_next_job("worker-1")
+    stale = datetime(2000, 1, 1)
+
+    def taken_over(payload):
+        with db.engine.begin() as conn:
+            conn.execute(
+                text("UPDATE background_jobs SET locked_by = 'worker-2', locked_at = :stale WHERE id = :id"),
+                {"stale": stale, "id": job_id},
+            )
+        time.sleep(0.3)
+        with db.engine.connect() as conn:
+            locked_at = conn.execute(
+                text("SELECT locked_at FROM background_jobs WHERE id = :id"), {"id": job_id}
+            ).scalar()
+        assert str(locked_at).startswith("2000-01-01")
+
+    job_handler("test")(taken_over)
+    run_job(claimed)
+    assert BackgroundJob.query.one().status == "succeeded"
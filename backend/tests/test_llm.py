@@ -0,0 +1,187 @@
+"""
+Tests for the shared LLM gateway (core/llm.py): token-bucket refill, the
+shared cooldown after rate-limit responses, and retries.
+
+A fake clock replaces the module's ``time`` so nothing actually sleeps.
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIConnectionError, RateLimitError
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import llm
+from core.llm import LLMGateway, TokenBucket, estimate_tokens
+
+
+class FakeClock:
+    """Stands in for the time module: monotonic() is advanced by sleep()."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm, "time", clock)
+    # No jitter, so backoff delays are exact
+    monkeypatch.setattr(llm.random, "uniform", lambda a, b: 0.0)
+    return clock
+
+
+# --- Token bucket ------------------------------------------------------------
+
+def test_bucket_starts_full(clock):
+    bucket = TokenBucket(60)
+    assert bucket.reserve(60) == 0.0
+
+
+def test_bucket_waits_for_refill_once_empty(clock):
+    bucket = TokenBucket(60)  # one token per second
+    bucket.reserve(60)
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    # The debt carries over to the next caller
+    assert bucket.reserve(2) == pytest.approx(3.0)
+
+
+def test_bucket_refills_over_time_up_to_capacity(clock):
+    bucket = TokenBucket(60)
+    bucket.reserve(60)
+    clock.now += 30
+    assert bucket.reserve(30) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+    clock.now += 3600
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_bucket_caps_oversized_reservations_at_capacity(clock):
+    bucket = TokenBucket(60)
+    assert bucket.reserve(1000) == 0.0
+    assert bucket.reserve(60) == pytest.approx(60.0)
+
+
+def test_bucket_adjust_returns_unused_tokens(clock):
+    bucket = TokenBucket(60)
+    bucket.reserve(60)
+    bucket.adjust(10)
+    assert bucket.reserve(10) == 0.0
+    bucket.adjust(1000)
+    assert bucket.reserve(60) == 0.0
+
+
+def test_disabled_bucket_never_waits(clock):
+    bucket = TokenBucket(0)
+    assert not bucket.enabled
+    assert bucket.reserve(10 ** 6) == 0.0
+
+
+def test_estimate_tokens_counts_prompt_messages_and_completion():
+    messages = [{"role": "user", "content": "x" * 40}, {"role": "system", "content": None}]
+    assert estimate_tokens(messages, 100) == 10 + 8 + 100
+    assert estimate_tokens(messages, None) == 18
+
+
+# --- Cooldown and retries ----------------------------------------------------
+
+def _rate_limit_error(retry_after=None):
+    headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+def _connection_error():
+    return APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+
+
+def _gateway(outcomes):
+    """Gateway whose client raises or returns ``outcomes`` in order."""
+    gateway = LLMGateway(api_key="test-key")
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    gateway._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return gateway, calls
+
+
+def _completion(total_tokens=5):
+    return SimpleNamespace(usage=SimpleNamespace(prompt_tokens=total_tokens - 1, completion_tokens=1, total_tokens=total_tokens))
+
+
+def test_rate_limit_sets_shared_cooldown_from_retry_after(clock):
+    gateway, _ = _gateway([])
+    delay = gateway._handle_retryable("gpt-4o", _rate_limit_error(retry_after=20), attempt=0)
+    assert delay == pytest.approx(20.0)
+    assert gateway._cooldown_remaining() == pytest.approx(20.0)
+
+    clock.now += 15
+    assert gateway._cooldown_remaining() == pytest.approx(5.0)
+    clock.now += 10
+    assert gateway._cooldown_remaining() == 0.0
+
+
+def test_other_retryable_errors_back_off_without_cooldown(clock):
+    gateway, _ = _gateway([])
+    expected = min(llm.LLM_BACKOFF_BASE * 4, llm.LLM_BACKOFF_MAX)
+    assert gateway._handle_retryable("gpt-4o", _connection_error(), attempt=2) == pytest.approx(expected)
+    assert gateway._cooldown_remaining() == 0.0
+
+
+def test_handle_retryable_gives_up_after_max_retries(clock):
+    gateway, _ = _gateway([])
+    assert gateway._handle_retryable("gpt-4o", _connection_error(), attempt=llm.LLM_MAX_RETRIES) is None
+    assert gateway.stats()["gpt-4o"]["failures"] == 1
+
+
+def test_chat_completion_retries_after_cooldown(clock):
+    gateway, calls = _gateway([_rate_limit_error(retry_after=7), _completion()])
+    response = gateway.chat_completion([{"role": "user", "content": "hi"}], model="gpt-4o", max_tokens=10)
+
+    assert response.usage.total_tokens == 5
+    assert len(calls) == 2
+    assert calls[1]["max_tokens"] == 10
+    # Backoff slept the Retry-After delay; the second attempt found the cooldown over
+    assert 7.0 in clock.sleeps
+    stats = gateway.stats()["gpt-4o"]
+    assert stats["rate_limited"] == 1
+    assert stats["retries"] == 1
+    assert stats["requests"] == 2
+
+
+def test_chat_completion_does_not_retry_other_errors(clock):
+    gateway, calls = _gateway([ValueError("bad request")])
+    with pytest.raises(ValueError):
+        gateway.chat_completion([{"role": "user", "content": "hi"}], model="gpt-4o")
+    assert len(calls) == 1
+    assert gateway.stats()["gpt-4o"]["failures"] == 1
+
+
+def test_chat_completion_returns_overestimated_tokens_to_the_bucket(clock):
+    gateway, _ = _gateway([_completion(total_tokens=5)])
+    gateway.token_bucket = TokenBucket(100)
+    gateway.chat_completion([{"role": "user", "content": "hi"}], model="gpt-4o", max_tokens=50)
+    # Only the 5 tokens actually used stay reserved
+    assert gateway.token_bucket.reserve(95) == 0.0
+    assert gateway.token_bucket.reserve(1) > 0.0
@@ -0,0 +1,134 @@
+"""
+Tests for keyset pagination and field projection (core/pagination.py).
+
+The keyset tests run against an in-memory SQLite database.
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from werkzeug.datastructures import MultiDict
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.extensions import db
+from core.pagination import (
+    PAGE_SIZE_DEFAULT,
+    PAGE_SIZE_MAX,
+    decode_cursor,
+    encode_cursor,
+    keyset_paginate,
+    page_params,
+    parse_fields,
+    project,
+)
+from models.ds160 import DS160Form  # noqa: F401 - resolves the User.forms relationship
+from models.user import User
+
+
+# --- Cursors -----------------------------------------------------------------
+
+def test_cursor_round_trips_datetimes():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+def test_cursor_round_trips_plain_and_null_values():
+    assert decode_cursor(encode_cursor("2024-05-01", "abc")) == ("2024-05-01", "abc")
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor(1, 2)[:-3], "WzFd"])
+def test_decode_cursor_rejects_malformed_cursors(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+# --- Query string ------------------------------------------------------------
+
+def test_page_params_without_pagination_returns_every_row():
+    assert page_params(MultiDict()) == (None, None)
+
+
+def test_page_params_cursor_alone_uses_default_page_size():
+    assert page_params(MultiDict({"cursor": "abc"})) == (PAGE_SIZE_DEFAULT, "abc")
+
+
+def test_page_params_caps_limit():
+    assert page_params(MultiDict({"limit": str(PAGE_SIZE_MAX + 1)})) == (PAGE_SIZE_MAX, None)
+
+
+@pytest.mark.parametrize("limit", ["0", "-1", "ten"])
+def test_page_params_rejects_bad_limits(limit):
+    with pytest.raises(ValueError):
+        page_params(MultiDict({"limit": limit}))
+
+
+def test_field_projection():
+    fields = parse_fields(MultiDict({"fields": "id, email,,"}))
+    assert fields == {"id", "email"}
+    assert project({"id": 1, "email": "a@example.com", "username": "a"}, fields) == {"id": 1, "email": "a@example.com"}
+    assert project({"id": 1}, parse_fields(MultiDict())) == {"id": 1}
+
+
+# --- Keyset pagination -------------------------------------------------------
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        start = datetime(2024, 1, 1)
+        # Two users share a timestamp so the id tie-breaker matters
+        offsets = [0, 1, 1, 2, 3]
+        db.session.add_all([
+            User(username=f"page-{i}", email=f"page-{i}@example.com", created_at=start + timedelta(days=offset))
+            for i, offset in enumerate(offsets)
+        ])
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _walk(limit):
+    """Follow cursors through every page and return the usernames in order."""
+    seen, cursor = [], None
+    while True:
+        rows, cursor = keyset_paginate(User.query, User.created_at, User.id, limit, cursor)
+        seen.extend(user.username for user in rows)
+        if cursor is None:
+            return seen
+
+
+def test_keyset_paginate_orders_newest_first_with_id_tie_breaker(app):
+    rows, cursor = keyset_paginate(User.query, User.created_at, User.id, None)
+    assert [user.username for user in rows] == ["page-4", "page-3", "page-2", "page-1", "page-0"]
+    assert cursor is None
+
+
+def test_keyset_paginate_pages_through_every_row_once(app):
+    rows, cursor = keyset_paginate(User.query, User.created_at, User.id, 2)
+    assert [user.username for user in rows] == ["page-4", "page-3"]
+    assert cursor is not None
+    assert _walk(2) == ["page-4", "page-3", "page-2", "page-1", "page-0"]
+
+
+def test_keyset_paginate_keeps_null_sort_values(app):
+    User.query.filter(User.username.in_(["page-1", "page-3"])).update(
+        {User.created_at: None}, synchronize_session=False
+    )
+    db.session.commit()
+
+    # NULL rows come first, newest id first, then the dated rows
+    for limit in (1, 2, 3, 10):
+        assert _walk(limit) == ["page-3", "page-1", "page-4", "page-2", "page-0"]
@@ -0,0 +1,235 @@
+"""
+Tests for the bounded, health-checked PostgreSQL pool (core/extensions.py).
+
+psycopg2's ThreadedConnectionPool is replaced with an in-memory fake, so no
+database is needed.
+"""
+import gc
+import os
+import sys
+
+import psycopg2
+import pytest
+from psycopg2 import extensions as pg_extensions
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import extensions
+from core.extensions import PGConnectionPool
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        self.conn.pings += 1
+        if not self.conn.alive:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.closed = 0
+        self.pings = 0
+        self.rollbacks = 0
+        self.in_transaction = False
+        self.rollback_fails = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def get_transaction_status(self):
+        if self.in_transaction:
+            return pg_extensions.TRANSACTION_STATUS_INTRANS
+        return pg_extensions.TRANSACTION_STATUS_IDLE
+
+    def rollback(self):
+        self.rollbacks += 1
+        if self.rollback_fails:
+            raise psycopg2.InterfaceError("connection already closed")
+        self.in_transaction = False
+
+
+class FakeThreadedPool:
+    """Hands out idle connections first and opens new ones from ``factory``."""
+
+    factory = FakeConnection
+
+    def __init__(self, min_size, max_size, dsn):
+        self.idle = []
+        self.opened = []
+        self.closed = []
+
+    def getconn(self):
+        if self.idle:
+            return self.idle.pop()
+        conn = type(self).factory()
+        self.opened.append(conn)
+        return conn
+
+    def putconn(self, conn, close=False):
+        if close:
+            conn.closed = 1
+            self.closed.append(conn)
+        else:
+            self.idle.append(conn)
+
+    def closeall(self):
+        for conn in self.idle:
+            conn.closed = 1
+        self.idle = []
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    class Clock:
+        now = 1000.0
+
+        def monotonic(self):
+            return self.now
+
+    clock = Clock()
+    monkeypatch.setattr(extensions, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def make_pool(monkeypatch, clock):
+    monkeypatch.setattr(extensions, "ThreadedConnectionPool", FakeThreadedPool)
+
+    def make_pool(max_size=3, **kwargs):
+        return PGConnectionPool("postgresql://test", min_size=1, max_size=max_size, timeout=0.05,
+                                healthcheck_interval=30.0, **kwargs)
+
+    return make_pool
+
+
+def _idle(pool, *conns):
+    """Put connections in the fake pool's idle list, as if checked in earlier."""
+    pool._pool.idle.extend(conns)
+
+
+# --- Health checks -----------------------------------------------------------
+
+def test_dead_idle_connections_are_discarded_until_a_live_one(make_pool):
+    pool = make_pool()
+    live, dead_1, dead_2 = FakeConnection(), FakeConnection(alive=False), FakeConnection(alive=False)
+    # Handed out last-in first-out: dead_2, dead_1, live
+    _idle(pool, live, dead_1, dead_2)
+
+    assert pool.getconn() is live
+    assert pool._pool.closed == [dead_2, dead_1]
+
+
+def test_all_idle_connections_dead_opens_a_new_one(make_pool):
+    pool = make_pool()
+    dead = [FakeConnection(alive=False) for _ in range(3)]
+    _idle(pool, *dead)
+
+    conn = pool.getconn()
+    assert conn.alive and conn not in dead
+    assert pool._pool.closed == list(reversed(dead))
+
+
+def test_closed_connections_are_discarded_without_a_ping(make_pool):
+    pool = make_pool()
+    closed = FakeConnection()
+    closed.closed = 1
+    _idle(pool, closed)
+
+    conn = pool.getconn()
+    assert conn is not closed
+    assert closed.pings == 0
+
+
+def test_gives_up_when_no_live_connection_can_be_opened(make_pool, monkeypatch):
+    monkeypatch.setattr(FakeThreadedPool, "factory", lambda: FakeConnection(alive=False))
+    pool = make_pool(max_size=2)
+
+    with pytest.raises(psycopg2.OperationalError):
+        pool.getconn()
+    # max_size + 1 attempts, then the slot is released again
+    assert len(pool._pool.closed) == 3
+    assert pool._slots.acquire(blocking=False)
+
+
+def test_recently_used_connections_skip_the_ping(make_pool, clock):
+    pool = make_pool()
+    conn = pool.getconn()
+    assert conn.pings == 1  # never used before, so it is checked
+    pool.putconn(conn)
+
+    clock.now += 10
+    assert pool.getconn() is conn
+    assert conn.pings == 1
+    pool.putconn(conn)
+
+    clock.now += 31
+    assert pool.getconn() is conn
+    assert conn.pings == 2
+
+
+def test_idle_timestamps_do_not_outlive_their_connection(make_pool):
+    pool = make_pool()
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert conn in pool._last_used
+
+    # The underlying pool lets go of the connection (e.g. closeall())
+    pool._pool.idle.clear()
+    pool._pool.opened.clear()
+    del conn
+    gc.collect()
+    assert len(pool._last_used) == 0
+
+    # Whatever id() the next connection gets, it is checked on first use
+    fresh = pool.getconn()
+    assert fresh.pings == 1
+
+
+# --- Returning connections ---------------------------------------------------
+
+def test_putconn_rolls_back_an_open_transaction(make_pool):
+    pool = make_pool()
+    conn = pool.getconn()
+    conn.in_transaction = True
+    pool.putconn(conn)
+
+    assert conn.rollbacks == 2  # one after the health check, one on return
+    assert not conn.in_transaction
+    assert pool._pool.idle == [conn]
+
+
+def test_putconn_closes_a_connection_that_cannot_roll_back(make_pool):
+    pool = make_pool()
+    conn = pool.getconn()
+    conn.in_transaction = True
+    conn.rollback_fails = True
+    pool.putconn(conn)
+
+    assert pool._pool.closed == [conn]
+    assert conn not in pool._last_used
+
+
+def test_connection_context_manager_always_returns_the_connection(make_pool):
+    pool = make_pool(max_size=1)
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            raise RuntimeError("query failed")
+
+    with pool.connection() as conn:
+        assert conn.alive
+
+
+def test_getconn_times_out_when_every_slot_is_taken(make_pool):
+    pool = make_pool(max_size=2)
+    pool.getconn()
+    pool.getconn()
+    with pytest.raises(TimeoutError):
+        pool.getconn()
@@ -0,0 +1,94 @@
+"""
+Tests for the semantic chat answer cache (core/semantic_cache.py).
+"""
+import math
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import semantic_cache
+from core.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(semantic_cache, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def _at_angle(degrees):
+    """Unit vector whose cosine similarity with [1, 0] is cos(degrees)."""
+    radians = math.radians(degrees)
+    return np.array([math.cos(radians), math.sin(radians)], dtype=np.float32)
+
+
+def test_lookup_hits_at_or_above_threshold(clock):
+    cache = SemanticCache(threshold=0.95)
+    cache.store(np.array([1.0, 0.0]), {"answer": "a"}, version=1)
+
+    # cos(15°) ≈ 0.966, cos(20°) ≈ 0.940
+    assert cache.lookup(_at_angle(15), version=1) == {"answer": "a"}
+    assert cache.lookup(_at_angle(20), version=1) is None
+
+
+def test_lookup_ignores_vector_length(clock):
+    cache = SemanticCache(threshold=0.99)
+    cache.store(np.array([3.0, 0.0]), {"answer": "a"}, version=1)
+    assert cache.lookup(np.array([0.2, 0.0]), version=1) == {"answer": "a"}
+
+
+def test_lookup_returns_the_most_similar_entry(clock):
+    cache = SemanticCache(threshold=0.9)
+    cache.store(_at_angle(10), {"answer": "farther"}, version=1)
+    cache.store(_at_angle(2), {"answer": "closer"}, version=1)
+    assert cache.lookup(_at_angle(0), version=1) == {"answer": "closer"}
+
+
+def test_lookup_skips_entries_from_another_version(clock):
+    cache = SemanticCache(threshold=0.9)
+    cache.store(_at_angle(0), {"answer": "stale"}, version=1)
+    cache.store(_at_angle(5), {"answer": "current"}, version=2)
+
+    assert cache.lookup(_at_angle(0), version=2) == {"answer": "current"}
+    assert cache.lookup(_at_angle(0), version=3) is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = SemanticCache(ttl=60)
+    cache.store(_at_angle(0), {"answer": "old"}, version=1)
+    clock.now += 30
+    cache.store(_at_angle(90), {"answer": "new"}, version=1)
+
+    clock.now += 31
+    assert cache.lookup(_at_angle(0), version=1) is None
+    assert cache.lookup(_at_angle(90), version=1) == {"answer": "new"}
+    assert cache.stats()["size"] == 1
+
+
+def test_oldest_entries_are_dropped_beyond_max_entries(clock):
+    cache = SemanticCache(max_entries=2)
+    for degrees in (0, 45, 90):
+        cache.store(_at_angle(degrees), {"answer": degrees}, version=1)
+
+    assert cache.lookup(_at_angle(0), version=1) is None
+    assert cache.lookup(_at_angle(45), version=1) == {"answer": 45}
+    assert cache.lookup(_at_angle(90), version=1) == {"answer": 90}
+
+
+def test_stats_and_clear(clock):
+    cache = SemanticCache()
+    assert cache.lookup(_at_angle(0), version=1) is None
+    cache.store(_at_angle(0), {"answer": "a"}, version=1)
+    assert cache.lookup(_at_angle(0), version=1) == {"answer": "a"}
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "size": 1}
+
+    cache.clear()
+    assert cache.lookup(_at_angle(0), version=1) is None
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,98 @@
+"""
+Tests for JSON serialization and list streaming (core/serialization.py).
+"""
+import json
+import os
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+
+import pytest
+from flask import Flask
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import serialization
+from core.serialization import dumps, loads, stream_json_list
+
+
+class Color(Enum):
+    RED = "red"
+
+
+def test_dumps_handles_extra_types():
+    data = {
+        "price": Decimal("1.5"),
+        "tags": ("a", "b"),
+        "color": Color.RED,
+        "at": datetime(2024, 1, 2, 3, 4, 5),
+        "on": date(2024, 1, 2),
+    }
+    assert loads(dumps(data)) == {
+        "price": 1.5,
+        "tags": ["a", "b"],
+        "color": "red",
+        "at": "2024-01-02T03:04:05",
+        "on": "2024-01-02",
+    }
+
+
+def test_dumps_keeps_non_ascii_text():
+    assert dumps({"name": "王大明"}).decode("utf-8") == '{"name":"王大明"}'
+
+
+def test_dumps_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+
+# --- Streaming ---------------------------------------------------------------
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(serialization, "STREAM_CHUNK_ITEMS", 2)
+    return Flask(__name__)
+
+
+def _body(app, view):
+    app.add_url_rule("/items", "items", view)
+    return app.test_client().get("/items")
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 3, 5])
+def test_stream_json_list_produces_the_whole_array(app, count):
+    response = _body(app, lambda: stream_json_list({"n": n} for n in range(count)))
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert json.loads(response.get_data()) == [{"n": n} for n in range(count)]
+
+
+def test_stream_json_list_sets_status_and_headers(app):
+    response = _body(app, lambda: stream_json_list([1], 201, {"X-Next-Cursor": "abc"}))
+    assert response.status_code == 201
+    assert response.headers["X-Next-Cursor"] == "abc"
+
+
+def test_stream_json_list_raises_before_the_response_when_the_first_rows_fail(app):
+    def rows():
+        raise RuntimeError("query failed")
+        yield  # pragma: no cover
+
+    app.config["PROPAGATE_EXCEPTIONS"] = False
+    response = _body(app, lambda: stream_json_list(rows()))
+    assert response.status_code == 500
+
+
+def test_stream_json_list_closes_the_array_when_a_later_chunk_fails(app):
+    def rows():
+        yield {"n": 0}
+        yield {"n": 1}
+        yield {"n": 2}
+        raise RuntimeError("connection lost")
+
+    response = _body(app, lambda: stream_json_list(rows()))
+    assert response.status_code == 200
+    # The rows of the failed chunk are dropped, but the body stays valid JSON
+    assert json.loads(response.get_data()) == [{"n": 0}, {"n": 1}]
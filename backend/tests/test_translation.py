@@ -0,0 +1,234 @@
+"""
+Tests for DS-160 form translation (services/translation.py): the CJK
+pre-pass, token-budgeted chunking, response validation and the per-field
+fallback.
+
+The LLM gateway and the persistent translation cache are replaced with fakes.
+"""
+import json
+import os
+import re
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import translation
+from services.translation import (
+    _chunk_payload,
+    _collect_translatable,
+    _estimate_tokens,
+    _json_pointer,
+    _translate_chunk,
+    _translate_payload,
+    contains_cjk,
+    translate_form_data,
+    translate_text,
+)
+
+PAYLOAD_PATTERN = re.compile(r"JSON to translate:\s*(\{.*\})", re.DOTALL)
+
+
+def _pinyin(text):
+    return f"py({text})"
+
+
+class FakeGateway:
+    """
+    Answers translation prompts by wrapping every value in py(...).
+
+    ``reply`` can override the response content for a chunk; ``fail_multi``
+    makes every multi-value chunk come back with a key missing.
+    """
+
+    def __init__(self, reply=None, fail_multi=False, fail_texts=(), finish_reason="stop"):
+        self.reply = reply
+        self.fail_multi = fail_multi
+        self.fail_texts = set(fail_texts)
+        self.finish_reason = finish_reason
+        self.chunks = []
+
+    def chat_completion(self, messages, **kwargs):
+        chunk = json.loads(PAYLOAD_PATTERN.search(messages[-1]["content"]).group(1))
+        self.chunks.append(chunk)
+
+        if self.fail_texts & set(chunk.values()):
+            raise RuntimeError("model error")
+        if self.reply is not None:
+            content = self.reply(chunk)
+        else:
+            translated = {pointer: _pinyin(text) for pointer, text in chunk.items()}
+            if self.fail_multi and len(chunk) > 1:
+                translated.popitem()
+            content = json.dumps(translated, ensure_ascii=False)
+
+        choice = SimpleNamespace(finish_reason=self.finish_reason, message=SimpleNamespace(content=content))
+        return SimpleNamespace(choices=[choice])
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    """Install a FakeGateway and an in-memory translation cache."""
+    def install(**options):
+        fake = FakeGateway(**options)
+        monkeypatch.setattr(translation, "get_llm_gateway", lambda: fake)
+        return fake
+
+    cache = {}
+    monkeypatch.setattr(
+        translation, "get_cached_translations",
+        lambda texts, target_lang, version: {text: cache[text] for text in texts if text in cache},
+    )
+    monkeypatch.setattr(
+        translation, "store_cached_translations",
+        lambda translations, target_lang, version: cache.update(translations),
+    )
+    install.cache = cache
+    return install
+
+
+# --- CJK pre-pass ------------------------------------------------------------
+
+@pytest.mark.parametrize("text, expected", [
+    ("王大明", True),
+    ("北京，中国", True),
+    ("Ｙ", True),  # fullwidth forms
+    ("𠀀", True),  # CJK extension B
+    ("Wang Daming", False),
+    ("aven@borderxai.com", False),
+    ("2024-01-01", False),
+])
+def test_contains_cjk(text, expected):
+    assert contains_cjk(text) is expected
+
+
+def test_collect_translatable_keeps_only_cjk_strings_with_their_paths():
+    entries = []
+    _collect_translatable(
+        {"name": "王大明", "email": "a@example.com", "trips": [{"city": "北京"}, {"city": "Paris"}], "age": 30},
+        (),
+        entries,
+    )
+    assert entries == [(("name",), "王大明"), (("trips", 0, "city"), "北京")]
+
+
+def test_json_pointer_escapes_tilde_and_slash():
+    assert _json_pointer(("a/b", "c~d", 0)) == "/a~1b/c~0d/0"
+
+
+def test_estimate_tokens_counts_cjk_characters_individually():
+    assert _estimate_tokens("王大明") == 4
+    assert _estimate_tokens("abcdefgh") == 3
+
+
+# --- Chunking ----------------------------------------------------------------
+
+def test_chunk_payload_keeps_sections_together():
+    payload = {
+        "/personal/surname": "王",
+        "/personal/given": "大明",
+        "/travel/city": "北京",
+    }
+    budget = sum(_estimate_tokens(pointer) + _estimate_tokens(text) for pointer, text in payload.items()
+                 if pointer.startswith("/personal"))
+    chunks = _chunk_payload(payload, budget)
+    assert chunks == [
+        {"/personal/surname": "王", "/personal/given": "大明"},
+        {"/travel/city": "北京"},
+    ]
+
+
+def test_chunk_payload_splits_an_oversized_section():
+    payload = {f"/history/{i}": "北京大学" * 10 for i in range(4)}
+    chunks = _chunk_payload(payload, token_budget=100)
+    assert len(chunks) > 1
+    assert {pointer: text for chunk in chunks for pointer, text in chunk.items()} == payload
+    for chunk in chunks:
+        assert sum(_estimate_tokens(p) + _estimate_tokens(t) for p, t in chunk.items()) <= 100
+
+
+def test_chunk_payload_fits_everything_in_one_chunk_when_it_can():
+    payload = {"/a": "王", "/b/c": "李", "": "张"}
+    assert _chunk_payload(payload, token_budget=1000) == [payload]
+
+
+# --- Response validation -----------------------------------------------------
+
+def test_translate_chunk_accepts_json_wrapped_in_prose(gateway):
+    gateway(reply=lambda chunk: 'Here you go: {"/a": "Wang"} Done.')
+    assert _translate_chunk({"/a": "王"}) == {"/a": "Wang"}
+
+
+@pytest.mark.parametrize("reply", [
+    lambda chunk: json.dumps({}),                                   # missing key
+    lambda chunk: json.dumps({**chunk, "/extra": "x"}),             # unexpected key
+    lambda chunk: json.dumps({pointer: 1 for pointer in chunk}),    # non-string value
+    lambda chunk: "not json",
+])
+def test_translate_chunk_rejects_invalid_responses(gateway, reply):
+    gateway(reply=reply)
+    with pytest.raises(ValueError):
+        _translate_chunk({"/a": "王"})
+
+
+def test_translate_chunk_rejects_truncated_responses(gateway):
+    gateway(finish_reason="length")
+    with pytest.raises(ValueError):
+        _translate_chunk({"/a": "王"})
+
+
+# --- Retries and fallback ----------------------------------------------------
+
+def test_translate_payload_falls_back_to_single_fields(gateway, monkeypatch):
+    monkeypatch.setattr(translation, "TRANSLATION_CHUNK_RETRIES", 1)
+    fake = gateway(fail_multi=True)
+    payload = {"/a": "王", "/b": "李"}
+
+    assert _translate_payload(payload) == {"/a": "py(王)", "/b": "py(李)"}
+    # One chunk, retried once, then one call per field
+    assert [len(chunk) for chunk in fake.chunks] == [2, 2, 1, 1]
+
+
+def test_translate_payload_leaves_out_fields_that_still_fail(gateway, monkeypatch):
+    monkeypatch.setattr(translation, "TRANSLATION_CHUNK_RETRIES", 0)
+    gateway(fail_texts={"李"})
+    assert _translate_payload({"/a": "王", "/b": "李"}) == {"/a": "py(王)"}
+
+
+def test_translate_form_data_translates_only_cjk_values_and_caches_them(gateway):
+    fake = gateway()
+    form = {"name": "王大明", "email": "a@example.com", "alias": "王大明", "trips": [{"city": "北京"}]}
+
+    translated = translate_form_data(form)
+    assert translated == {"name": "py(王大明)", "email": "a@example.com", "alias": "py(王大明)", "trips": [{"city": "py(北京)"}]}
+    assert form["name"] == "王大明"
+    # Duplicate values are sent once
+    assert fake.chunks == [{"/name": "王大明", "/trips/0/city": "北京"}]
+
+    # A second form with the same values is served from the cache
+    fake.chunks.clear()
+    assert translate_form_data({"other": "北京"}) == {"other": "py(北京)"}
+    assert fake.chunks == []
+
+
+def test_translate_form_data_keeps_untranslatable_values(gateway, monkeypatch):
+    monkeypatch.setattr(translation, "TRANSLATION_CHUNK_RETRIES", 0)
+    gateway(fail_texts={"李"})
+    assert translate_form_data({"a": "王", "b": "李"}) == {"a": "py(王)", "b": "李"}
+    assert "李" not in gateway.cache
+
+
+def test_translate_text_uses_the_form_pipeline(gateway):
+    gateway()
+    assert translate_text("王大明") == "py(王大明)"
+    assert translate_text("  ") == "  "
+    assert translate_text("Wang") == "Wang"
+
+
+def test_translate_text_returns_none_when_translation_fails(gateway, monkeypatch):
+    monkeypatch.setattr(translation, "TRANSLATION_CHUNK_RETRIES", 0)
+    gateway(fail_texts={"王"})
+    assert translate_text("王") is None